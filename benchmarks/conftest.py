@@ -0,0 +1,33 @@
+""" Benchmarks for the model, scene and execution hot paths.
+
+Requires pytest-benchmark. Run from the repository root with
+
+    python -m pytest benchmarks --benchmark-only
+
+Graph sizes are taken from the NODEGRAPH_BENCH_SIZES environment variable
+(default "100,1000"), scene benchmarks use NODEGRAPH_BENCH_SCENE_SIZES
+(default "100"). The full scaling run is
+
+    NODEGRAPH_BENCH_SIZES=100,1000,10000,100000 python -m pytest benchmarks --benchmark-only
+
+Use --benchmark-autosave and --benchmark-compare-fail=mean:10% to catch
+scaling regressions against a stored baseline.
+
+"""
+import os
+import sys
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'examples', 'calculator'), os.path.dirname(__file__)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def _sizes(name, default):
+    return [int(s) for s in os.environ.get(name, default).split(',') if s.strip()]
+
+
+GRAPH_SIZES = _sizes('NODEGRAPH_BENCH_SIZES', '100,1000')
+SCENE_SIZES = _sizes('NODEGRAPH_BENCH_SCENE_SIZES', '100')
@@ -0,0 +1,180 @@
+""" Synthetic graph generators for the benchmarks.
+
+"""
+import random
+
+from enaml_nodegraph.model import Edge, Socket, Node, Graph, CompactGraph
+
+
+def model_graph(n_nodes, fan_in=2, seed=0):
+    """ A random DAG of plain model nodes where every node reads from up to
+    `fan_in` earlier nodes.
+
+    """
+    rnd = random.Random(seed)
+    nodes = [Node(id="node-%d" % i, name="node%d" % i,
+                  inputs=[Socket(name="in%d" % k, data_type="float") for k in range(fan_in)],
+                  outputs=[Socket(name="out", data_type="float")])
+             for i in range(n_nodes)]
+    edges = []
+    for i, node in enumerate(nodes[1:], 1):
+        for k in range(min(fan_in, i)):
+            start = nodes[rnd.randrange(i)]
+            edges.append(Edge(id="edge-%d-%d" % (i, k), start_socket=start.outputs[0], end_socket=node.inputs[k]))
+    return nodes, edges
+
+
+def compact_graph(n_nodes, fan_in=2, seed=0):
+    """ The topology of `model_graph` built directly as a CompactGraph.
+
+    """
+    rnd = random.Random(seed)
+    inputs = ["in%d" % k for k in range(fan_in)]
+    graph = CompactGraph()
+    for i in range(n_nodes):
+        graph.add_node("node-%d" % i, [(name, "float") for name in inputs], [("out", "float")],
+                       name="node%d" % i)
+    for i in range(1, n_nodes):
+        for k in range(min(fan_in, i)):
+            graph.add_edge("edge-%d-%d" % (i, k), rnd.randrange(i), "out", i, inputs[k])
+    return graph
+
+
+def calculator_spec(n_nodes, seed=0):
+    """ The node and edge records of a calculator graph with `n_nodes` nodes.
+
+    Inputs feed layers of unary and binary operators which end in outputs.
+    Returns (nodes, edges) where nodes are (id, type_name, attributes) and
+    edges are (id, start_id, start_socket, end_id, end_socket).
+
+    """
+    rnd = random.Random(seed)
+    n_inputs = max(2, n_nodes // 10)
+    n_outputs = max(1, n_nodes // 10)
+    n_ops = max(0, n_nodes - n_inputs - n_outputs)
+
+    nodes = []
+    edges = []
+    # (node id, output socket) of all float producers so far
+    floats = []
+
+    def connect(end, end_socket):
+        start, start_socket = rnd.choice(floats[-50:])
+        edges.append(("edge-%d" % len(edges), start, start_socket, end, end_socket))
+
+    for i in range(n_inputs):
+        node_id = "input-%d" % i
+        nodes.append((node_id, 'float_input', {'value': rnd.random()}))
+        floats.append((node_id, 'value'))
+
+    for i in range(n_ops):
+        node_id = "op-%d" % i
+        if rnd.random() < 0.5:
+            nodes.append((node_id, 'unary_operator', {'operator': rnd.choice(['sin', 'cos', 'deg2rad'])}))
+            connect(node_id, 'in1')
+        else:
+            nodes.append((node_id, 'binary_operator', {'operator': rnd.choice(['add', 'sub', 'mul'])}))
+            connect(node_id, 'in1')
+            connect(node_id, 'in2')
+        floats.append((node_id, 'result'))
+
+    for i in range(n_outputs):
+        node_id = "output-%d" % i
+        nodes.append((node_id, 'float_output', {}))
+        connect(node_id, 'value')
+
+    return nodes, edges
+
+
+def calculator_graph(n_nodes, seed=0):
+    """ A detached ExecutableGraph built from `calculator_spec`.
+
+    """
+    from graph_calculator import model
+
+    classes = {
+        'float_input': model.FloatInputModel,
+        'float_output': model.FloatOutputModel,
+        'unary_operator': model.UnaryOperatorModel,
+        'binary_operator': model.BinaryOperatorModel,
+    }
+
+    node_specs, edge_specs = calculator_spec(n_nodes, seed)
+    graph = model.ExecutableGraph()
+    nodes = {}
+    for node_id, type_name, attributes in node_specs:
+        node = classes[type_name](id=node_id)
+        for key, value in attributes.items():
+            setattr(node.attributes, key, value)
+        nodes[node_id] = node
+    graph.nodes = list(nodes.values())
+
+    edges = []
+    for edge_id, start, start_socket, end, end_socket in edge_specs:
+        edges.append(model.EdgeModel(id=edge_id,
+                                     start_socket=nodes[start].output_dict[start_socket],
+                                     end_socket=nodes[end].input_dict[end_socket]))
+    graph.edges = edges
+    return graph
+
+
+def calculator_chains(n_nodes, length=10, seed=0, grouped=False):
+    """ A detached ExecutableGraph of float inputs, each feeding a chain of
+    `length` unary operators that ends in a float output.
+
+    With `grouped` the operators of each chain are moved into a group.
+
+    """
+    from graph_calculator import model
+
+    rnd = random.Random(seed)
+    graph = model.ExecutableGraph()
+    nodes = []
+    edges = []
+    for i in range(max(1, n_nodes // (length + 2))):
+        previous = model.FloatInputModel(id="input-%d" % i)
+        previous.attributes.value = rnd.random()
+        nodes.append(previous)
+        chain = []
+        for k in range(length):
+            node = model.UnaryOperatorModel(id="op-%d-%d" % (i, k))
+            node.attributes.operator = rnd.choice(['sin', 'cos', 'deg2rad'])
+            chain.append(node)
+        chain.append(model.FloatOutputModel(id="output-%d" % i))
+        if grouped:
+            group = model.GroupModel(id="group-%d" % i)
+            operators, output = chain[:-1], chain[-1]
+            group.subgraph.nodes = operators
+            group.subgraph.edges = [model.EdgeModel(id="edge-%d-%d" % (i, k), start_socket=start.outputs[0],
+                                                    end_socket=end.inputs[0])
+                                    for k, (start, end) in enumerate(zip(operators, operators[1:]))]
+            group.expose_input('in1', [operators[0].inputs[0]])
+            group.expose_output('result', operators[-1].outputs[0])
+            chain = [group, output]
+        for node in chain:
+            edges.append(model.EdgeModel(id="edge-%d" % len(edges),
+                                         start_socket=previous.outputs[0], end_socket=node.inputs[0]))
+            nodes.append(node)
+            previous = node
+    graph.nodes = nodes
+    graph.edges = edges
+    return graph
+
+
+def calculator_node_link_data(n_nodes, seed=0):
+    """ `calculator_spec` in the node-link format written by the calculator's file_save.
+
+    """
+    node_specs, edge_specs = calculator_spec(n_nodes, seed)
+    rnd = random.Random(seed)
+    nodes = []
+    for node_id, type_name, attributes in node_specs:
+        record = {'id': node_id, 'name': node_id, 'type_name': type_name,
+                  'position': [rnd.uniform(-5000, 5000), rnd.uniform(-5000, 5000)]}
+        if attributes:
+            record['attributes'] = attributes
+        nodes.append(record)
+    links = [{'id': edge_id, 'source': start, 'target': end, 'key': 0,
+              'source_socket': start_socket, 'target_socket': end_socket, 'type_name': 'default'}
+             for edge_id, start, start_socket, end, end_socket in edge_specs]
+    return {'directed': True, 'multigraph': True, 'graph': {}, 'nodes': nodes, 'links': links}
@@ -0,0 +1,90 @@
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from conftest import GRAPH_SIZES
+from generators import calculator_graph, calculator_chains
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_execute_graph_full(benchmark, n_nodes):
+    """ A tick after a topology change, which updates every node. """
+    graph = calculator_graph(n_nodes)
+
+    def tick():
+        graph._update_all = True
+        graph.execute_graph()
+
+    benchmark(tick)
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_execute_graph_single_input(benchmark, n_nodes):
+    """ A tick caused by changing the value of one input node. """
+    graph = calculator_graph(n_nodes)
+    graph.topologyChanged()
+    source = graph.node_dict['input-0']
+
+    def tick():
+        source.attributes.value += 1.0
+
+    benchmark(tick)
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_topology_changed(benchmark, n_nodes):
+    """ Rebuilding the execution order plus a full update. """
+    graph = calculator_graph(n_nodes)
+
+    benchmark.pedantic(graph.topologyChanged, rounds=5)
+
+
+@pytest.mark.parametrize('fuse_chains', [False, True])
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_execute_chains(benchmark, n_nodes, fuse_chains):
+    """ A full update of chains of unary operators, with and without fusion. """
+    graph = calculator_chains(n_nodes)
+    graph.fuse_chains = fuse_chains
+    graph.topologyChanged()
+
+    def tick():
+        graph._update_all = True
+        graph.execute_graph()
+
+    benchmark(tick)
+
+
+@pytest.mark.parametrize('fuse_chains', [False, True])
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_execute_grouped_chains(benchmark, n_nodes, fuse_chains):
+    """ The chains of test_execute_chains moved into groups, executed flattened. """
+    graph = calculator_chains(n_nodes, grouped=True)
+    graph.fuse_chains = fuse_chains
+    graph.topologyChanged()
+
+    def tick():
+        graph._update_all = True
+        graph.execute_graph()
+
+    benchmark(tick)
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_compiled_graph(benchmark, n_nodes):
+    """ Evaluating the graph compiled to a Python function. """
+    graph = calculator_graph(n_nodes)
+    function = graph.compiled.function
+
+    benchmark(function)
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_compile_graph(benchmark, n_nodes):
+    """ Generating and compiling the function after a topology change. """
+    graph = calculator_graph(n_nodes)
+
+    def recompile():
+        graph.get_member('compiled').reset(graph)
+        return graph.compiled
+
+    benchmark(recompile)
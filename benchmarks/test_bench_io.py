@@ -0,0 +1,48 @@
+import io
+import json
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from graph_calculator import binary_format
+
+from conftest import GRAPH_SIZES
+from generators import calculator_node_link_data
+
+
+@pytest.mark.parametrize('fmt', ['json', 'binary'])
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_encode(benchmark, n_nodes, fmt):
+    data = calculator_node_link_data(n_nodes)
+
+    def encode():
+        if fmt == 'json':
+            return json.dumps(data).encode('utf-8')
+        fp = io.BytesIO()
+        binary_format.dump(data, fp)
+        return fp.getvalue()
+
+    result = benchmark.pedantic(encode, rounds=3)
+    benchmark.extra_info['bytes'] = len(result)
+
+
+@pytest.mark.parametrize('fmt', ['json', 'binary'])
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_decode(benchmark, n_nodes, fmt):
+    data = calculator_node_link_data(n_nodes)
+    if fmt == 'json':
+        encoded = json.dumps(data)
+
+        def decode():
+            return json.loads(encoded)
+    else:
+        fp = io.BytesIO()
+        binary_format.dump(data, fp)
+        encoded = fp.getvalue()
+
+        def decode():
+            return binary_format.load(io.BytesIO(encoded))
+
+    result = benchmark.pedantic(decode, rounds=3)
+    assert result['nodes'] == data['nodes']
@@ -0,0 +1,142 @@
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+import networkx as nx
+
+from atom.api import Bool, Int, Float, Enum
+
+from enaml_nodegraph.model import Socket, Node, Graph, Attributes, CompactGraph
+
+from conftest import GRAPH_SIZES
+from generators import model_graph, compact_graph
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_graph_add_node(benchmark, n_nodes):
+    nodes, edges = model_graph(n_nodes)
+
+    def add_nodes():
+        g = Graph()
+        for node in nodes:
+            g.add_node(node)
+        return g
+
+    g = benchmark.pedantic(add_nodes, rounds=3)
+    assert len(g.nodes) == n_nodes
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_graph_add_edge(benchmark, n_nodes):
+    nodes, edges = model_graph(n_nodes)
+
+    def setup():
+        return (Graph(nodes=nodes),), {}
+
+    def add_edges(g):
+        for edge in edges:
+            g.add_edge(edge)
+        return g
+
+    benchmark.pedantic(add_edges, setup=setup, rounds=3)
+
+
+@pytest.mark.parametrize('n_sockets', [10, 100, 1000])
+def test_node_socket_creation(benchmark, n_sockets):
+
+    def create():
+        return Node(inputs=[Socket(name="in%d" % i, data_type="float") for i in range(n_sockets)],
+                    outputs=[Socket(name="out%d" % i, data_type="float") for i in range(n_sockets)])
+
+    node = benchmark(create)
+    assert node.inputs[-1].index == n_sockets - 1
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_toposort_networkx(benchmark, n_nodes):
+    nodes, edges = model_graph(n_nodes)
+    g = Graph(nodes=nodes, edges=edges)
+
+    def toposort():
+        nxg = nx.MultiDiGraph()
+        for node in g.nodes:
+            nxg.add_node(node.id)
+        for edge in g.edges:
+            nxg.add_edge(edge.start_socket.node.id, edge.end_socket.node.id)
+        return list(nx.topological_sort(nxg))
+
+    assert len(benchmark(toposort)) == n_nodes
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_toposort_native(benchmark, n_nodes):
+    nodes, edges = model_graph(n_nodes)
+    g = Graph(nodes=nodes, edges=edges)
+
+    assert len(benchmark(g.topological_sort)) == n_nodes
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_compact_build(benchmark, n_nodes):
+    g = benchmark.pedantic(compact_graph, args=(n_nodes,), rounds=3)
+    assert g.node_count == n_nodes
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_compact_from_graph(benchmark, n_nodes):
+    nodes, edges = model_graph(n_nodes)
+    g = Graph(nodes=nodes, edges=edges)
+
+    compact = benchmark.pedantic(CompactGraph.from_graph, args=(g,), rounds=3)
+    assert compact.edge_count == len(edges)
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_toposort_compact(benchmark, n_nodes):
+    g = compact_graph(n_nodes)
+
+    def toposort():
+        g._changed()
+        return g.topological_order()
+
+    assert len(benchmark(toposort)) == n_nodes
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_would_create_cycle(benchmark, n_nodes):
+    nodes, edges = model_graph(n_nodes)
+    g = Graph(nodes=nodes, edges=edges)
+    # back edges from late to early nodes, the case that needs a search
+    pairs = [(nodes[-1 - i], nodes[i]) for i in range(min(100, n_nodes // 2))]
+
+    def check():
+        return [g.would_create_cycle(start, end) for start, end in pairs]
+
+    benchmark(check)
+
+
+class BenchAttributes(Attributes):
+    enabled = Bool()
+    interval = Int(100)
+    min_value = Float()
+    max_value = Float(10.)
+    operator = Enum('add', 'sub', 'mul', 'div')
+
+
+@pytest.mark.parametrize('n_nodes', GRAPH_SIZES)
+def test_attributes_round_trip(benchmark, n_nodes):
+    """ Serialize and deserialize the attributes of n nodes. """
+    attributes = [BenchAttributes(interval=i) for i in range(n_nodes)]
+    targets = [BenchAttributes() for i in range(n_nodes)]
+
+    def round_trip():
+        archives = []
+        for attrs in attributes:
+            archive = {}
+            attrs.serialize(archive)
+            archives.append(archive)
+        for attrs, archive in zip(targets, archives):
+            attrs.deserialize(archive)
+
+    benchmark(round_trip)
+    assert targets[-1].interval == n_nodes - 1
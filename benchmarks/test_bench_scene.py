@@ -0,0 +1,154 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+pytest.importorskip('enaml.qt.QtWidgets')
+
+import enaml
+from enaml.qt import QtCore, QtGui
+from enaml.qt.qt_application import QtApplication
+
+from conftest import SCENE_SIZES
+from generators import calculator_node_link_data
+
+# the nodegraph toolkit factories must be installed before the application is created
+with enaml.imports():
+    from bench_view import BenchView
+    from graph_calculator.views.item_widgets import AutoNode, Edge
+
+
+@pytest.fixture(scope='module')
+def qt_app():
+    app = QtApplication.instance() or QtApplication()
+    yield app
+
+
+@pytest.fixture
+def make_controller(qt_app):
+    from graph_calculator import model
+    from graph_calculator.registry import NodeType, EdgeType
+    from graph_calculator.controller import CalculatorGraphController
+
+    windows = []
+
+    def factory():
+        controller = CalculatorGraphController()
+        for type_id, model_class in [('float_input', model.FloatInputModel),
+                                     ('float_output', model.FloatOutputModel),
+                                     ('unary_operator', model.UnaryOperatorModel),
+                                     ('binary_operator', model.BinaryOperatorModel)]:
+            controller.registry.register_node_type(NodeType(id=type_id, name=type_id,
+                                                            widget_class=AutoNode, model_class=model_class))
+        controller.registry.register_edge_type(EdgeType(id='default', name='Edge',
+                                                        widget_class=Edge, model_class=model.EdgeModel))
+        window = BenchView(controller=controller)
+        window.show()
+        windows.append(window)
+        return controller
+
+    yield factory
+
+    for window in windows:
+        window.close()
+        window.destroy()
+
+
+def write_graph(tmp_path, n_nodes):
+    path = os.path.join(str(tmp_path), 'graph_%d.json' % n_nodes)
+    with open(path, 'w') as fp:
+        json.dump(calculator_node_link_data(n_nodes), fp)
+    return path
+
+
+@pytest.mark.parametrize('n_nodes', SCENE_SIZES)
+def test_scene_populate(benchmark, tmp_path, make_controller, n_nodes):
+    """ Opening a file into an empty scene, including per-node scene items. """
+    path = write_graph(tmp_path, n_nodes)
+
+    def setup():
+        return (make_controller(),), {}
+
+    def populate(controller):
+        controller.file_open(path)
+        return controller
+
+    benchmark.pedantic(populate, setup=setup, rounds=3)
+
+
+@pytest.mark.parametrize('n_nodes', SCENE_SIZES)
+def test_scene_populate_incremental(benchmark, tmp_path, make_controller, n_nodes):
+    """ Opening a binary file through the batch loader used by the editor. """
+    from graph_calculator import binary_format
+    from graph_calculator.loader import GraphLoader
+
+    path = os.path.join(str(tmp_path), 'graph_%d.ngb' % n_nodes)
+    with open(path, 'wb') as fp:
+        binary_format.dump(calculator_node_link_data(n_nodes), fp, chunk_size=64)
+
+    def setup():
+        return (make_controller(),), {}
+
+    def populate(controller):
+        GraphLoader(controller=controller, path=path).run()
+        return controller
+
+    controller = benchmark.pedantic(populate, setup=setup, rounds=3)
+    assert len(controller.graph.nodes) == n_nodes
+
+
+@pytest.mark.parametrize('extension', ['.json', '.ngb'])
+@pytest.mark.parametrize('n_nodes', SCENE_SIZES)
+def test_serialize_round_trip(benchmark, tmp_path, make_controller, n_nodes, extension):
+    """ file_save followed by file_open into a fresh scene. """
+    path = write_graph(tmp_path, n_nodes)
+    source = make_controller()
+    source.file_open(path)
+    out_path = os.path.join(str(tmp_path), 'round_trip' + extension)
+
+    def setup():
+        return (make_controller(),), {}
+
+    def round_trip(target):
+        source.file_save(out_path)
+        target.file_open(out_path)
+        return target
+
+    target = benchmark.pedantic(round_trip, setup=setup, rounds=3)
+    assert len(target.graph.nodes) == n_nodes
+
+
+@pytest.mark.parametrize('n_nodes', SCENE_SIZES)
+def test_scene_paint(benchmark, tmp_path, make_controller, n_nodes):
+    """ Rendering the whole scene into an offscreen image. """
+    controller = make_controller()
+    controller.file_open(write_graph(tmp_path, n_nodes))
+    scene = controller.view.scene.proxy.widget
+    bbox = QtCore.QRectF(*controller.view.scene.bounding_box_all_nodes())
+    image = QtGui.QImage(1920, 1080, QtGui.QImage.Format_ARGB32_Premultiplied)
+
+    def paint():
+        painter = QtGui.QPainter(image)
+        scene.render(painter, QtCore.QRectF(image.rect()), bbox)
+        painter.end()
+
+    benchmark(paint)
+
+
+@pytest.mark.parametrize('n_nodes', SCENE_SIZES)
+def test_scene_clear(benchmark, tmp_path, make_controller, n_nodes):
+    """ Tearing down a populated scene, as done by file_new and file_open. """
+    path = write_graph(tmp_path, n_nodes)
+
+    def setup():
+        controller = make_controller()
+        controller.file_open(path)
+        return (controller,), {}
+
+    def clear(controller):
+        controller.file_new()
+        return controller
+
+    controller = benchmark.pedantic(clear, setup=setup, rounds=3)
+    assert not controller.view.scene.nodes and not controller.graph.nodes
@@ -32,11 +32,25 @@ class GraphControllerBase(Atom):
     def edge_can_connect(self, start_node_id, start_socket_id, end_node_id, end_socket_id):
         return True
 
+    def compatible_sockets(self, start_node_id, start_socket_id):
+        """ Return the (node id, socket id) of all input sockets an edge from the
+        given output socket can connect to, or None to check every candidate
+        with edge_can_connect.
+
+        """
+        return None
+
     def edge_connected(self, id):
         pass
 
     def edge_disconnect(self, id):
         pass
 
+    def interaction_finished(self):
+        """ Called when the user released the mouse in the view.
+
+        """
+        pass
+
 
 
@@ -0,0 +1,178 @@
+""" Undo and redo of edits as a stack of commands.
+
+Commands store the change they make as compact delta records, e.g. the old and
+new values of the changed attributes, not snapshots of the graph. Consecutive
+commands that belong to one interaction, like the positions reported while
+nodes are dragged, are merged into a single command until the stack is sealed.
+
+"""
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from atom.api import Atom, Bool, Float, Int, List, Str, Typed, Value
+
+
+class Command(Atom):
+    """ An edit that can be undone and redone on a target, usually a controller.
+
+    """
+    #: short description of the edit
+    text = Str()
+
+    def undo(self, target):
+        raise NotImplementedError
+
+    def redo(self, target):
+        raise NotImplementedError
+
+    def merge(self, command):
+        """ Absorb `command`, done right after this one, and return True, or
+        return False if the commands cannot be merged.
+
+        """
+        return False
+
+
+class CompoundCommand(Command):
+    """ A sequence of commands undone and redone as one.
+
+    """
+    commands = List()
+
+    def undo(self, target):
+        for command in reversed(self.commands):
+            command.undo(target)
+
+    def redo(self, target):
+        for command in self.commands:
+            command.redo(target)
+
+
+class CommandStack(Atom):
+    """ The undo and redo history of a target.
+
+    """
+    #: maximum number of commands kept for undo
+    depth = Int(100)
+
+    #: pushes within this many seconds may be merged into the previous command
+    merge_interval = Float(1.0)
+
+    can_undo = Bool(False)
+    can_redo = Bool(False)
+
+    _undo = Typed(deque, ())
+    _redo = Typed(deque, ())
+
+    #: the last command does not accept merges
+    _sealed = Bool(True)
+    _last_push = Float()
+
+    #: > 0 while commands are not recorded, e.g. during undo and redo
+    _suspended = Int()
+
+    #: commands collected by an open macro and its nesting depth
+    _macro = Value()
+    _macro_depth = Int()
+
+    def _observe_depth(self, change):
+        self._trim()
+
+    @property
+    def is_recording(self):
+        return self._suspended == 0
+
+    def push(self, command):
+        """ Record a command that was already done.
+
+        """
+        if self._suspended:
+            return
+        if self._macro is not None:
+            commands = self._macro.commands
+            if not (commands and commands[-1].merge(command)):
+                commands.append(command)
+            return
+
+        now = time.monotonic()
+        if now - self._last_push > self.merge_interval:
+            self._sealed = True
+        self._last_push = now
+        self._redo.clear()
+        if not self._sealed and self._undo and self._undo[-1].merge(command):
+            return
+        self._undo.append(command)
+        self._sealed = False
+        self._trim()
+        self._update_state()
+
+    def seal(self):
+        """ End merging into the last command, e.g. when an interaction ends.
+
+        """
+        self._sealed = True
+
+    def undo(self, target):
+        if not self._undo:
+            return
+        command = self._undo.pop()
+        with self.suspended():
+            command.undo(target)
+        self._redo.append(command)
+        self._sealed = True
+        self._update_state()
+
+    def redo(self, target):
+        if not self._redo:
+            return
+        command = self._redo.pop()
+        with self.suspended():
+            command.redo(target)
+        self._undo.append(command)
+        self._sealed = True
+        self._update_state()
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._sealed = True
+        self._update_state()
+
+    @contextmanager
+    def suspended(self):
+        """ Do not record the commands pushed within the context.
+
+        """
+        self._suspended += 1
+        try:
+            yield self
+        finally:
+            self._suspended -= 1
+
+    @contextmanager
+    def macro(self, text=''):
+        """ Record the commands pushed within the context as a single command.
+
+        """
+        if self._macro_depth == 0:
+            self._macro = CompoundCommand(text=text)
+        self._macro_depth += 1
+        try:
+            yield self
+        finally:
+            self._macro_depth -= 1
+            if self._macro_depth == 0:
+                macro, self._macro = self._macro, None
+                if macro.commands:
+                    self._sealed = True
+                    self.push(macro if len(macro.commands) > 1 else macro.commands[0])
+                    self._sealed = True
+
+    def _trim(self):
+        while len(self._undo) > self.depth:
+            self._undo.popleft()
+
+    def _update_state(self):
+        self.can_undo = bool(self._undo)
+        self.can_redo = bool(self._redo)
@@ -1,5 +1,11 @@
-from .base import GraphItem, Attributes
+from .base import GraphItem, Attributes, register_codec
 from .edge import Edge, EdgeType
 from .node import Node
 from .graph import Graph
-from .socket import Socket, SocketType
\ No newline at end of file
+from .group import GroupNode, iter_nodes, leaf_nodes, leaf_links, flat_topological_sort
+from .socket import Socket, SocketType
+from .types import DataTypeRegistry, data_types, INCOMPATIBLE, ASSIGNABLE, CONVERTIBLE
+from .blobs import BlobWriter, BlobReader
+from .hashing import ContentHashes, HashingBlobs, content_hash, diff_snapshots
+from .diff import GraphPatch, diff, diff_records, apply_patch
+from .compact import CompactGraph
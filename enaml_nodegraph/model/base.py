@@ -1,68 +1,196 @@
 import logging
+import weakref
+
+import numpy as np
 
 from atom.api import (Atom, Bool, Int, Float, Str, Str, Enum,
-                      List, Dict, ContainerList, Typed, Instance)
+                      List, Dict, ContainerList, Typed, Instance, Coerced)
+
+from .blobs import is_blob_ref
 
 log = logging.getLogger(__name__)
 
 
-def serialize(archive, member, value):
-    if isinstance(member, (Bool, Int, Float, Str, Str)):
-        archive[member.name] = value
-    # @todo only correct for simple types (Int, Bool, Float, Str, Str)
-    elif isinstance(member, (List, ContainerList)):
-        archive[member.name] = value
-    # @todo only correct for simple types (Int, Bool, Float, Str, Str)
-    elif isinstance(member, Dict):
-        archive[member.name] = value
-    elif isinstance(member, Enum):
-        archive[member.name] = value
-    elif isinstance(member, (Typed, Instance)):
-        log.warning("Cannot serialize Typed/Instance member: %s -> %s" % (member.name, type(member)))
-    else:
-        log.warning("Unknown member type: %s -> %s" % (member.name, type(member)))
+def _identity(value, blobs):
+    return value
+
+
+def _encode_array(value, blobs):
+    # arrays go to the blob file if there is one, inline as lists otherwise
+    if blobs is not None:
+        return blobs.put(value)
+    return np.asarray(value).tolist()
+
+
+def _decode_array(data, blobs):
+    if is_blob_ref(data):
+        if blobs is None:
+            raise ValueError("Cannot load an array attribute without the blob file")
+        return blobs.get(data)
+    return np.asarray(data)
+
+
+_PLAIN_CODEC = (_identity, _identity)
+
+#: type -> (encode, decode) for the values of Typed, Instance and Coerced members
+_codecs = {}
+
+#: Atom subclass -> compiled AtomSerializer
+_serializers = weakref.WeakKeyDictionary()
+
+
+def register_codec(kind, encode, decode):
+    """ Register how values of `kind` and its subclasses are stored in an archive.
+
+    `encode(value, blobs)` returns a JSON compatible value and `decode(data, blobs)`
+    converts it back, `blobs` is the BlobWriter or BlobReader if any.
 
+    """
+    _codecs[kind] = (encode, decode)
+    # serializers compiled before may have skipped members of this kind
+    _serializers.clear()
 
-def deserialize(archive, member):
 
-    if isinstance(member, (Bool, Int, Float, Str, Str)):
-        return archive[member.name]
-    # @todo only correct for simple types (Int, Bool, Float, Str, Str)
-    elif isinstance(member, (List, ContainerList)):
-        return archive[member.name]
-    # @todo only correct for simple types (Int, Bool, Float, Str, Str)
-    elif isinstance(member, Dict):
-        return archive[member.name]
-    elif isinstance(member, Enum):
-        return archive[member.name]
+register_codec(np.ndarray, _encode_array, _decode_array)
+for _kind in (bool, int, float, str, list, dict):
+    register_codec(_kind, _identity, _identity)
+
+
+def _atom_codec(kind):
+    def encode(value, blobs):
+        archive = {}
+        serializer_for(kind).serialize(value, archive, blobs)
+        return archive
+
+    def decode(data, blobs):
+        value = kind()
+        serializer_for(kind).deserialize(value, data, blobs)
+        return value
+    return encode, decode
+
+
+def _codec_for_kind(kinds):
+    if not isinstance(kinds, tuple):
+        kinds = (kinds,)
+    for kind in kinds:
+        for base in kind.__mro__:
+            if base in _codecs:
+                return _codecs[base]
+    for kind in kinds:
+        if issubclass(kind, Atom):
+            return _atom_codec(kind)
+    return None
+
+
+def member_codec(member):
+    """ Return the (encode, decode) functions for the values of `member`, or None
+    if it cannot be serialized.
+
+    """
+    if isinstance(member, (Bool, Int, Float, Str, Enum)):
+        return _PLAIN_CODEC
+    # @todo only correct for simple item types (Int, Bool, Float, Str, Str)
+    elif isinstance(member, (List, ContainerList, Dict)):
+        return _PLAIN_CODEC
+    elif isinstance(member, Coerced):
+        kinds = member.validate_mode[1][0]
+        codec = _codec_for_kind(kinds)
+        # assigning the archived value coerces it
+        return codec if codec is not None else _PLAIN_CODEC
     elif isinstance(member, (Typed, Instance)):
-        log.warning("Cannot serialize Typed/Instance member: %s -> %s" % (member.name, type(member)))
-    else:
-        log.warning("Unknown member type: %s -> %s" % (member.name, type(member)))
+        return _codec_for_kind(member.validate_mode[1])
     return None
 
 
+def serialize(archive, member, value, blobs=None):
+    codec = member_codec(member)
+    if codec is None:
+        log.warning("Cannot serialize member: %s -> %s" % (member.name, type(member)))
+    else:
+        archive[member.name] = value if value is None else codec[0](value, blobs)
+
+
+def deserialize(archive, member, blobs=None):
+    codec = member_codec(member)
+    if codec is None:
+        log.warning("Cannot deserialize member: %s -> %s" % (member.name, type(member)))
+        return None
+    data = archive[member.name]
+    return data if data is None else codec[1](data, blobs)
+
+
+class AtomSerializer(object):
+    """ Serializer for the members of an Atom class, compiled once per class.
+
+    The generated functions read and write each member directly, plain members
+    without any call and the others through their codec, so there is no per value
+    dispatch on the member type.
+
+    """
+    def __init__(self, cls):
+        namespace = {}
+        encode = ["def serialize(obj, archive, blobs):"]
+        decode = ["def deserialize(obj, archive, blobs):"]
+        for i, (name, member) in enumerate(cls.members().items()):
+            codec = member_codec(member)
+            if codec is None:
+                log.warning("Cannot serialize member: %s.%s -> %s" % (cls.__name__, name, type(member)))
+                continue
+            if codec is _PLAIN_CODEC:
+                encode.append("    archive[%r] = obj.%s" % (name, name))
+                decode.append("    if %r in archive:" % name)
+                decode.append("        obj.%s = archive[%r]" % (name, name))
+            else:
+                namespace['encode_%d' % i], namespace['decode_%d' % i] = codec
+                encode.append("    value = obj.%s" % name)
+                encode.append("    archive[%r] = value if value is None else encode_%d(value, blobs)" % (name, i))
+                decode.append("    if %r in archive:" % name)
+                decode.append("        value = archive[%r]" % name)
+                decode.append("        obj.%s = value if value is None else decode_%d(value, blobs)" % (name, i))
+        encode.append("    return archive")
+        decode.append("    return obj")
+        exec(compile("\n".join(encode + [""] + decode), "<%s serializer>" % cls.__name__, "exec"), namespace)
+        self.serialize = namespace['serialize']
+        self.deserialize = namespace['deserialize']
+
+
+def serializer_for(cls):
+    serializer = _serializers.get(cls)
+    if serializer is None:
+        serializer = _serializers[cls] = AtomSerializer(cls)
+    return serializer
+
+
 class Attributes(Atom):
 
-    def serialize(self, archive):
-        for name, member in self.members().items():
-            serialize(archive, member, getattr(self, name))
+    def serialize(self, archive, blobs=None):
+        serializer_for(type(self)).serialize(self, archive, blobs)
 
-    def deserialize(self, archive):
-        for name, member in self.members().items():
-            if name in archive:
-                setattr(self, name, deserialize(archive, member))
+    def deserialize(self, archive, blobs=None):
+        serializer_for(type(self)).deserialize(self, archive, blobs)
+
+    def reset(self, names):
+        """ Set the members `names` to their default values.
+
+        """
+        defaults = type(self)()
+        for name in names:
+            setattr(self, name, getattr(defaults, name))
 
 
 class GraphItem(Atom):
 
     attributes = Instance(Attributes)
 
-    def serialize(self, archive):
+    def serialize(self, archive, blobs=None):
+        """ Store the attributes in `archive`, array values go to the BlobWriter
+        `blobs` if given.
+
+        """
         if self.attributes is not None:
             attrs = archive.setdefault('attributes', {})
-            self.attributes.serialize(attrs)
+            self.attributes.serialize(attrs, blobs)
 
-    def deserialize(self, archive):
+    def deserialize(self, archive, blobs=None):
         if self.attributes is not None:
-            self.attributes.deserialize(archive.get('attributes', {}))
+            self.attributes.deserialize(archive.get('attributes', {}), blobs)
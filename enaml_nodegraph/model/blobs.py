@@ -0,0 +1,117 @@
+""" Side-car storage of array attribute values.
+
+Arrays are written back to back into a blob file, and the archive stores a
+reference with the offset, dtype and shape of the array instead of the values.
+On load the blob file is memory mapped, so the bytes of an array are only read
+from disk when the array is accessed.
+
+"""
+import os
+
+import numpy as np
+
+#: key identifying a blob reference in an archive
+BLOB_KEY = '$blob'
+
+#: suffix appended to the graph filename to get the blob filename
+BLOB_SUFFIX = '.blobs'
+
+_ALIGNMENT = 64
+
+
+def is_blob_ref(value):
+    return isinstance(value, dict) and BLOB_KEY in value
+
+
+class BlobWriter(object):
+    """ Writes arrays to a blob file.
+
+    The file is written to a temporary path and moved into place by `close`,
+    so arrays still mapped from the previous file remain valid.
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._tmp_path = path + '.tmp'
+        self._fp = open(self._tmp_path, 'wb')
+        self._offset = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+        return False
+
+    def put(self, array):
+        """ Append `array` to the file and return the reference to archive.
+
+        """
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise TypeError("Cannot store arrays of Python objects: %s" % array.dtype)
+        padding = -self._offset % _ALIGNMENT
+        if padding:
+            self._fp.write(b'\0' * padding)
+            self._offset += padding
+        ref = {BLOB_KEY: self._offset, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+        self._fp.write(array.data)
+        self._offset += array.nbytes
+        self.count += 1
+        return ref
+
+    def close(self):
+        """ Move the written file into place, or remove the blob file if no array was written.
+
+        """
+        self._fp.close()
+        if self.count:
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.remove(self._tmp_path)
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def discard(self):
+        self._fp.close()
+        os.remove(self._tmp_path)
+
+
+class BlobReader(object):
+    """ Resolves blob references to arrays backed by a memory mapping of the blob file.
+
+    The mapping is copy-on-write, changing an array in place does not modify the file.
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = np.memmap(self.path, dtype=np.uint8, mode='c')
+        return self._data
+
+    def get(self, ref):
+        dtype = np.dtype(ref['dtype'])
+        shape = tuple(ref['shape'])
+        nbytes = dtype.itemsize * int(np.prod(shape))
+        if nbytes == 0:
+            return np.empty(shape, dtype=dtype)
+        offset = ref[BLOB_KEY]
+        return self.data[offset:offset + nbytes].view(dtype).reshape(shape)
+
+
+def blob_reader_for(path):
+    """ Return a BlobReader for the blob file of the graph file `path`, or None if there is none.
+
+    """
+    blob_path = path + BLOB_SUFFIX
+    if os.path.exists(blob_path):
+        return BlobReader(blob_path)
+    return None
@@ -0,0 +1,415 @@
+""" A compact, array backed store of the topology of large graphs.
+
+Nodes, sockets and edges are integer indices into flat arrays instead of Atom
+objects. The sockets of a node are stored contiguously, edges reference their
+start and end sockets, and edges are indexed by start and end node in CSR form
+(an offsets array per node into an array of edge indices), so that adjacency
+queries and traversals are slices and vectorized NumPy operations.
+
+The store is append only. Lightweight views of single nodes, sockets and edges
+are created on demand, `to_graph` materializes a full model graph.
+
+"""
+from array import array
+
+import numpy as np
+
+from atom.api import Atom, Bool, Int, Property, Typed
+
+from .socket import Socket, SocketType
+from .node import Node
+from .edge import Edge
+from .graph import Graph
+from .types import data_types, INCOMPATIBLE
+
+
+def _concat_ranges(starts, ends):
+    """ Return the concatenation of the ranges [starts[i], ends[i]).
+
+    """
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.intp)
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(total)
+
+
+def _csr(keys, n):
+    """ Return (offsets, order), the indices of `keys` grouped by key in [0, n).
+
+    """
+    order = np.argsort(keys, kind='stable')
+    offsets = np.zeros(n + 1, dtype=np.intp)
+    np.cumsum(np.bincount(keys, minlength=n), out=offsets[1:])
+    return offsets, order
+
+
+class CompactGraph(Atom):
+    """ The topology of a graph as integer arrays.
+
+    """
+    #: node index -> id, name and index into `type_names`
+    _node_ids = Typed(list, ())
+    _node_names = Typed(list, ())
+    _node_types = Typed(array, ('i',))
+    _node_index = Typed(dict, ())
+
+    #: node index -> index of its first socket, plus the total socket count
+    _socket_offsets = Typed(array, ('i', [0]))
+
+    #: socket index -> node, SocketType, index into `names` and into `data_types`
+    _socket_node = Typed(array, ('i',))
+    _socket_kind = Typed(array, ('b',))
+    _socket_name = Typed(array, ('i',))
+    _socket_data_type = Typed(array, ('i',))
+
+    #: edge index -> id, start socket and end socket
+    _edge_ids = Typed(list, ())
+    _edge_source = Typed(array, ('i',))
+    _edge_target = Typed(array, ('i',))
+    _edge_index = Typed(dict, ())
+
+    #: interned strings
+    type_names = Typed(list, ())
+    names = Typed(list, ())
+    data_types = Typed(list, ())
+    _interned = Typed(dict, ())
+
+    node_count = Property(lambda self: len(self._node_ids))
+    socket_count = Property(lambda self: len(self._socket_node))
+    edge_count = Property(lambda self: len(self._edge_ids))
+
+    #: NumPy copies of the arrays, rebuilt after the store changed
+    socket_offsets = Property(lambda self: self._array(self._socket_offsets, np.intp), cached=True)
+    socket_node = Property(lambda self: self._array(self._socket_node, np.intp), cached=True)
+    socket_kind = Property(lambda self: self._array(self._socket_kind, np.int8), cached=True)
+    edge_source = Property(lambda self: self._array(self._edge_source, np.intp), cached=True)
+    edge_target = Property(lambda self: self._array(self._edge_target, np.intp), cached=True)
+    edge_source_node = Property(lambda self: self.socket_node[self.edge_source], cached=True)
+    edge_target_node = Property(lambda self: self.socket_node[self.edge_target], cached=True)
+
+    #: (offsets, edge indices) of the outgoing and incoming edges of every node
+    out_csr = Property(lambda self: _csr(self.edge_source_node, self.node_count), cached=True)
+    in_csr = Property(lambda self: _csr(self.edge_target_node, self.node_count), cached=True)
+
+    #: whether any of the cached arrays was computed since the last change
+    _cached = Bool()
+
+    _CACHED = ('socket_offsets', 'socket_node', 'socket_kind', 'edge_source', 'edge_target',
+               'edge_source_node', 'edge_target_node', 'out_csr', 'in_csr')
+
+    @classmethod
+    def from_graph(cls, graph):
+        """ Return the topology of the model `graph`, open edges are skipped.
+
+        """
+        compact = cls()
+        for node in graph.nodes:
+            compact.add_node(node.id,
+                             [(s.name, s.data_type) for s in node.inputs],
+                             [(s.name, s.data_type) for s in node.outputs],
+                             name=node.name, type_name=type(node).__name__)
+        for edge in graph.edges:
+            if edge.is_open:
+                continue
+            start, end = edge.start_socket, edge.end_socket
+            compact.add_edge(edge.id, start.node.id, start.name, end.node.id, end.name)
+        return compact
+
+    def to_graph(self):
+        """ Return a model Graph of plain nodes, sockets and edges with this topology.
+
+        """
+        nodes = []
+        sockets = []
+        offsets = self._socket_offsets
+        for i, node_id in enumerate(self._node_ids):
+            node_sockets = [Socket(name=self.names[self._socket_name[s]],
+                                   data_type=self.data_types[self._socket_data_type[s]])
+                            for s in range(offsets[i], offsets[i + 1])]
+            kinds = self._socket_kind[offsets[i]:offsets[i + 1]]
+            nodes.append(Node(id=node_id, name=self._node_names[i],
+                              inputs=[s for s, k in zip(node_sockets, kinds) if k == SocketType.INPUT],
+                              outputs=[s for s, k in zip(node_sockets, kinds) if k == SocketType.OUTPUT]))
+            sockets.extend(node_sockets)
+        edges = [Edge(id=edge_id, start_socket=sockets[self._edge_source[i]], end_socket=sockets[self._edge_target[i]])
+                 for i, edge_id in enumerate(self._edge_ids)]
+        return Graph(nodes=nodes, edges=edges)
+
+    def _intern(self, table, value):
+        """ Return the index of the string `value` in `table`, one of
+        type_names, names or data_types.
+
+        """
+        key = (id(table), value)
+        index = self._interned.get(key)
+        if index is None:
+            index = self._interned[key] = len(table)
+            table.append(value)
+        return index
+
+    def add_node(self, node_id, inputs=(), outputs=(), name='', type_name=''):
+        """ Add a node and return its index.
+
+        `inputs` and `outputs` are socket names or (name, data_type) pairs.
+
+        """
+        if node_id in self._node_index:
+            raise ValueError("Node already contained in graph")
+        index = len(self._node_ids)
+        self._node_index[node_id] = index
+        self._node_ids.append(node_id)
+        self._node_names.append(name)
+        self._node_types.append(self._intern(self.type_names, type_name))
+        for kind, sockets in ((SocketType.INPUT, inputs), (SocketType.OUTPUT, outputs)):
+            for socket in sockets:
+                socket_name, data_type = (socket, '') if isinstance(socket, str) else socket
+                self._socket_node.append(index)
+                self._socket_kind.append(kind)
+                self._socket_name.append(self._intern(self.names, socket_name))
+                self._socket_data_type.append(self._intern(self.data_types, data_type))
+        self._socket_offsets.append(len(self._socket_node))
+        self._changed()
+        return index
+
+    def add_edge(self, edge_id, source, source_socket, target, target_socket):
+        """ Add an edge from the output `source_socket` of the node `source` to
+        the input `target_socket` of `target` and return its index.
+
+        """
+        if edge_id in self._edge_index:
+            raise ValueError("Edge already contained in graph")
+        start = self.socket_index(source, source_socket, SocketType.OUTPUT)
+        end = self.socket_index(target, target_socket, SocketType.INPUT)
+        source_type = data_types.id(self.data_types[self._socket_data_type[start]])
+        target_type = data_types.id(self.data_types[self._socket_data_type[end]])
+        if data_types.compatibility(source_type, target_type) == INCOMPATIBLE:
+            raise TypeError("Incompatible type for connection - %s->%s" %
+                            (self.data_types[self._socket_data_type[start]],
+                             self.data_types[self._socket_data_type[end]]))
+        index = len(self._edge_ids)
+        self._edge_index[edge_id] = index
+        self._edge_ids.append(edge_id)
+        self._edge_source.append(start)
+        self._edge_target.append(end)
+        self._changed()
+        return index
+
+    def node_index(self, key):
+        """ Return the index of the node with id `key`, indices are returned as is.
+
+        """
+        return key if isinstance(key, (int, np.integer)) else self._node_index[key]
+
+    def edge_index(self, key):
+        return key if isinstance(key, (int, np.integer)) else self._edge_index[key]
+
+    def socket_index(self, node, name, socket_type):
+        """ Return the index of the socket `name` of the given type of `node`.
+
+        """
+        i = self.node_index(node)
+        name_index = self._interned.get((id(self.names), name))
+        for s in range(self._socket_offsets[i], self._socket_offsets[i + 1]):
+            if self._socket_name[s] == name_index and self._socket_kind[s] == socket_type:
+                return s
+        raise KeyError("Node %s has no socket %s" % (self._node_ids[i], name))
+
+    def node(self, key):
+        return NodeView(store=self, index=int(self.node_index(key)))
+
+    def edge(self, key):
+        return EdgeView(store=self, index=int(self.edge_index(key)))
+
+    def nodes(self):
+        return [NodeView(store=self, index=i) for i in range(self.node_count)]
+
+    def node_ids(self, indices):
+        """ Return the ids of the nodes with the given indices.
+
+        """
+        ids = self._node_ids
+        return [ids[i] for i in indices]
+
+    def out_degree(self):
+        return np.diff(self.out_csr[0])
+
+    def in_degree(self):
+        return np.diff(self.in_csr[0])
+
+    def out_edges(self, node):
+        offsets, order = self.out_csr
+        i = self.node_index(node)
+        return order[offsets[i]:offsets[i + 1]]
+
+    def in_edges(self, node):
+        offsets, order = self.in_csr
+        i = self.node_index(node)
+        return order[offsets[i]:offsets[i + 1]]
+
+    def successors(self, node):
+        """ Return the indices of the nodes `node` has edges to, once per edge.
+
+        """
+        return self.edge_target_node[self.out_edges(node)]
+
+    def predecessors(self, node):
+        return self.edge_source_node[self.in_edges(node)]
+
+    def levels(self):
+        """ Return the nodes as a list of index arrays where every node only
+        depends on nodes of earlier levels.
+
+        Raises ValueError if the graph contains a cycle.
+
+        """
+        offsets, order = self.out_csr
+        targets = self.edge_target_node
+        in_degree = self.in_degree()
+        frontier = np.flatnonzero(in_degree == 0)
+        result = []
+        count = 0
+        while frontier.size:
+            result.append(frontier)
+            count += frontier.size
+            reached = targets[order[_concat_ranges(offsets[frontier], offsets[frontier + 1])]]
+            in_degree -= np.bincount(reached, minlength=self.node_count)
+            reached = np.unique(reached)
+            frontier = reached[in_degree[reached] == 0]
+        if count != self.node_count:
+            raise ValueError("Graph contains a cycle")
+        return result
+
+    def topological_order(self):
+        """ Return the node indices ordered such that every edge points from an
+        earlier to a later node.
+
+        Raises ValueError if the graph contains a cycle.
+
+        """
+        levels = self.levels()
+        return np.concatenate(levels) if levels else np.empty(0, dtype=np.intp)
+
+    def downstream(self, nodes):
+        """ Return the sorted indices of `nodes` and of all nodes reachable from them.
+
+        """
+        offsets, order = self.out_csr
+        targets = self.edge_target_node
+        visited = np.zeros(self.node_count, dtype=bool)
+        frontier = np.unique(np.asarray([self.node_index(n) for n in nodes], dtype=np.intp))
+        while frontier.size:
+            visited[frontier] = True
+            reached = np.unique(targets[order[_concat_ranges(offsets[frontier], offsets[frontier + 1])]])
+            frontier = reached[~visited[reached]]
+        return np.flatnonzero(visited)
+
+    def _array(self, values, dtype):
+        self._cached = True
+        return np.asarray(values, dtype=dtype)
+
+    def _changed(self):
+        if self._cached:
+            for name in self._CACHED:
+                self.get_member(name).reset(self)
+            self._cached = False
+
+
+class NodeView(Atom):
+    """ A node of a CompactGraph.
+
+    """
+    store = Typed(CompactGraph)
+    index = Int()
+
+    @property
+    def id(self):
+        return self.store._node_ids[self.index]
+
+    @property
+    def name(self):
+        return self.store._node_names[self.index]
+
+    @property
+    def type_name(self):
+        return self.store.type_names[self.store._node_types[self.index]]
+
+    @property
+    def sockets(self):
+        offsets = self.store._socket_offsets
+        return [SocketView(store=self.store, index=s) for s in range(offsets[self.index], offsets[self.index + 1])]
+
+    @property
+    def inputs(self):
+        return [s for s in self.sockets if s.socket_type == SocketType.INPUT]
+
+    @property
+    def outputs(self):
+        return [s for s in self.sockets if s.socket_type == SocketType.OUTPUT]
+
+    @property
+    def input_dict(self):
+        return {s.name: s for s in self.inputs}
+
+    @property
+    def output_dict(self):
+        return {s.name: s for s in self.outputs}
+
+    @property
+    def in_edges(self):
+        return [EdgeView(store=self.store, index=e) for e in self.store.in_edges(self.index).tolist()]
+
+    @property
+    def out_edges(self):
+        return [EdgeView(store=self.store, index=e) for e in self.store.out_edges(self.index).tolist()]
+
+
+class SocketView(Atom):
+    """ A socket of a CompactGraph.
+
+    """
+    store = Typed(CompactGraph)
+    index = Int()
+
+    @property
+    def name(self):
+        return self.store.names[self.store._socket_name[self.index]]
+
+    @property
+    def data_type(self):
+        return self.store.data_types[self.store._socket_data_type[self.index]]
+
+    @property
+    def socket_type(self):
+        return SocketType(self.store._socket_kind[self.index])
+
+    @property
+    def node(self):
+        return NodeView(store=self.store, index=self.store._socket_node[self.index])
+
+    @property
+    def edges(self):
+        store = self.store
+        endpoints = store.edge_source if self.socket_type == SocketType.OUTPUT else store.edge_target
+        return [EdgeView(store=store, index=e) for e in np.flatnonzero(endpoints == self.index).tolist()]
+
+
+class EdgeView(Atom):
+    """ An edge of a CompactGraph.
+
+    """
+    store = Typed(CompactGraph)
+    index = Int()
+
+    @property
+    def id(self):
+        return self.store._edge_ids[self.index]
+
+    @property
+    def start_socket(self):
+        return SocketView(store=self.store, index=self.store._edge_source[self.index])
+
+    @property
+    def end_socket(self):
+        return SocketView(store=self.store, index=self.store._edge_target[self.index])
@@ -0,0 +1,185 @@
+""" Structural differences between graphs.
+
+Graphs are compared as records keyed by item id, as produced by `graph_records`
+for model graphs or by a controller for graphs with view state. A record is a
+dict of archived values, the 'attributes' of changed items are compared key by
+key. Keys missing from one of the records count as changed.
+
+"""
+from atom.api import Atom, Dict, List
+
+from .edge import Edge
+
+#: keys whose change replaces the item instead of updating it, groups are
+#: replaced together with their contents
+NODE_REPLACE_KEYS = ('type', 'type_name', 'subgraph', 'exposed_inputs', 'exposed_outputs')
+EDGE_REPLACE_KEYS = ('type', 'type_name', 'source', 'target', 'source_socket', 'target_socket')
+
+
+class GraphPatch(Atom):
+    """ The changes turning one graph into another.
+
+    """
+    #: id -> record of the nodes to create, in the order of the new graph
+    added_nodes = Dict()
+
+    #: ids of the nodes to remove
+    removed_nodes = List()
+
+    #: id -> changed values; 'attributes' holds only the changed attributes and
+    #: 'reset_attributes' the names of the attributes missing from the new
+    #: record, other keys missing from the new record map to None
+    changed_nodes = Dict()
+
+    added_edges = Dict()
+    removed_edges = List()
+    changed_edges = Dict()
+
+    @property
+    def is_empty(self):
+        return not (self.added_nodes or self.removed_nodes or self.changed_nodes or
+                    self.added_edges or self.removed_edges or self.changed_edges)
+
+
+def _type_name(item):
+    cls = type(item)
+    return '%s.%s' % (cls.__module__, cls.__qualname__)
+
+
+def node_record(node):
+    record = {'id': node.id, 'name': node.name, 'type': _type_name(node)}
+    node.serialize(record)
+    return record
+
+
+def edge_record(edge):
+    record = {'id': edge.id, 'type': _type_name(edge),
+              'source': edge.start_socket.node.id, 'source_socket': edge.start_socket.name,
+              'target': edge.end_socket.node.id, 'target_socket': edge.end_socket.name}
+    edge.serialize(record)
+    return record
+
+
+def graph_records(graph):
+    """ Return the records of the nodes and connected edges of a model graph.
+
+    """
+    return {'nodes': {node.id: node_record(node) for node in graph.nodes},
+            'links': {edge.id: edge_record(edge) for edge in graph.edges if not edge.is_open}}
+
+
+def _record_changes(old, new):
+    changes = {}
+    for key, value in new.items():
+        if key == 'attributes':
+            old_attributes = old.get('attributes', {})
+            changed = {name: v for name, v in value.items()
+                       if name not in old_attributes or old_attributes[name] != v}
+            if changed:
+                changes['attributes'] = changed
+        elif key not in old or old[key] != value:
+            changes[key] = value
+    for key in old:
+        if key not in new and key != 'attributes':
+            changes[key] = None
+    reset = [name for name in old.get('attributes', {}) if name not in new.get('attributes', {})]
+    if reset:
+        changes['reset_attributes'] = reset
+    return changes
+
+
+def _diff_items(old, new, replace_keys):
+    added, removed, changed = {}, [], {}
+    for item_id, old_record in old.items():
+        if item_id not in new:
+            removed.append(item_id)
+    for item_id, record in new.items():
+        old_record = old.get(item_id)
+        if old_record is None:
+            added[item_id] = record
+            continue
+        changes = _record_changes(old_record, record)
+        if any(key in changes for key in replace_keys):
+            removed.append(item_id)
+            added[item_id] = record
+        elif changes:
+            changed[item_id] = changes
+    return added, removed, changed
+
+
+def diff_records(old, new):
+    """ Return the GraphPatch from the records `old` to `new`, each a dict with
+    'nodes' and 'links' mapping ids to records.
+
+    Edges of replaced nodes are replaced as well.
+
+    """
+    patch = GraphPatch()
+    patch.added_nodes, patch.removed_nodes, patch.changed_nodes = \
+        _diff_items(old.get('nodes', {}), new.get('nodes', {}), NODE_REPLACE_KEYS)
+    added, removed, changed = _diff_items(old.get('links', {}), new.get('links', {}), EDGE_REPLACE_KEYS)
+
+    replaced = set(patch.removed_nodes).intersection(patch.added_nodes)
+    if replaced:
+        for edge_id, record in new.get('links', {}).items():
+            if edge_id not in added and (record['source'] in replaced or record['target'] in replaced):
+                if edge_id in old.get('links', {}):
+                    removed.append(edge_id)
+                added[edge_id] = record
+                changed.pop(edge_id, None)
+    patch.added_edges, patch.removed_edges, patch.changed_edges = added, removed, changed
+    return patch
+
+
+def diff(graph_a, graph_b):
+    """ Return the GraphPatch that turns the model graph `graph_a` into `graph_b`.
+
+    """
+    return diff_records(graph_records(graph_a), graph_records(graph_b))
+
+
+def apply_patch(graph, patch, node_factory, edge_factory=None):
+    """ Apply `patch` to the model `graph`.
+
+    `node_factory(record)` returns the node for an added node record and
+    `edge_factory(record)` the edge for an added edge record, a plain Edge by
+    default. Ids, names and attributes are set from the records.
+
+    """
+    edge_dict = graph.edge_dict
+    for edge_id in patch.removed_edges:
+        graph.delete_edge(edge_dict[edge_id])
+    node_dict = graph.node_dict
+    for node_id in patch.removed_nodes:
+        graph.delete_node(node_dict[node_id])
+
+    node_dict = graph.node_dict
+    for node_id, changes in patch.changed_nodes.items():
+        node = node_dict[node_id]
+        if 'name' in changes:
+            node.name = changes['name'] or ''
+        if 'attributes' in changes:
+            node.deserialize(changes)
+        if 'reset_attributes' in changes:
+            node.attributes.reset(changes['reset_attributes'])
+    for record in patch.added_nodes.values():
+        node = node_factory(record)
+        node.id = record['id']
+        node.name = record.get('name', '')
+        node.deserialize(record)
+        graph.add_node(node)
+
+    edge_dict = graph.edge_dict
+    for edge_id, changes in patch.changed_edges.items():
+        if 'attributes' in changes:
+            edge_dict[edge_id].deserialize(changes)
+        if 'reset_attributes' in changes:
+            edge_dict[edge_id].attributes.reset(changes['reset_attributes'])
+    node_dict = graph.node_dict
+    for record in patch.added_edges.values():
+        edge = edge_factory(record) if edge_factory is not None else Edge()
+        edge.id = record['id']
+        edge.start_socket = node_dict[record['source']].output_dict[record['source_socket']]
+        edge.end_socket = node_dict[record['target']].input_dict[record['target_socket']]
+        edge.deserialize(record)
+        graph.add_edge(edge)
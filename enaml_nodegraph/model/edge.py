@@ -3,6 +3,7 @@ from atom.api import Str, ForwardInstance, Typed
 from enum import IntEnum
 
 from .base import GraphItem
+from .types import data_types, INCOMPATIBLE
 
 log = logging.getLogger(__name__)
 
@@ -38,9 +39,12 @@ class Edge(GraphItem):
             s = change['oldvalue']
             if self in s.edges:
                 s.edges.remove(self)
+        if self.graph is not None:
+            self.graph.edge_changed(self)
         if change['value'] is not None:
             change['value'].edges.append(self)
-            if self.end_socket is not None and change['value'].data_type != self.end_socket.data_type:
+            if self.end_socket is not None and \
+                    data_types.compatibility(change['value'].type_id, self.end_socket.type_id) == INCOMPATIBLE:
                 raise TypeError("Incompatible type for connection - %s->%s" % (change['value'].data_type, self.end_socket.data_type))
 
     def _observe_end_socket(self, change):
@@ -48,11 +52,28 @@ class Edge(GraphItem):
             s = change['oldvalue']
             if self in s.edges:
                 s.edges.remove(self)
+        if self.graph is not None:
+            self.graph.edge_changed(self)
         if change['value'] is not None:
             change['value'].edges.append(self)
-            if self.start_socket is not None and change['value'].data_type != self.start_socket.data_type:
+            if self.start_socket is not None and \
+                    data_types.compatibility(self.start_socket.type_id, change['value'].type_id) == INCOMPATIBLE:
                 raise TypeError("Incompatible type for connection - %s->%s" % (self.start_socket.data_type, change['value'].data_type))
 
+    @property
+    def converter(self):
+        """ The conversion applied to values passed along the edge, None if the
+        end socket accepts the values as they are.
+
+        """
+        if self.is_open:
+            return None
+        return data_types.converter(self.start_socket.type_id, self.end_socket.type_id)
+
+    @property
+    def type_id(self):
+        return data_types.id(self.data_type)
+
     @property
     def data_type(self):
         return getattr(self.start_socket, "data_type", getattr(self.end_socket, "data_type", ""))
@@ -1,8 +1,39 @@
-from atom.api import Dict, Str, Property, ContainerList
+from collections import deque
+
+from atom.api import Bool, Dict, Int, Str, Property, ContainerList, Typed, ForwardTyped
 
 from .base import GraphItem
 from .node import Node
 from .edge import Edge
+from .types import data_types, INCOMPATIBLE
+
+
+def import_group_type():
+    from .group import GroupNode
+    return GroupNode
+
+
+def _container_items(change):
+    """ Return the (added, removed) items of a list change, or None if all items
+    have to be considered changed.
+
+    """
+    if change['type'] != 'container':
+        return None
+    operation = change['operation']
+    if operation in ('append', 'insert'):
+        return [change['item']], []
+    if operation in ('extend', '__iadd__'):
+        return change['items'], []
+    if operation in ('remove', 'pop', '__delitem__'):
+        item = change['item']
+        return [], item if isinstance(item, list) else [item]
+    if operation == '__setitem__':
+        old, new = change['olditem'], change['newitem']
+        return new if isinstance(new, list) else [new], old if isinstance(old, list) else [old]
+    if operation in ('sort', 'reverse'):
+        return [], []
+    return None
 
 
 class Graph(GraphItem):
@@ -12,37 +43,163 @@ class Graph(GraphItem):
     nodes = ContainerList(Node)
     edges = ContainerList(Edge)
 
+    #: the group node containing the graph, None for a top level graph
+    group = ForwardTyped(import_group_type)
+
+    #: the top level graph containing the graph
+    root = Property(lambda self: self._get_root())
+
     node_dict = Property(lambda self: self._mk_node_dict(), cached=True)
     edge_dict = Property(lambda self: self._mk_edge_dict(), cached=True)
 
+    #: node -> position in nodes, indexes the visited arrays of traversals
+    node_index = Property(lambda self: {v: i for i, v in enumerate(self.nodes)}, cached=True)
+
+    #: node -> {adjacent node: number of edges}, maintained as edges are added,
+    #: removed and reconnected
+    _successors = Typed(dict, ())
+    _predecessors = Typed(dict, ())
+
+    #: connected edge -> (start node, end node) it is counted for
+    _edge_nodes = Typed(dict, ())
+
+    #: node -> rank in a topological order kept up to date as edges are added
+    #: (Pearce-Kelly), valid unless `_order_valid` is False
+    _order = Typed(dict, ())
+    _order_valid = Bool(True)
+    _next_rank = Int()
+
+    #: the order could not be rebuilt because of a cycle, no edge was removed since
+    _order_cyclic = Bool(False)
+
+    #: data type id -> input sockets of the nodes of the graph, as an ordered set
+    _inputs_by_type = Typed(dict, ())
+
+    #: node -> the input sockets it is indexed with
+    _indexed_inputs = Typed(dict, ())
+
     def _observe_nodes(self, change):
-        if change['type'] == 'create':
+        items = _container_items(change)
+        if items is None:
+            for n in change.get('oldvalue') or ():
+                n.graph = None
+            self._inputs_by_type.clear()
+            self._indexed_inputs.clear()
             for n in change['value']:
                 n.graph = self
-        elif change['type'] == 'container':
-            if change['operation'] == 'append':
-                change['item'].graph = self
-            elif change['operation'] == 'remove':
-                change['item'].graph = None
+                self._index_inputs(n)
+            self._order_valid = False
+        else:
+            added, removed = items
+            order = self._order
+            for n in removed:
+                n.graph = None
+                order.pop(n, None)
+                self._unindex_inputs(n)
+            for n in added:
+                n.graph = self
+                self._index_inputs(n)
+                if n not in order:
+                    order[n] = self._next_rank
+                    self._next_rank += 1
+                    if n in self._successors or n in self._predecessors:
+                        # edges were connected to the node before it was added
+                        self._order_valid = False
         self.get_member("node_dict").reset(self)
+        self.get_member("node_index").reset(self)
+
+    def _get_root(self):
+        graph = self
+        while graph.group is not None and graph.group.graph is not None:
+            graph = graph.group.graph
+        return graph
 
     def _mk_node_dict(self):
         return {v.id: v for v in self.nodes}
 
     def _observe_edges(self, change):
-        if change['type'] == 'create':
+        items = _container_items(change)
+        if items is None:
+            for n in change.get('oldvalue') or ():
+                n.graph = None
+            self._successors.clear()
+            self._predecessors.clear()
+            self._edge_nodes.clear()
+            self._order_valid = False
+            self._order_cyclic = False
             for n in change['value']:
                 n.graph = self
-        elif change['type'] == 'container':
-            if change['operation'] == 'append':
-                change['item'].graph = self
-            elif change['operation'] == 'remove':
-                change['item'].graph = None
+                self._link_edge(n)
+        else:
+            added, removed = items
+            for n in removed:
+                n.graph = None
+                self._unlink_edge(n)
+            for n in added:
+                n.graph = self
+                self._link_edge(n)
         self.get_member("edge_dict").reset(self)
 
     def _mk_edge_dict(self):
         return {v.id: v for v in self.edges}
 
+    def _link_edge(self, edge):
+        if edge.is_open or edge in self._edge_nodes:
+            return
+        start, end = edge.start_socket.node, edge.end_socket.node
+        self._edge_nodes[edge] = (start, end)
+        successors = self._successors.setdefault(start, {})
+        successors[end] = successors.get(end, 0) + 1
+        predecessors = self._predecessors.setdefault(end, {})
+        predecessors[start] = predecessors.get(start, 0) + 1
+        if self._order_valid:
+            self._reorder(start, end)
+
+    def _unlink_edge(self, edge):
+        nodes = self._edge_nodes.pop(edge, None)
+        if nodes is None:
+            return
+        start, end = nodes
+        for adjacency, a, b in ((self._successors, start, end), (self._predecessors, end, start)):
+            counts = adjacency[a]
+            if counts[b] == 1:
+                del counts[b]
+                if not counts:
+                    del adjacency[a]
+            else:
+                counts[b] -= 1
+        self._order_cyclic = False
+
+    def _index_inputs(self, node):
+        by_type = self._inputs_by_type
+        for socket in node.inputs:
+            by_type.setdefault(socket.type_id, {})[socket] = None
+        self._indexed_inputs[node] = list(node.inputs)
+
+    def _unindex_inputs(self, node):
+        by_type = self._inputs_by_type
+        for socket in self._indexed_inputs.pop(node, ()):
+            sockets = by_type.get(socket.type_id)
+            if sockets is not None:
+                sockets.pop(socket, None)
+                if not sockets:
+                    del by_type[socket.type_id]
+
+    def sockets_changed(self, node):
+        """ Update the socket index after the inputs of a contained `node` changed.
+
+        """
+        if node in self._indexed_inputs:
+            self._unindex_inputs(node)
+            self._index_inputs(node)
+
+    def edge_changed(self, edge):
+        """ Update the adjacency after the sockets of a contained `edge` changed.
+
+        """
+        self._unlink_edge(edge)
+        self._link_edge(edge)
+
     def add_node(self, node):
         if node not in self.nodes:
             self.nodes.append(node)
@@ -72,3 +229,219 @@ class Graph(GraphItem):
             self.get_member("edge_dict").reset(self)
         else:
             raise KeyError("Edge not contained in graph")
+
+    def clear(self):
+        """ Remove all nodes and edges in one step.
+
+        """
+        for edge in self.edges:
+            edge.graph = None
+        for node in self.nodes:
+            node.graph = None
+        self.edges = []
+        self.nodes = []
+
+    def successors(self, node):
+        """ Return the nodes `node` has edges to, each once.
+
+        """
+        return list(self._successors.get(node, ()))
+
+    def predecessors(self, node):
+        """ Return the nodes with edges to `node`, each once.
+
+        """
+        return list(self._predecessors.get(node, ()))
+
+    def downstream(self, nodes, inclusive=False):
+        """ Return the nodes reachable from `nodes`, a node or a list of nodes,
+        in breadth first order.
+
+        """
+        return self._traverse(nodes, self._successors, inclusive)
+
+    def upstream(self, nodes, inclusive=False):
+        """ Return the nodes from which `nodes`, a node or a list of nodes, can
+        be reached, in breadth first order.
+
+        """
+        return self._traverse(nodes, self._predecessors, inclusive)
+
+    def reachable(self, start, end):
+        """ Return True if there is a path from node `start` to node `end`, or if
+        both are the same node.
+
+        """
+        if start is end:
+            return True
+        index = self.node_index
+        if start not in index or end not in index:
+            return False
+        adjacency = self._successors
+        visited = bytearray(len(index))
+        visited[index[start]] = 1
+        stack = [start]
+        while stack:
+            for successor in adjacency.get(stack.pop(), ()):
+                if successor is end:
+                    return True
+                i = index.get(successor)
+                if i is not None and not visited[i]:
+                    visited[i] = 1
+                    stack.append(successor)
+        return False
+
+    def input_sockets(self, data_type):
+        """ Return the input sockets of the given data type.
+
+        """
+        return list(self._inputs_by_type.get(data_types.id(data_type), ()))
+
+    def compatible_inputs(self, socket):
+        """ Return the input sockets a new edge from the output `socket` can be
+        connected to: of a data type that accepts or converts the socket's
+        values, with a free slot and on nodes that are not upstream of the
+        socket's node.
+
+        """
+        source_id = socket.type_id
+        candidates = [sockets for type_id, sockets in self._inputs_by_type.items()
+                      if data_types.compatibility(source_id, type_id) != INCOMPATIBLE]
+        if not candidates:
+            return []
+        upstream = set(self.upstream(socket.node, inclusive=True))
+        upstream.add(socket.node)
+        return [s for sockets in candidates for s in sockets
+                if s.node not in upstream and (s.degree == 0 or len(s.edges) < s.degree)]
+
+    def would_create_cycle(self, start, end):
+        """ Return True if an edge from node `start` to node `end` would close a cycle.
+
+        Only the nodes ranked between `end` and `start` in the maintained
+        topological order are searched, an edge along the order is accepted
+        immediately.
+
+        """
+        if start is end:
+            return True
+        if not self._ensure_order():
+            return self.reachable(end, start)
+        order = self._order
+        rank = order.get(start)
+        end_rank = order.get(end)
+        if rank is None or end_rank is None or rank < end_rank:
+            return False
+        return self._search(end, self._successors, lambda r: r < rank, start) is None
+
+    def _ensure_order(self):
+        """ Rebuild the order if necessary, return False if the graph contains a cycle.
+
+        """
+        if self._order_valid:
+            return True
+        if self._order_cyclic:
+            return False
+        try:
+            nodes = self.topological_sort()
+        except ValueError:
+            self._order_cyclic = True
+            return False
+        self._order = {node: i for i, node in enumerate(nodes)}
+        self._next_rank = len(nodes)
+        self._order_valid = True
+        return True
+
+    def _search(self, node, adjacency, in_range, target=None):
+        """ Return the nodes reachable from `node` whose rank is `in_range`, or
+        None if `target` is reached.
+
+        """
+        order = self._order
+        visited = {node}
+        stack = [node]
+        while stack:
+            for adjacent in adjacency.get(stack.pop(), ()):
+                if adjacent is target:
+                    return None
+                if adjacent not in visited:
+                    rank = order.get(adjacent)
+                    if rank is not None and in_range(rank):
+                        visited.add(adjacent)
+                        stack.append(adjacent)
+        return visited
+
+    def _reorder(self, start, end):
+        """ Restore the topological order after an edge from `start` to `end` was added.
+
+        """
+        order = self._order
+        upper = order.get(start)
+        lower = order.get(end)
+        if upper is None or lower is None or upper < lower:
+            return
+        forward = self._search(end, self._successors, lambda r: r < upper, start) if start is not end else None
+        if forward is None:
+            self._order_valid = False
+            self._order_cyclic = True
+            return
+        backward = self._search(start, self._predecessors, lambda r: r > lower)
+        forward = sorted(forward, key=order.get)
+        backward = sorted(backward, key=order.get)
+        ranks = sorted(order[node] for node in forward + backward)
+        for node, rank in zip(backward + forward, ranks):
+            order[node] = rank
+
+    def _traverse(self, nodes, adjacency, inclusive):
+        if isinstance(nodes, Node):
+            nodes = [nodes]
+        index = self.node_index
+        visited = bytearray(len(index))
+        result = []
+        queue = deque()
+        for node in nodes:
+            i = index.get(node)
+            if i is not None and not visited[i]:
+                visited[i] = 1
+                queue.append(node)
+                if inclusive:
+                    result.append(node)
+        while queue:
+            for adjacent in adjacency.get(queue.popleft(), ()):
+                i = index.get(adjacent)
+                if i is not None and not visited[i]:
+                    visited[i] = 1
+                    queue.append(adjacent)
+                    result.append(adjacent)
+        return result
+
+    def topological_sort(self):
+        """ Return the nodes ordered such that every edge points from an earlier to a later node.
+
+        Raises ValueError if the graph contains a cycle.
+
+        """
+        index = self.node_index
+        predecessors = self._predecessors
+        in_degree = [0] * len(index)
+        for node, i in index.items():
+            for predecessor, count in predecessors.get(node, {}).items():
+                if predecessor in index:
+                    in_degree[i] += count
+
+        ready = deque(node for node in self.nodes if in_degree[index[node]] == 0)
+        successors = self._successors
+        result = []
+        while ready:
+            node = ready.popleft()
+            result.append(node)
+            for successor, count in successors.get(node, {}).items():
+                i = index.get(successor)
+                if i is None:
+                    continue
+                in_degree[i] -= count
+                if in_degree[i] == 0:
+                    ready.append(successor)
+
+        if len(result) != len(self.nodes):
+            raise ValueError("Graph contains a cycle")
+        return result
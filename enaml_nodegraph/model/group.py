@@ -0,0 +1,182 @@
+from collections import deque
+
+from atom.api import Dict, Typed
+
+from .graph import Graph
+from .node import Node
+from .socket import Socket, SocketType
+
+
+class GroupNode(Node):
+    """ A node containing a nested graph.
+
+    Sockets of inner nodes are exposed as sockets of the group: the values an
+    exposed input receives go to the inner input sockets it maps to, an exposed
+    output provides the values of one inner output socket.
+
+    """
+    subgraph = Typed(Graph)
+
+    #: exposed input name -> inner input sockets
+    input_map = Dict()
+
+    #: exposed output name -> inner output socket
+    output_map = Dict()
+
+    #: inner output socket -> output sockets of the group exposing it
+    _exports = Typed(dict, ())
+
+    def _default_subgraph(self):
+        return Graph()
+
+    def _observe_subgraph(self, change):
+        old = change.get('oldvalue')
+        if old is not None:
+            old.group = None
+        if change['value'] is not None:
+            change['value'].group = self
+
+    def create_socket(self, name, data_type, socket_type):
+        """ Return a new socket of the group, subclasses may use their own socket types.
+
+        """
+        return Socket(name=name, data_type=data_type)
+
+    def expose_input(self, name, sockets):
+        """ Add the input `name` passing its values to the inner input `sockets`.
+
+        """
+        sockets = list(sockets)
+        if name in self.input_dict:
+            raise ValueError("Duplicate input: %s" % name)
+        socket = self.create_socket(name, sockets[0].data_type, SocketType.INPUT)
+        self.input_map[name] = sockets
+        self.inputs.append(socket)
+        return socket
+
+    def expose_output(self, name, socket):
+        """ Add the output `name` providing the values of the inner output `socket`.
+
+        """
+        if name in self.output_dict:
+            raise ValueError("Duplicate output: %s" % name)
+        exposed = self.create_socket(name, socket.data_type, SocketType.OUTPUT)
+        self.output_map[name] = socket
+        self._exports.setdefault(socket, []).append(exposed)
+        self.outputs.append(exposed)
+        return exposed
+
+    def exports(self, socket):
+        """ Return the output sockets of the group exposing the inner output `socket`.
+
+        """
+        return self._exports.get(socket, ())
+
+    def serialize(self, archive, blobs=None):
+        super(GroupNode, self).serialize(archive, blobs)
+        archive['exposed_inputs'] = [[s.name, [[i.node.id, i.name] for i in self.input_map[s.name]]]
+                                     for s in self.inputs]
+        archive['exposed_outputs'] = [[s.name, self.output_map[s.name].node.id, self.output_map[s.name].name]
+                                      for s in self.outputs]
+
+    def deserialize(self, archive, blobs=None):
+        """ Restore the attributes and the exposed sockets, the nodes of the
+        subgraph have to be added before.
+
+        """
+        super(GroupNode, self).deserialize(archive, blobs)
+        nodes = self.subgraph.node_dict
+        for name, sockets in archive.get('exposed_inputs', ()):
+            if name not in self.input_dict:
+                self.expose_input(name, [nodes[node_id].input_dict[socket] for node_id, socket in sockets])
+        for name, node_id, socket in archive.get('exposed_outputs', ()):
+            if name not in self.output_dict:
+                self.expose_output(name, nodes[node_id].output_dict[socket])
+
+
+def iter_nodes(graph):
+    """ Yield the nodes of `graph` and of the subgraphs of its groups, depth first.
+
+    """
+    for node in graph.nodes:
+        yield node
+        if isinstance(node, GroupNode):
+            for inner in iter_nodes(node.subgraph):
+                yield inner
+
+
+def leaf_nodes(graph):
+    """ Return the nodes of `graph` with groups replaced by their contents.
+
+    """
+    return [node for node in iter_nodes(graph) if not isinstance(node, GroupNode)]
+
+
+def _targets(socket, path):
+    # the leaf input sockets receiving the values of an output socket, across group boundaries
+    for edge in socket.edges:
+        if edge.end_socket is not None:
+            for target in _inputs(edge.end_socket, path + (edge,)):
+                yield target
+    graph = socket.node.graph
+    group = graph.group if graph is not None else None
+    if group is not None:
+        for exposed in group.exports(socket):
+            for target in _targets(exposed, path):
+                yield target
+
+
+def _inputs(socket, path):
+    node = socket.node
+    if isinstance(node, GroupNode):
+        for inner in node.input_map.get(socket.name, ()):
+            for target in _inputs(inner, path):
+                yield target
+    else:
+        yield socket, path
+
+
+def leaf_links(graph):
+    """ Yield (output socket, input socket, edges) for every connection between
+    the leaf nodes of `graph`, where edges are the edges the values pass along.
+
+    """
+    for node in leaf_nodes(graph):
+        for socket in node.outputs:
+            for target, path in _targets(socket, ()):
+                yield socket, target, path
+
+
+def flat_topological_sort(graph):
+    """ Return the leaf nodes of `graph` ordered such that every connection
+    points from an earlier to a later node.
+
+    Raises ValueError if the connections contain a cycle.
+
+    """
+    if not any(isinstance(node, GroupNode) for node in graph.nodes):
+        return graph.topological_sort()
+
+    nodes = leaf_nodes(graph)
+    index = {node: i for i, node in enumerate(nodes)}
+    successors = [[] for _ in nodes]
+    in_degree = [0] * len(nodes)
+    for start, end, _ in leaf_links(graph):
+        i = index.get(end.node)
+        if i is not None:
+            successors[index[start.node]].append(i)
+            in_degree[i] += 1
+
+    ready = deque(i for i in range(len(nodes)) if in_degree[i] == 0)
+    result = []
+    while ready:
+        i = ready.popleft()
+        result.append(nodes[i])
+        for j in successors[i]:
+            in_degree[j] -= 1
+            if in_degree[j] == 0:
+                ready.append(j)
+
+    if len(result) != len(nodes):
+        raise ValueError("Graph contains a cycle")
+    return result
@@ -0,0 +1,177 @@
+""" Content hashes of graphs, maintained incrementally.
+
+Every item of a graph is hashed from its archived record. The item hashes are
+spread over a fixed number of buckets by key, each bucket is hashed from the
+sorted hashes of its items and the graph hash from the bucket hashes, so a
+change only rehashes the changed items and their buckets.
+
+Snapshots share the buckets with the live hashes, a bucket is copied when it is
+first changed after a snapshot. Diffing two snapshots only compares the items of
+the buckets whose hashes differ.
+
+"""
+import hashlib
+import json
+
+from atom.api import Atom, Callable, List, Typed, Value
+
+from .blobs import BLOB_KEY
+
+DIGEST_SIZE = 16
+
+BUCKET_COUNT = 256
+
+_EMPTY_DIGEST = hashlib.blake2b(b'', digest_size=DIGEST_SIZE).digest()
+
+
+def content_hash(record):
+    """ Return the digest of an archived record, independent of the key order.
+
+    """
+    data = json.dumps(record, sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+
+class HashingBlobs(object):
+    """ Stand-in for a BlobWriter that references arrays by the digest of their bytes,
+    so records with large arrays are hashed without converting the arrays to lists.
+
+    """
+    def put(self, array):
+        h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        h.update(memoryview(array).cast('B') if array.flags.c_contiguous else array.tobytes())
+        return {BLOB_KEY: h.hexdigest(), 'dtype': array.dtype.str, 'shape': list(array.shape)}
+
+
+def _bucket_digest(bucket):
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for key, digest in sorted(bucket.items()):
+        h.update(repr(key).encode('utf-8'))
+        h.update(digest)
+    return h.digest()
+
+
+class HashSnapshot(Atom):
+    """ The content hashes of a graph at one point in time.
+
+    """
+    #: digest of the whole graph
+    digest = Value()
+
+    buckets = Value()
+    bucket_digests = Value()
+
+    def __contains__(self, key):
+        return key in self.buckets[hash(key) % BUCKET_COUNT]
+
+    def get(self, key, default=None):
+        return self.buckets[hash(key) % BUCKET_COUNT].get(key, default)
+
+
+def diff_snapshots(old, new):
+    """ Return the sets of keys (added, removed, changed) from `old` to `new`.
+
+    """
+    added, removed, changed = set(), set(), set()
+    for i, (old_digest, new_digest) in enumerate(zip(old.bucket_digests, new.bucket_digests)):
+        if old_digest == new_digest:
+            continue
+        old_bucket, new_bucket = old.buckets[i], new.buckets[i]
+        for key, digest in new_bucket.items():
+            old_value = old_bucket.get(key)
+            if old_value is None:
+                added.add(key)
+            elif old_value != digest:
+                changed.add(key)
+        removed.update(key for key in old_bucket if key not in new_bucket)
+    return added, removed, changed
+
+
+class ContentHashes(Atom):
+    """ Item, bucket and graph hashes of a graph.
+
+    Items are identified by hashable keys. Changed items are only marked with
+    `invalidate` and rehashed when a digest or snapshot is requested, using the
+    record returned by `record_for(key)`, or dropped if it returns None.
+
+    """
+    record_for = Callable()
+
+    _buckets = List()
+    _bucket_digests = List()
+
+    #: buckets referenced by a snapshot, copied before they are changed
+    _shared = Typed(set, ())
+
+    #: keys to rehash
+    _stale = Typed(set, ())
+
+    _digest = Value()
+
+    def _default__buckets(self):
+        return [{} for _ in range(BUCKET_COUNT)]
+
+    def _default__bucket_digests(self):
+        return [_EMPTY_DIGEST] * BUCKET_COUNT
+
+    def invalidate(self, key):
+        self._stale.add(key)
+        self._digest = None
+
+    def clear(self):
+        self._buckets = self._default__buckets()
+        self._bucket_digests = self._default__bucket_digests()
+        self._shared.clear()
+        self._stale.clear()
+        self._digest = None
+
+    def get(self, key, default=None):
+        self.update()
+        return self._buckets[hash(key) % BUCKET_COUNT].get(key, default)
+
+    def update(self):
+        """ Rehash the invalidated items and their buckets.
+
+        """
+        if not self._stale:
+            return
+        stale, self._stale = self._stale, set()
+        buckets, digests, shared = self._buckets, self._bucket_digests, self._shared
+        changed = set()
+        for key in stale:
+            record = self.record_for(key)
+            index = hash(key) % BUCKET_COUNT
+            bucket = buckets[index]
+            if record is None:
+                if key not in bucket:
+                    continue
+                digest = None
+            else:
+                digest = content_hash(record)
+                if bucket.get(key) == digest:
+                    continue
+            if index in shared:
+                bucket = buckets[index] = dict(bucket)
+                shared.discard(index)
+            if digest is None:
+                del bucket[key]
+            else:
+                bucket[key] = digest
+            changed.add(index)
+        for index in changed:
+            digests[index] = _bucket_digest(buckets[index]) if buckets[index] else _EMPTY_DIGEST
+
+    def digest(self):
+        """ Return the digest of the whole graph.
+
+        """
+        self.update()
+        if self._digest is None:
+            self._digest = hashlib.blake2b(b''.join(self._bucket_digests), digest_size=DIGEST_SIZE).digest()
+        return self._digest
+
+    def snapshot(self):
+        digest = self.digest()
+        self._shared.update(range(BUCKET_COUNT))
+        return HashSnapshot(digest=digest, buckets=tuple(self._buckets),
+                            bucket_digests=tuple(self._bucket_digests))
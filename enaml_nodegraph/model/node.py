@@ -1,4 +1,4 @@
-from atom.api import Str, Property, Str, ContainerList, ForwardTyped
+from atom.api import Str, Property, Str, ContainerList, ForwardTyped, Typed
 
 from .socket import Socket, SocketType
 from .base import GraphItem
@@ -9,6 +9,31 @@ def import_graph_type():
     return Graph
 
 
+def _socket_start(change, size):
+    """ Return the first index whose socket changed with a container `change`,
+    or None if the whole list needs to be renumbered.
+
+    """
+    operation = change['operation']
+    if operation in ('append', 'extend', '__iadd__'):
+        return size - len(change.get('items', (None,)))
+    if operation == 'insert':
+        index = change['index']
+        if index < 0:
+            index += size - 1
+        return min(max(index, 0), size - 1)
+    if operation == 'remove':
+        return change['item'].index
+    if operation == 'pop':
+        return change['index']
+    if operation in ('__delitem__', '__setitem__'):
+        index = change['index']
+        if isinstance(index, slice):
+            return None if index.step not in (None, 1) else index.indices(size + 1)[0]
+        return index if index >= 0 else None
+    return None
+
+
 class Node(GraphItem):
     id = Str()
     name = Str()
@@ -18,41 +43,90 @@ class Node(GraphItem):
     inputs = ContainerList(Socket)
     outputs = ContainerList(Socket)
 
-    input_dict = Property(lambda self: self._mk_input_dict(), cached=True)
-    output_dict = Property(lambda self: self._mk_output_dict(), cached=True)
+    #: name -> socket, maintained in place as the socket lists change
+    input_dict = Property()
+    output_dict = Property()
+
+    _input_dict = Typed(dict, ())
+    _output_dict = Typed(dict, ())
+
+    def _get_input_dict(self):
+        self.inputs  # create the default sockets
+        return self._input_dict
+
+    def _get_output_dict(self):
+        self.outputs
+        return self._output_dict
 
     def _observe_inputs(self, change):
-        if change['type'] == 'create':
-            for n in change['value']:
-                n.node = self
-                n.socket_type = SocketType.INPUT
-                n.index = change['value'].index(n)
-        elif change['type'] == 'container':
-            if change['operation'] == 'append':
-                change['item'].node = self
-                change['item'].socket_type = SocketType.INPUT
-                change['item'].index = change['value'].index(n)
-            elif change['operation'] == 'remove':
-                change['item'].node = None
-        self.get_member('input_dict').reset(self)
-
-    def _mk_input_dict(self):
-        return {v.name: v for v in self.inputs}
+        self._update_sockets(change, SocketType.INPUT, self._input_dict)
 
     def _observe_outputs(self, change):
-        if change['type'] == 'create':
-            for n in change['value']:
-                n.node = self
-                n.socket_type = SocketType.OUTPUT
-                n.index = change['value'].index(n)
-        elif change['type'] == 'container':
-            if change['operation'] == 'append':
-                change['item'].node = self
-                change['item'].socket_type = SocketType.OUTPUT
-                change['item'].index = change['value'].index(n)
-            elif change['operation'] == 'remove':
-                change['item'].node = None
-        self.get_member('output_dict').reset(self)
-
-    def _mk_output_dict(self):
-        return {v.name: v for v in self.outputs}
+        self._update_sockets(change, SocketType.OUTPUT, self._output_dict)
+
+    def add_inputs(self, sockets, data_type=''):
+        """ Append input sockets in one step.
+
+        `sockets` are Sockets, names or (name, data_type) pairs.
+
+        """
+        self.inputs.extend(self._make_sockets(sockets, data_type))
+
+    def add_outputs(self, sockets, data_type=''):
+        """ Append output sockets in one step, see `add_inputs`.
+
+        """
+        self.outputs.extend(self._make_sockets(sockets, data_type))
+
+    @staticmethod
+    def _make_sockets(sockets, data_type):
+        result = []
+        for socket in sockets:
+            if isinstance(socket, str):
+                socket = Socket(name=socket, data_type=data_type)
+            elif not isinstance(socket, Socket):
+                socket = Socket(name=socket[0], data_type=socket[1])
+            result.append(socket)
+        return result
+
+    def _update_sockets(self, change, socket_type, socket_dict):
+        sockets = change['value']
+        if change['type'] == 'container':
+            operation = change['operation']
+            if operation in ('remove', 'pop', '__delitem__'):
+                removed = change['item']
+            elif operation == '__setitem__':
+                removed = change['olditem']
+            else:
+                removed = ()
+            start = _socket_start(change, len(sockets))
+        else:
+            removed = change.get('oldvalue') or ()
+            start = None
+
+        unnamed = []
+        for socket in (removed if isinstance(removed, (list, tuple)) else [removed]):
+            if socket_dict.get(socket.name) is socket:
+                del socket_dict[socket.name]
+                unnamed.append(socket.name)
+            socket.node = None
+        if start is None:
+            socket_dict.clear()
+            start = 0
+
+        for index in range(start, len(sockets)):
+            socket = sockets[index]
+            if socket.node is not self:
+                socket.node = self
+                socket.socket_type = socket_type
+            socket.index = index
+            socket_dict[socket.name] = socket
+        # another socket of the same name before the renumbered ones takes the name
+        for name in unnamed:
+            if name not in socket_dict:
+                for socket in reversed(sockets[:start]):
+                    if socket.name == name:
+                        socket_dict[name] = socket
+                        break
+        if self.graph is not None and socket_type == SocketType.INPUT:
+            self.graph.sockets_changed(self)
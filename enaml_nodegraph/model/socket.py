@@ -1,8 +1,9 @@
-from atom.api import Atom, List, Dict, Int, Str, ForwardTyped, Typed, ForwardInstance, ContainerList, Instance, observe
+from atom.api import Atom, List, Dict, Int, Str, ForwardTyped, Typed, ForwardInstance, ContainerList, Instance, Property, observe
 from enum import IntEnum
 
 from .base import GraphItem
 from .edge import Edge
+from .types import data_types, INCOMPATIBLE
 
 
 def import_node_type():
@@ -26,12 +27,22 @@ class Socket(GraphItem):
     data_type = Str()
     socket_type = Typed(SocketType)
 
+    #: data_type interned in the data_types registry
+    type_id = Property(lambda self: data_types.id(self.data_type), cached=True)
+
+    def _observe_data_type(self, change):
+        self.get_member('type_id').reset(self)
+
     def _observe_edges(self, change):
         if self.degree > 0:
             if len(change['value']) > self.degree:
                 raise ValueError("Too many links - %s:%s" % (self.node.name, self.name))
 
     def can_connect(self, edge_or_socket):
-        data_types_match = self.data_type == edge_or_socket.data_type
+        if self.socket_type == SocketType.OUTPUT:
+            source_id, target_id = self.type_id, edge_or_socket.type_id
+        else:
+            source_id, target_id = edge_or_socket.type_id, self.type_id
+        data_types_match = data_types.compatibility(source_id, target_id) != INCOMPATIBLE
         degree_ok = len(self.edges) < self.degree if self.degree > 0 else True 
         return data_types_match and degree_ok
\ No newline at end of file
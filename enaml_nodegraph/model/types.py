@@ -0,0 +1,119 @@
+""" Data types of sockets, interned as small integers.
+
+A type may have a parent type it can be used as. Conversions between types are
+registered as functions applied to the values passed along an edge. The
+compatibility of every pair of types is kept in a matrix that is rebuilt
+lazily after the registry changed, so connection checks are list lookups.
+
+"""
+from atom.api import Atom, Dict, List, Property
+
+#: results of DataTypeRegistry.compatibility
+INCOMPATIBLE = 0
+ASSIGNABLE = 1
+CONVERTIBLE = 2
+
+
+class DataTypeRegistry(Atom):
+    """ The data types known to the sockets of graphs.
+
+    """
+    #: type id -> name and id of the parent type, or -1
+    names = List()
+    parents = List()
+
+    _ids = Dict()
+
+    #: (source id, target id) -> conversion function
+    _conversions = Dict()
+
+    #: [source id][target id] -> INCOMPATIBLE, ASSIGNABLE or CONVERTIBLE, and
+    #: (source id, target id) -> the conversion used for CONVERTIBLE pairs
+    _tables = Property(lambda self: self._build_tables(), cached=True)
+
+    def register(self, name, parent=None):
+        """ Register the type `name`, usable as `parent`, and return its id.
+
+        """
+        type_id = self._ids.get(name)
+        parent_id = -1 if parent is None else self.id(parent)
+        if type_id is None:
+            type_id = self._ids[name] = len(self.names)
+            self.names.append(name)
+            self.parents.append(parent_id)
+        elif parent is not None:
+            if type_id in self.ancestors(parent_id):
+                raise ValueError("Cyclic subtyping: %s -> %s" % (name, parent))
+            self.parents[type_id] = parent_id
+        self._reset()
+        return type_id
+
+    def register_conversion(self, source, target, function):
+        """ Convert values of type `source` with `function` when they are passed
+        to a socket of type `target`.
+
+        """
+        self._conversions[(self.id(source), self.id(target))] = function
+        self._reset()
+
+    def id(self, name):
+        """ Return the id of the type `name`, registering unknown types.
+
+        """
+        type_id = self._ids.get(name)
+        if type_id is None:
+            type_id = self.register(name)
+        return type_id
+
+    def ancestors(self, type_id):
+        """ Return the type and its parents, nearest first.
+
+        """
+        result = []
+        while type_id >= 0:
+            result.append(type_id)
+            type_id = self.parents[type_id]
+        return result
+
+    def is_subtype(self, type_id, parent_id):
+        return parent_id in self.ancestors(type_id)
+
+    def compatibility(self, source_id, target_id):
+        """ Return whether values of `source_id` can be passed to `target_id` as
+        they are (ASSIGNABLE), after a conversion (CONVERTIBLE) or not at all.
+
+        """
+        return self._tables[0][source_id][target_id]
+
+    def converter(self, source_id, target_id):
+        """ Return the conversion between the types, None if none is needed or possible.
+
+        """
+        return self._tables[1].get((source_id, target_id))
+
+    def _reset(self):
+        self.get_member('_tables').reset(self)
+
+    def _build_tables(self):
+        count = len(self.names)
+        ancestors = [self.ancestors(i) for i in range(count)]
+        matrix = [[INCOMPATIBLE] * count for _ in range(count)]
+        converters = {}
+        for source in range(count):
+            row = matrix[source]
+            for parent in ancestors[source]:
+                row[parent] = ASSIGNABLE
+            # conversions of nearer ancestors take precedence
+            for parent in ancestors[source]:
+                for (a, b), function in self._conversions.items():
+                    if a != parent:
+                        continue
+                    for target in ancestors[b]:
+                        if row[target] == INCOMPATIBLE:
+                            row[target] = CONVERTIBLE
+                            converters[(source, target)] = function
+        return matrix, converters
+
+
+#: the registry used by sockets and edges
+data_types = DataTypeRegistry()
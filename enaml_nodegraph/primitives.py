@@ -1,4 +1,6 @@
-from atom.api import Atom, Float
+import math
+
+from atom.api import Atom, Float, Typed
 
 
 class Point2D(Atom):
@@ -62,3 +64,40 @@ class Transform2D(Atom):
                    m21=data[3], m22=data[4], m23=data[5],
                    m31=data[6], m32=data[7], m33=data[8])
 
+
+
+class SpatialHash(Atom):
+    """ Points on a uniform grid of cells, for nearest neighbour queries that
+    only look at the cells around the query point.
+
+    """
+    cell_size = Float(50.0)
+
+    #: (column, row) -> list of (key, x, y)
+    _cells = Typed(dict, ())
+
+    def _cell(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def insert(self, key, point):
+        self._cells.setdefault(self._cell(point.x, point.y), []).append((key, point.x, point.y))
+
+    def clear(self):
+        self._cells.clear()
+
+    def nearest(self, point, radius):
+        """ Return the key of the point closest to `point` within `radius`, or None.
+
+        """
+        x0, y0 = self._cell(point.x - radius, point.y - radius)
+        x1, y1 = self._cell(point.x + radius, point.y + radius)
+        cells = self._cells
+        result = None
+        best = radius * radius
+        for i in range(x0, x1 + 1):
+            for j in range(y0, y1 + 1):
+                for key, x, y in cells.get((i, j), ()):
+                    d = (x - point.x) ** 2 + (y - point.y) ** 2
+                    if d <= best:
+                        result, best = key, d
+        return result
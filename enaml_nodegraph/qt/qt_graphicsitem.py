@@ -72,12 +72,15 @@ class QtGraphicsItem(QtToolkitObject, ProxyGraphicsItem):
         """ Destroy the underlying QtGraphicsItem object.
 
         """
-        if self.widget is not None and self.widget.scene() is not None:
-            self.widget.scene().removeItem(self.widget)
+        widget = self.widget
+        if widget is not None:
+            # items removed from the scene in a batch are already detached
+            if widget.scene() is not None:
+                widget.scene().removeItem(widget)
             del self.widget
             self.widget = None
         self._teardown_features()
-        focus_registry.unregister(self.widget)
+        focus_registry.unregister(widget)
         super(QtGraphicsItem, self).destroy()
 
     #--------------------------------------------------------------------------
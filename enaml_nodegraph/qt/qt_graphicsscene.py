@@ -133,6 +133,20 @@ class QtGraphicsScene(QtToolkitObject, ProxyGraphicsScene):
             if item.widget.scene() is not self.widget:
                 self.widget.addItem(item.widget)
 
+    def remove_items(self, items):
+        """ Remove the widgets of the given item proxies from the scene.
+
+        """
+        widget = self.widget
+        # removing items from the BSP index one by one is slow, rebuild it afterwards
+        index_method = widget.itemIndexMethod()
+        widget.setItemIndexMethod(QGraphicsScene.NoIndex)
+        for item in items:
+            item_widget = item.widget
+            if item_widget is not None and item_widget.parentItem() is None and item_widget.scene() is widget:
+                widget.removeItem(item_widget)
+        widget.setItemIndexMethod(index_method)
+
     def refresh_style_sheet(self):
         """ Refresh the widget style sheet with the current style data.
 
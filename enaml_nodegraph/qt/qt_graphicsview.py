@@ -147,6 +147,8 @@ class QGraphicsView(QtWidgets.QGraphicsView):
             self.rightMouseButtonRelease(event)
         else:
             super().mouseReleaseEvent(event)
+        # e.g. ends the undo step of a drag
+        self.proxy.declaration.interaction_finished()
 
     def middleMouseButtonPress(self, event):
         release_event = QtGui.QMouseEvent(QtCore.QEvent.MouseButtonRelease,
@@ -258,7 +260,6 @@ class QGraphicsView(QtWidgets.QGraphicsView):
             return
 
         if self.proxy.rubberBandDraggingRectangle:
-            # self.grScene.scene.history.storeHistory("Selection changed")
             self.proxy.rubberBandDraggingRectangle = False
 
         super().mouseReleaseEvent(event)
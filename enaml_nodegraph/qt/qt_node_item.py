@@ -76,6 +76,7 @@ class QtNodeItem(QtGraphicsItem, ProxyNodeItem):
     color_title = Typed(QtGui.QColor)
     color_title_background = Typed(QtGui.QColor)
     color_background = Typed(QtGui.QColor)
+    color_overlay = Typed(QtGui.QColor)
 
     show_content_inline = Bool(False)
 
@@ -118,6 +119,7 @@ class QtNodeItem(QtGraphicsItem, ProxyNodeItem):
         self.set_color_title(d.color_title)
         self.set_color_title_background(d.color_title_background)
         self.set_color_background(d.color_background)
+        self.set_color_overlay(d.color_overlay)
 
         self.widget.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable)
         self.widget.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable)
@@ -182,6 +184,14 @@ class QtNodeItem(QtGraphicsItem, ProxyNodeItem):
         painter.setBrush(self.color_background)
         painter.drawPath(path_content.simplified())
 
+        # overlay
+        if self.color_overlay is not None:
+            path_overlay = QtGui.QPainterPath()
+            path_overlay.addRoundedRect(0, 0, self.width, self.height, self.edge_size, self.edge_size)
+            painter.setPen(QtCore.Qt.NoPen)
+            painter.setBrush(self.color_overlay)
+            painter.drawPath(path_overlay)
+
         # outline
         path_outline = QtGui.QPainterPath()
         path_outline.addRoundedRect(0, 0, self.width, self.height, self.edge_size, self.edge_size)
@@ -237,6 +247,13 @@ class QtNodeItem(QtGraphicsItem, ProxyNodeItem):
     def set_color_background(self, color_background):
         self.color_background = get_cached_qcolor(color_background)
 
+    def set_color_overlay(self, color_overlay):
+        if color_overlay is not None:
+            self.color_overlay = get_cached_qcolor(color_overlay)
+        else:
+            self.color_overlay = None
+        self.widget.update()
+
     def set_font_title(self, font):
         if font is not None:
             self.font_title = get_cached_qfont(font)
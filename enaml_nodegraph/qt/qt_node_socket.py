@@ -14,6 +14,9 @@ from enaml_nodegraph.primitives import Point2D
 
 log = logging.getLogger(__name__)
 
+#: distance of the highlight ring from the socket, including its width
+HIGHLIGHT_MARGIN = 4.0
+
 
 class QNodeSocket(QGraphicsItem):
 
@@ -26,12 +29,8 @@ class QNodeSocket(QGraphicsItem):
 
     def boundingRect(self):
         p = self.proxy
-        return QtCore.QRectF(
-            - p.radius - p.outline_width,
-            - p.radius - p.outline_width,
-            2 * (p.radius + p.outline_width),
-            2 * (p.radius + p.outline_width),
-        )
+        extent = p.radius + p.outline_width + HIGHLIGHT_MARGIN
+        return QtCore.QRectF(-extent, -extent, 2 * extent, 2 * extent)
 
     # @todo: these are expected from toolkitobject - but are not valid for graphics items
     def setObjectName(self, name):
@@ -66,9 +65,13 @@ class QtNodeSocket(QtGraphicsItem, ProxyNodeSocket):
     color_background = Typed(QtGui.QColor)
     color_outline = Typed(QtGui.QColor)
     color_label = Typed(QtGui.QColor)
+    color_highlight = Typed(QtGui.QColor)
+
+    highlighted = Bool(False)
 
     pen_outline = Typed(QtGui.QPen)
     pen_label = Typed(QtGui.QPen)
+    pen_highlight = Typed(QtGui.QPen)
 
     #: A reference to the widget created by the proxy.
     widget = Typed(QNodeSocket)
@@ -103,6 +106,8 @@ class QtNodeSocket(QtGraphicsItem, ProxyNodeSocket):
         self.set_color_background(d.color_background)
         self.set_color_outline(d.color_outline)
         self.set_color_label(d.color_label)
+        self.set_color_highlight(d.color_highlight)
+        self.set_highlighted(d.highlighted)
 
 
     #--------------------------------------------------------------------------
@@ -120,6 +125,12 @@ class QtNodeSocket(QtGraphicsItem, ProxyNodeSocket):
             self.pen_label = QtGui.QPen(self.color_label)
             self.pen_label.setWidthF(1)
 
+    @observe('color_highlight')
+    def _update_highlight_style(self, change):
+        if self.color_highlight is not None:
+            self.pen_highlight = QtGui.QPen(self.color_highlight)
+            self.pen_highlight.setWidthF(2)
+
     def _observe_relative_position(self, change):
         if self.widget is not None:
             self.widget.setPos(QtCore.QPointF(self.relative_position.x, self.relative_position.y))
@@ -136,6 +147,12 @@ class QtNodeSocket(QtGraphicsItem, ProxyNodeSocket):
         painter.setPen(self.pen_outline)
         painter.drawEllipse(QtCore.QPointF(0., 0.), self.radius, self.radius)
 
+        if self.highlighted and self.pen_highlight is not None:
+            painter.setBrush(QtCore.Qt.NoBrush)
+            painter.setPen(self.pen_highlight)
+            r = self.radius + self.outline_width + HIGHLIGHT_MARGIN / 2
+            painter.drawEllipse(QtCore.QPointF(0., 0.), r, r)
+
         if self.show_label:
             painter.setFont(self.font_label)
             painter.setPen(self.pen_label)
@@ -196,6 +213,12 @@ class QtNodeSocket(QtGraphicsItem, ProxyNodeSocket):
     def set_color_label(self, color_label):
         self.color_label = get_cached_qcolor(color_label)
 
+    def set_color_highlight(self, color_highlight):
+        self.color_highlight = get_cached_qcolor(color_highlight)
+
+    def set_highlighted(self, highlighted):
+        self.highlighted = highlighted
+
     def set_font_label(self, font):
         if font is not None:
             self.font_label = get_cached_qfont(font)
@@ -0,0 +1,141 @@
+import functools
+import json
+import os
+import threading
+import time
+
+from atom.api import Atom, Bool, Int, Float, Str, List
+
+
+class _Span(object):
+    """ Context manager recording a complete ('X') trace event.
+
+    """
+    __slots__ = ('recorder', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, recorder, name, cat, args):
+        self.recorder = recorder
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.recorder.complete(self.name, self.cat, self.start, time.perf_counter() - self.start, self.args)
+        return False
+
+
+class _NullSpan(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class TraceRecorder(Atom):
+    """ Buffers trace events and writes them in the Chrome trace-event JSON format.
+
+    The resulting file can be opened in chrome://tracing or https://ui.perfetto.dev.
+    When disabled, `span` returns a shared no-op context manager and the other
+    recording methods must not be called, so instrumented code should check
+    `enabled` before doing any work to build event arguments.
+
+    """
+    enabled = Bool(False)
+
+    #: file the events are written to when the recording is stopped
+    path = Str()
+
+    #: maximum number of buffered events, older events are kept
+    max_events = Int(1000000)
+
+    dropped_events = Int()
+
+    events = List()
+
+    _t0 = Float()
+
+    def start(self, path):
+        self.path = path
+        self.events = []
+        self.dropped_events = 0
+        self._t0 = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        """ Stop recording and write the buffered events to `path`.
+
+        """
+        self.enabled = False
+        if self.path:
+            self.write(self.path)
+
+    def write(self, path):
+        data = {
+            'traceEvents': self.events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'dropped_events': self.dropped_events},
+        }
+        with open(path, 'w') as fp:
+            json.dump(data, fp)
+
+    def span(self, name, cat='', **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def complete(self, name, cat, start, duration, args=None):
+        self._append({'name': name, 'cat': cat, 'ph': 'X',
+                      'ts': (start - self._t0) * 1e6, 'dur': duration * 1e6,
+                      'pid': os.getpid(), 'tid': threading.get_ident(),
+                      'args': args or {}})
+
+    def instant(self, name, cat='', **args):
+        self._append({'name': name, 'cat': cat, 'ph': 'i', 's': 't',
+                      'ts': (time.perf_counter() - self._t0) * 1e6,
+                      'pid': os.getpid(), 'tid': threading.get_ident(),
+                      'args': args})
+
+    def counter(self, name, **values):
+        self._append({'name': name, 'ph': 'C',
+                      'ts': (time.perf_counter() - self._t0) * 1e6,
+                      'pid': os.getpid(), 'tid': threading.get_ident(),
+                      'args': values})
+
+    def _append(self, event):
+        if len(self.events) < self.max_events:
+            self.events.append(event)
+        else:
+            self.dropped_events += 1
+
+
+#: process wide recorder used by the scene and graph controllers
+tracer = TraceRecorder()
+
+
+def traced(name=None, cat=''):
+    """ Decorator recording each call of the decorated function as a span of `tracer`.
+
+    String positional arguments (typically item ids) are added to the event args.
+
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(tracer, span_name, cat, {'args': [a for a in args if isinstance(a, str)]}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
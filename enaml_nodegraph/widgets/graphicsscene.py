@@ -20,6 +20,7 @@ from enaml.widgets.toolkit_object import ToolkitObject, ProxyToolkitObject
 from enaml_nodegraph.widgets.graphicsitem import GraphicsItem
 from enaml_nodegraph.widgets.node_item import NodeItem
 from enaml_nodegraph.widgets.edge_item import EdgeItem
+from enaml_nodegraph.tracing import tracer
 
 
 def import_graph_controller_class():
@@ -61,6 +62,9 @@ class ProxyGraphicsScene(ProxyToolkitObject):
     def add_item(self, item):
         raise NotImplementedError
 
+    def remove_items(self, items):
+        raise NotImplementedError
+
 
 class SceneGuard(IntEnum):
     NOOP = 0x01
@@ -200,6 +204,8 @@ class GraphicsScene(ToolkitObject, Stylable):
 
     def add_item(self, item):
         item.set_scene(self)
+        if tracer.enabled:
+            tracer.instant('scene.add_item', 'scene', id=getattr(item, 'id', ''), type=type(item).__name__)
 
         if isinstance(item, NodeItem):
             self.nodes[item.id] = item
@@ -207,6 +213,8 @@ class GraphicsScene(ToolkitObject, Stylable):
             self.edges[item.id] = item
 
     def delete_item(self, item):
+        if tracer.enabled:
+            tracer.instant('scene.delete_item', 'scene', id=getattr(item, 'id', ''), type=type(item).__name__)
         item.set_scene(None)
 
         if isinstance(item, NodeItem):
@@ -226,10 +234,37 @@ class GraphicsScene(ToolkitObject, Stylable):
             self.edges[id] = item
 
     def clear_all(self):
-        for edge in list(self.edges.values())[:]:
-            edge.destroy()
-        for node in list(self.nodes.values())[:]:
-            node.destroy()
+        """ Destroy all items of the scene in one batch.
+
+        The items are removed from the toolkit scene and unparented before they
+        are destroyed, so the controller is not notified per item. Controllers
+        keeping a model of the scene have to clear it themselves.
+
+        """
+        items = self._items
+        if not items:
+            return
+        if tracer.enabled:
+            tracer.instant('scene.clear_all', 'scene', items=len(items))
+        guard = self.guard
+        self.guard = SceneGuard.INITIALIZING
+        try:
+            if self.proxy_is_active:
+                self.proxy.remove_items([item.proxy for item in items if item.proxy_is_active])
+            self.nodes = {}
+            self.edges = {}
+            # in the order of the children, each one is found at the front
+            for item in items:
+                item.set_parent(None)
+            # edges first, they disconnect from the sockets of the nodes
+            for item in items:
+                if isinstance(item, EdgeItem):
+                    item.destroy()
+            for item in items:
+                if not isinstance(item, EdgeItem):
+                    item.destroy()
+        finally:
+            self.guard = guard
 
     def generate_item_id(self, prefix, cls):
         id = self._item_id_generator.get(cls, 0)
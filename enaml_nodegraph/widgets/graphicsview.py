@@ -1,7 +1,7 @@
 __author__ = 'jack'
 import logging
 
-from atom.api import Typed, List, Instance, ForwardTyped, ForwardInstance, set_default
+from atom.api import Float, Typed, List, Instance, ForwardTyped, ForwardInstance, Value, set_default
 from enaml.widgets.control import Control, ProxyControl
 from enaml.core.declarative import d_
 
@@ -9,6 +9,7 @@ from .graphicsitem import GraphicsItem
 from .graphicsscene import GraphicsScene
 from .edge_item import EdgeItem, EdgeType
 from .node_socket import NodeSocket, SocketType
+from enaml_nodegraph.primitives import SpatialHash
 
 log = logging.getLogger(__name__)
 
@@ -47,8 +48,16 @@ class GraphicsView(Control):
     hug_width = set_default('ignore')
     hug_height = set_default('ignore')
 
+    #: distance within which a dragged edge snaps to a compatible socket
+    snap_radius = d_(Float(20.0))
+
     _dragEdge = Instance(EdgeItem)
 
+    #: the sockets the dragged edge can connect to, None if unknown, and their positions
+    _dragTargets = Value()
+    _dragIndex = Typed(SpatialHash)
+    _dragSnap = Instance(NodeSocket)
+
     #: A reference to the ProxyGraphicsView object
     proxy = Typed(ProxyGraphicsView)
 
@@ -107,6 +116,7 @@ class GraphicsView(Control):
                                                          end_socket=None,
                                                          scene=self.scene)
             self._dragEdge.pos_destination = item.absolute_position
+            self._find_drag_targets(item)
         else:
             log.warning("Invalid edge start: ", item)
 
@@ -115,8 +125,17 @@ class GraphicsView(Control):
             return
 
         ss = self._dragEdge.start_socket
-        if isinstance(item, NodeSocket) and item.socket_type == SocketType.INPUT and \
-                self.controller.edge_can_connect(ss.parent.id, ss.id, item.parent.id, item.id):
+        if not (isinstance(item, NodeSocket) and item.socket_type == SocketType.INPUT):
+            item = self._dragSnap
+        targets = self._dragTargets
+        self._clear_drag_targets()
+        if item is None:
+            can_connect = False
+        elif targets is not None:
+            can_connect = item in targets
+        else:
+            can_connect = self.controller.edge_can_connect(ss.parent.id, ss.id, item.parent.id, item.id)
+        if can_connect:
             self._dragEdge.end_socket = item
             self.controller.edge_connected(self._dragEdge.id)
         else:
@@ -127,8 +146,44 @@ class GraphicsView(Control):
 
     def updatePoseEdgeDrag(self, pos):
         if self._dragEdge is not None:
+            if self._dragIndex is not None:
+                self._dragSnap = self._dragIndex.nearest(pos, self.snap_radius)
+                if self._dragSnap is not None:
+                    pos = self._dragSnap.absolute_position
             self._dragEdge.pos_destination = pos
 
+    def _find_drag_targets(self, socket):
+        """ Highlight the sockets the edge dragged from `socket` can connect to
+        and index their positions for snapping.
+
+        """
+        sockets = self.controller.compatible_sockets(socket.parent.id, socket.id)
+        if sockets is None or self.scene is None:
+            return
+        nodes = self.scene.nodes
+        targets = set()
+        index = SpatialHash(cell_size=max(self.snap_radius, 1.0))
+        for node_id, socket_id in sockets:
+            node = nodes.get(node_id)
+            target = node.input_sockets_dict.get(socket_id) if node is not None else None
+            if target is not None and target.visible:
+                targets.add(target)
+                target.highlighted = True
+                index.insert(target, target.absolute_position)
+        self._dragTargets = targets
+        self._dragIndex = index
+
+    def _clear_drag_targets(self):
+        for target in self._dragTargets or ():
+            target.highlighted = False
+        self._dragTargets = None
+        self._dragIndex = None
+        self._dragSnap = None
+
+    def interaction_finished(self):
+        if self.controller is not None:
+            self.controller.interaction_finished()
+
     def handle_selection_changed(self, items):
         self.selectedItems = items
         if self.controller is not None:
@@ -54,6 +54,9 @@ class ProxyNodeItem(ProxyGraphicsItem):
     def set_color_background(self, color_background):
         raise NotImplementedError
 
+    def set_color_overlay(self, color_overlay):
+        raise NotImplementedError
+
     def set_content(self, content):
         raise NotImplementedError
 
@@ -87,6 +90,9 @@ class NodeItem(GraphicsItem):
     color_title_background = d_(ColorMember("#313131FF"))
     color_background = d_(ColorMember("#212121E3"))
 
+    #: optional tint painted over the node, e.g. to visualize execution cost
+    color_overlay = d_(ColorMember())
+
     show_content_inline = d_(Bool(False))
 
     #: the model item from the underlying graph structure
@@ -173,8 +179,8 @@ class NodeItem(GraphicsItem):
 
     @observe('id', 'name', 'width', 'height', 'edge_size', 'title_height',
              'padding', 'color_default', 'color_selected', 'color_title',
-             'color_title_background', 'color_background', 'show_content_inline',
-             'content')
+             'color_title_background', 'color_background', 'color_overlay',
+             'show_content_inline', 'content')
     def _update_proxy(self, change):
         """ An observer which sends state change to the proxy.
 
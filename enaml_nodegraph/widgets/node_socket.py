@@ -58,6 +58,12 @@ class ProxyNodeSocket(ProxyGraphicsItem):
     def set_color_outline(self, color_outline):
         raise NotImplementedError
 
+    def set_color_highlight(self, color_highlight):
+        raise NotImplementedError
+
+    def set_highlighted(self, highlighted):
+        raise NotImplementedError
+
 
 # Guard flags
 SOCKET_COMPUTE_HEIGHT_GUARD = 0x1
@@ -83,9 +89,13 @@ class NodeSocket(GraphicsItem):
     color_label = d_(ColorMember("#AAAAAAFF"))
     color_background = d_(ColorMember("#FF7700FF"))
     color_outline = d_(ColorMember("#000000FF"))
+    color_highlight = d_(ColorMember("#66FF66FF"))
 
     show_label = d_(Bool(True))
 
+    #: marks the socket, e.g. as a valid target while an edge is dragged
+    highlighted = d_(Bool(False))
+
     relative_position = Typed(Point2D)
     edges = ContainerList(EdgeItem)
 
@@ -115,7 +125,8 @@ class NodeSocket(GraphicsItem):
     #--------------------------------------------------------------------------
 
     @observe('name', 'socket_type', 'relative_position',
-             'radius', 'outline_width', 'color_background', 'color_outline')
+             'radius', 'outline_width', 'color_background', 'color_outline',
+             'color_highlight', 'highlighted')
     def _update_proxy(self, change):
         """ An observer which sends state change to the proxy.
 
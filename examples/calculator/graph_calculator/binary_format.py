@@ -0,0 +1,523 @@
+""" Compact binary graph files.
+
+The file holds the same node-link data as the JSON files written by the
+controller, laid out as a header followed by independent chunks:
+
+    header:  MAGIC (4 bytes) | version (u16) | reserved (u16)
+    chunk:   kind (u8) | payload size (u32) | payload
+
+A NODES or EDGES chunk stores up to `chunk_size` records column by column.
+Strings (ids, type names, socket names, attribute keys and text values) are
+interned into a string table at the start of each chunk, so chunks can be
+decoded on their own. Other record values, and the items of dict values such
+as 'attributes', are stored in one column per key holding the indices of the
+records that have it. Columns of a single scalar type are packed as typed
+arrays, mixed columns use a small tagged value encoding. All numbers are
+stored little-endian with a fixed width, whatever the host.
+
+"""
+import logging
+import struct
+from collections import deque
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+MAGIC = b'NGBF'
+VERSION = 1
+
+#: default file extension for binary graph files
+EXTENSION = '.ngb'
+
+CHUNK_GRAPH = 1
+CHUNK_NODES = 2
+CHUNK_EDGES = 3
+CHUNK_END = 255
+
+_HEADER = struct.Struct('<4sHH')
+_CHUNK = struct.Struct('<BI')
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_EXTRA_COLUMN = struct.Struct('<IIcI')
+
+#: size of the file header in bytes, the first chunk starts after it
+HEADER_SIZE = _HEADER.size
+
+# tags of the value encoding
+_NONE = 0
+_TRUE = 1
+_FALSE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_LIST = 6
+_DICT = 7
+_FLOAT_ARRAY = 8
+
+_U32_ARRAY = np.dtype('<u4')
+_F64_ARRAY = np.dtype('<f8')
+
+# dtypes of the scalar column kinds, other columns are tagged ('t')
+_COLUMN_DTYPES = {'d': _F64_ARRAY, 'q': np.dtype('<i8'), 'b': np.dtype('i1'), 's': _U32_ARRAY}
+_NO_KEY = 0xFFFFFFFF
+
+
+class FormatError(ValueError):
+    pass
+
+
+class StringTable(object):
+    """ Interns strings of a chunk to consecutive indices.
+
+    """
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def intern(self, value):
+        idx = self.index.get(value)
+        if idx is None:
+            idx = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+    def pack(self):
+        encoded = [s.encode('utf-8') for s in self.strings]
+        return _U32.pack(len(encoded)) + _column(_U32_ARRAY, [len(b) for b in encoded]) + b''.join(encoded)
+
+
+def _unpack_strings(buf, offset):
+    count, = _U32.unpack_from(buf, offset)
+    offset += 4
+    lengths, offset = _read_column(buf, offset, _U32_ARRAY, count)
+    strings = []
+    for length in lengths:
+        strings.append(bytes(buf[offset:offset + length]).decode('utf-8'))
+        offset += length
+    return strings, offset
+
+
+#------------------------------------------------------------------------------
+# Tagged values
+#------------------------------------------------------------------------------
+
+def _encode_value(out, value, strings):
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        out += _I64.pack(value)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _F64.pack(value)
+    elif isinstance(value, str):
+        out.append(_STR)
+        out += _U32.pack(strings.intern(value))
+    elif isinstance(value, (list, tuple)):
+        if value and all(type(v) is float for v in value):
+            out.append(_FLOAT_ARRAY)
+            out += _U32.pack(len(value))
+            out += _column(_F64_ARRAY, value)
+        else:
+            out.append(_LIST)
+            out += _U32.pack(len(value))
+            for v in value:
+                _encode_value(out, v, strings)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        out += _U32.pack(len(value))
+        for k, v in value.items():
+            out += _U32.pack(strings.intern(str(k)))
+            _encode_value(out, v, strings)
+    else:
+        raise TypeError("Cannot encode value of type %s" % type(value))
+
+
+def _decode_value(buf, offset, strings):
+    tag = buf[offset]
+    offset += 1
+    if tag == _NONE:
+        return None, offset
+    elif tag == _TRUE:
+        return True, offset
+    elif tag == _FALSE:
+        return False, offset
+    elif tag == _INT:
+        return _I64.unpack_from(buf, offset)[0], offset + 8
+    elif tag == _FLOAT:
+        return _F64.unpack_from(buf, offset)[0], offset + 8
+    elif tag == _STR:
+        return strings[_U32.unpack_from(buf, offset)[0]], offset + 4
+    elif tag == _FLOAT_ARRAY:
+        count, = _U32.unpack_from(buf, offset)
+        return _read_column(buf, offset + 4, _F64_ARRAY, count)
+    elif tag == _LIST:
+        count, = _U32.unpack_from(buf, offset)
+        offset += 4
+        result = []
+        for i in range(count):
+            value, offset = _decode_value(buf, offset, strings)
+            result.append(value)
+        return result, offset
+    elif tag == _DICT:
+        count, = _U32.unpack_from(buf, offset)
+        offset += 4
+        result = {}
+        for i in range(count):
+            key = strings[_U32.unpack_from(buf, offset)[0]]
+            result[key], offset = _decode_value(buf, offset + 4, strings)
+        return result, offset
+    raise FormatError("Invalid value tag %d at offset %d" % (tag, offset - 1))
+
+
+#------------------------------------------------------------------------------
+# Chunks
+#------------------------------------------------------------------------------
+
+def _column(dtype, values):
+    return np.array(values, dtype=dtype).tobytes()
+
+
+def _read_column(buf, offset, dtype, count):
+    try:
+        column = np.frombuffer(buf, dtype, count, offset)
+    except ValueError:
+        raise FormatError("Truncated column at offset %d" % offset)
+    return column.tolist(), offset + dtype.itemsize * count
+
+
+def _column_kind(values):
+    kind = type(values[0])
+    if any(type(v) is not kind for v in values):
+        return 't'
+    if kind is float:
+        return 'd'
+    elif kind is int:
+        return 'q'
+    elif kind is bool:
+        return 'b'
+    elif kind is str:
+        return 's'
+    return 't'
+
+
+def _encode_records(records, columns, strings):
+    """ Encode the dicts in `records` column by column.
+
+    `columns` lists the fixed (key, 'str' | 'u32') columns. All other values
+    are grouped into one column per key, or per (key, sub key) for dict
+    values such as 'attributes', which stores the indices of the records that
+    have the value followed by the values as a typed array.
+
+    """
+    keys = frozenset(key for key, kind in columns)
+    body = bytearray()
+    for key, kind in columns:
+        if kind == 'str':
+            body += _column(_U32_ARRAY, [strings.intern(r.get(key, '')) for r in records])
+        else:
+            body += _column(_U32_ARRAY, [r.get(key, 0) for r in records])
+
+    extra_columns = {}
+    for i, r in enumerate(records):
+        for key, value in r.items():
+            if key in keys:
+                continue
+            if isinstance(value, dict) and value:
+                for sub_key, sub_value in value.items():
+                    column = extra_columns.setdefault((key, str(sub_key)), ([], []))
+                    column[0].append(i)
+                    column[1].append(sub_value)
+            else:
+                column = extra_columns.setdefault((key, None), ([], []))
+                column[0].append(i)
+                column[1].append(value)
+
+    body += _U32.pack(len(extra_columns))
+    for (key, sub_key), (indices, values) in extra_columns.items():
+        kind = _column_kind(values)
+        body += _EXTRA_COLUMN.pack(strings.intern(key),
+                                   _NO_KEY if sub_key is None else strings.intern(sub_key),
+                                   kind.encode('ascii'), len(indices))
+        body += _column(_U32_ARRAY, indices)
+        if kind == 't':
+            for value in values:
+                _encode_value(body, value, strings)
+        elif kind == 's':
+            body += _column(_U32_ARRAY, [strings.intern(v) for v in values])
+        else:
+            body += _column(_COLUMN_DTYPES[kind], values)
+    return body
+
+
+_NODE_COLUMNS = (('id', 'str'), ('name', 'str'), ('type_name', 'str'))
+_EDGE_COLUMNS = (('id', 'str'), ('source', 'str'), ('target', 'str'), ('source_socket', 'str'),
+                 ('target_socket', 'str'), ('type_name', 'str'), ('key', 'u32'))
+
+
+def encode_nodes(nodes):
+    strings = StringTable()
+    records = []
+    positions = []
+    for node in nodes:
+        position = node.get('position')
+        if position is not None:
+            positions.extend(position)
+            node = {k: v for k, v in node.items() if k != 'position'}
+        else:
+            positions.extend((float('nan'), float('nan')))
+        records.append(node)
+    body = _U32.pack(len(records)) + _column(_F64_ARRAY, positions) + _encode_records(records, _NODE_COLUMNS, strings)
+    return strings.pack() + body
+
+
+def encode_edges(edges):
+    strings = StringTable()
+    body = _U32.pack(len(edges)) + _encode_records(edges, _EDGE_COLUMNS, strings)
+    return strings.pack() + body
+
+
+def _decode_records(buf, offset, count, columns, strings):
+    records = [{} for i in range(count)]
+    for key, kind in columns:
+        column, offset = _read_column(buf, offset, _U32_ARRAY, count)
+        if kind == 'str':
+            for record, idx in zip(records, column):
+                record[key] = strings[idx]
+        else:
+            for record, value in zip(records, column):
+                record[key] = value
+
+    n_columns, = _U32.unpack_from(buf, offset)
+    offset += 4
+    for c in range(n_columns):
+        key_idx, sub_key_idx, kind, n_values = _EXTRA_COLUMN.unpack_from(buf, offset)
+        offset += _EXTRA_COLUMN.size
+        key = strings[key_idx]
+        indices, offset = _read_column(buf, offset, _U32_ARRAY, n_values)
+        kind = kind.decode('ascii')
+        if kind == 't':
+            values = []
+            for i in range(n_values):
+                value, offset = _decode_value(buf, offset, strings)
+                values.append(value)
+        else:
+            values, offset = _read_column(buf, offset, _COLUMN_DTYPES[kind], n_values)
+            if kind == 's':
+                values = [strings[v] for v in values]
+            elif kind == 'b':
+                values = [bool(v) for v in values]
+
+        if sub_key_idx == _NO_KEY:
+            for i, value in zip(indices, values):
+                records[i][key] = value
+        else:
+            sub_key = strings[sub_key_idx]
+            for i, value in zip(indices, values):
+                record = records[i]
+                sub = record.get(key)
+                if sub is None:
+                    sub = record[key] = {}
+                sub[sub_key] = value
+    return records, offset
+
+
+def decode_nodes(payload):
+    buf = memoryview(payload)
+    strings, offset = _unpack_strings(buf, 0)
+    count, = _U32.unpack_from(buf, offset)
+    positions, offset = _read_column(buf, offset + 4, _F64_ARRAY, 2 * count)
+    records, offset = _decode_records(buf, offset, count, _NODE_COLUMNS, strings)
+    for i, record in enumerate(records):
+        x = positions[2 * i]
+        if x == x:
+            record['position'] = [x, positions[2 * i + 1]]
+    return records
+
+
+def decode_edges(payload):
+    buf = memoryview(payload)
+    strings, offset = _unpack_strings(buf, 0)
+    count, = _U32.unpack_from(buf, offset)
+    records, offset = _decode_records(buf, offset + 4, count, _EDGE_COLUMNS, strings)
+    return records
+
+
+def encode_graph_attributes(attributes):
+    strings = StringTable()
+    out = bytearray()
+    _encode_value(out, attributes, strings)
+    return strings.pack() + out
+
+
+def decode_graph_attributes(payload):
+    buf = memoryview(payload)
+    strings, offset = _unpack_strings(buf, 0)
+    return _decode_value(buf, offset, strings)[0]
+
+
+_DECODERS = {
+    CHUNK_GRAPH: ('graph', decode_graph_attributes),
+    CHUNK_NODES: ('nodes', decode_nodes),
+    CHUNK_EDGES: ('links', decode_edges),
+}
+
+
+#------------------------------------------------------------------------------
+# Files
+#------------------------------------------------------------------------------
+
+def _write_chunk(fp, kind, payload):
+    fp.write(_CHUNK.pack(kind, len(payload)))
+    fp.write(payload)
+
+
+def dump(data, fp, chunk_size=4096):
+    """ Write node-link graph data to the binary file object `fp`.
+
+    """
+    fp.write(_HEADER.pack(MAGIC, VERSION, 0))
+    _write_chunk(fp, CHUNK_GRAPH, encode_graph_attributes(data.get('graph', {})))
+    nodes = data.get('nodes', [])
+    for start in range(0, len(nodes), chunk_size):
+        _write_chunk(fp, CHUNK_NODES, encode_nodes(nodes[start:start + chunk_size]))
+    edges = data.get('links', data.get('edges', []))
+    for start in range(0, len(edges), chunk_size):
+        _write_chunk(fp, CHUNK_EDGES, encode_edges(edges[start:start + chunk_size]))
+    _write_chunk(fp, CHUNK_END, b'')
+
+
+def read_header(fp):
+    header = fp.read(_HEADER.size)
+    if len(header) != _HEADER.size:
+        raise FormatError("Truncated header")
+    magic, version, reserved = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise FormatError("Not a binary graph file")
+    if version > VERSION:
+        raise FormatError("Unsupported binary graph file version: %d" % version)
+    return version
+
+
+def iter_raw_chunks(fp):
+    """ Yield (kind, payload) for every chunk of a file positioned after its header.
+
+    """
+    while True:
+        head = fp.read(_CHUNK.size)
+        if len(head) != _CHUNK.size:
+            raise FormatError("Truncated chunk header")
+        kind, size = _CHUNK.unpack(head)
+        if kind == CHUNK_END:
+            return
+        payload = fp.read(size)
+        if len(payload) != size:
+            raise FormatError("Truncated chunk")
+        yield kind, payload
+
+
+def decode_chunk(kind, payload):
+    """ Decode a chunk to a (section, value) tuple where section is one of
+    'graph', 'nodes' or 'links'.
+
+    """
+    try:
+        section, decoder = _DECODERS[kind]
+    except KeyError:
+        raise FormatError("Unknown chunk kind: %d" % kind)
+    return section, decoder(payload)
+
+
+#: keys every node or edge record must have to be loaded
+REQUIRED_KEYS = {
+    'nodes': ('id', 'name', 'type_name', 'position'),
+    'links': ('source', 'target', 'source_socket', 'target_socket', 'type_name'),
+}
+
+
+def validate_records(section, records):
+    """ Return the records that have all REQUIRED_KEYS of their section,
+    and error messages for the others.
+
+    """
+    required = REQUIRED_KEYS.get(section, ())
+    valid = []
+    errors = []
+    for record in records:
+        missing = [key for key in required if key not in record]
+        if missing:
+            errors.append("Invalid %s record %s: missing %s" % (section, record.get('id'), ', '.join(missing)))
+        else:
+            valid.append(record)
+    return valid, errors
+
+
+def decode_and_validate_chunk(kind, payload):
+    """ Decode a chunk to a (section, value, errors) tuple, where invalid records
+    are dropped from value and reported in errors.
+
+    Runs in the worker processes of `iter_chunks`.
+
+    """
+    section, value = decode_chunk(kind, payload)
+    if section == 'graph':
+        return section, value, []
+    value, errors = validate_records(section, value)
+    return section, value, errors
+
+
+def iter_chunks(fp, executor=None, prefetch=None):
+    """ Yield (section, value, errors, offset) for the chunks of a binary file in
+    file order, where offset is the file position after the chunk.
+
+    With a concurrent.futures `executor`, up to `prefetch` chunks (by default two
+    per worker) are decoded ahead of the consumer in parallel.
+
+    """
+    read_header(fp)
+    if executor is None:
+        for kind, payload in iter_raw_chunks(fp):
+            yield decode_and_validate_chunk(kind, payload) + (fp.tell(),)
+        return
+
+    if prefetch is None:
+        prefetch = 2 * getattr(executor, '_max_workers', 1)
+    pending = deque()
+    try:
+        for kind, payload in iter_raw_chunks(fp):
+            pending.append((executor.submit(decode_and_validate_chunk, kind, payload), fp.tell()))
+            if len(pending) >= prefetch:
+                future, offset = pending.popleft()
+                yield future.result() + (offset,)
+        while pending:
+            future, offset = pending.popleft()
+            yield future.result() + (offset,)
+    finally:
+        for future, offset in pending:
+            future.cancel()
+
+
+def load(fp, executor=None):
+    """ Read a binary graph file into node-link graph data, dropping invalid records.
+
+    """
+    data = {'directed': True, 'multigraph': True, 'graph': {}, 'nodes': [], 'links': []}
+    for section, value, errors, offset in iter_chunks(fp, executor):
+        if section == 'graph':
+            data['graph'] = value
+        else:
+            data[section].extend(value)
+        for error in errors:
+            log.error(error)
+    return data
+
+
+def is_binary_file(path):
+    with open(path, 'rb') as fp:
+        return fp.read(len(MAGIC)) == MAGIC
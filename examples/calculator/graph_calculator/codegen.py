@@ -0,0 +1,209 @@
+""" Compile calculator graphs to plain Python functions.
+
+The nodes are visited in topological order and each one is translated by the
+kernel registered for its class into expressions of its inputs. The generated
+function takes the values of the input nodes as arguments, defaulting to
+their values at compile time, and returns the values arriving at the output
+nodes:
+
+    def graph_function(p0=_k0, p1=_k1):
+        v0 = _k2(p0)
+        v1 = (v0 + p1)
+        return (v1,)
+
+Operators and attributes are fixed when compiling, functions and other values
+are bound as constants `_k<n>`. The function runs without the model objects,
+errors of the operators are raised instead of logged.
+
+"""
+from functools import lru_cache
+
+from atom.api import Atom, Str, List, Dict, Value
+
+from enaml_nodegraph.model import leaf_links, flat_topological_sort
+
+from . import model
+
+#: node class -> kernel(node, args, compiler) returning the expressions of the
+#: node's outputs, given the expressions of its inputs
+KERNELS = {}
+
+
+def kernel(*classes):
+    """ Register the decorated function as the kernel of the node classes.
+
+    """
+    def register(function):
+        for cls in classes:
+            KERNELS[cls] = function
+        return function
+    return register
+
+
+def find_kernel(node):
+    for cls in type(node).__mro__:
+        function = KERNELS.get(cls)
+        if function is not None:
+            return function
+    return None
+
+
+@lru_cache(maxsize=64)
+def _compile_source(source):
+    return compile(source, '<graph_function>', 'exec')
+
+
+class CompiledGraph(Atom):
+    """ A graph compiled to a function of its input values.
+
+    """
+    source = Str()
+
+    #: ids of the nodes providing the arguments and receiving the results, in order
+    input_ids = List()
+    output_ids = List()
+
+    #: graph_function(*input values) -> tuple of output values
+    function = Value()
+
+    def __call__(self, values=None):
+        """ Return output node id -> value, for input node id -> value `values`.
+
+        Inputs not given keep their value at compile time.
+
+        """
+        function = self.function
+        if values:
+            defaults = function.__defaults__
+            args = [values.get(node_id, default) for node_id, default in zip(self.input_ids, defaults)]
+            results = function(*args)
+        else:
+            results = function()
+        return dict(zip(self.output_ids, results))
+
+
+class GraphCompiler(Atom):
+    """ Generates the source of a CompiledGraph, used by kernels to bind
+    constants, declare arguments and results.
+
+    """
+    namespace = Dict()
+    lines = List()
+
+    parameters = List()
+    input_ids = List()
+    results = List()
+    output_ids = List()
+
+    def constant(self, value):
+        name = '_k%d' % len(self.namespace)
+        self.namespace[name] = value
+        return name
+
+    def parameter(self, node, value):
+        name = 'p%d' % len(self.parameters)
+        self.parameters.append('%s=%s' % (name, self.constant(value)))
+        self.input_ids.append(node.id)
+        return name
+
+    def result(self, node, expression):
+        self.results.append(expression)
+        self.output_ids.append(node.id)
+
+    def compile(self, graph):
+        # groups are compiled as their contents, connected across the group boundaries
+        sources = {}
+        for start, end, edges in leaf_links(graph):
+            sources[end] = (start, edges)
+        used = set(start for start, _ in sources.values())
+
+        variables = {}
+        for node in flat_topological_sort(graph):
+            function = find_kernel(node)
+            if function is None:
+                raise TypeError("No kernel for node type %s" % type(node).__name__)
+            args = []
+            for socket in node.inputs:
+                source = sources.get(socket)
+                if source is None:
+                    # the value the node holds for an unconnected input
+                    holder = node if hasattr(node, socket.name) else node.attributes
+                    args.append(self.constant(getattr(holder, socket.name, None)))
+                    continue
+                start, edges = source
+                expression = variables[start]
+                for edge in edges:
+                    if edge.converter is not None:
+                        expression = '%s(%s)' % (self.constant(edge.converter), expression)
+                args.append(expression)
+            for socket, expression in zip(node.outputs, function(node, args, self)):
+                if socket not in used:
+                    continue
+                if not expression.isidentifier():
+                    name = 'v%d' % len(self.lines)
+                    self.lines.append('%s = %s' % (name, expression))
+                    expression = name
+                variables[socket] = expression
+
+        source = ['def graph_function(%s):' % ', '.join(self.parameters)]
+        source.extend('    ' + line for line in self.lines)
+        source.append('    return (%s)' % ''.join(r + ', ' for r in self.results))
+        source = '\n'.join(source) + '\n'
+
+        namespace = dict(self.namespace)
+        exec(_compile_source(source), namespace)
+        return CompiledGraph(source=source, input_ids=self.input_ids, output_ids=self.output_ids,
+                             function=namespace['graph_function'])
+
+
+def compile_graph(graph):
+    """ Return a CompiledGraph computing the outputs of `graph` from its inputs.
+
+    Raises TypeError for nodes without a kernel.
+
+    """
+    return GraphCompiler().compile(graph)
+
+
+@kernel(model.InputNode)
+def _input_kernel(node, args, compiler):
+    return [compiler.parameter(node, getattr(node.attributes, s.name)) for s in node.outputs]
+
+
+@kernel(model.RampGeneratorModel)
+def _ramp_kernel(node, args, compiler):
+    return [compiler.parameter(node, node.value)]
+
+
+@kernel(model.OutputNode, model.GraphOutputModel)
+def _output_kernel(node, args, compiler):
+    for expression in args:
+        compiler.result(node, expression)
+    return []
+
+
+@kernel(model.OperatorNode)
+def _transform_kernel(node, args, compiler):
+    """ Single input operators, through their transform function.
+
+    """
+    if type(node).transform is model.OperatorNode.transform:
+        raise TypeError("No kernel for node type %s" % type(node).__name__)
+    function = node.transform()
+    if function is None:
+        raise ValueError("Invalid operator of node %s" % node.id)
+    return ['%s(%s)' % (compiler.constant(function), args[0])]
+
+
+BINARY_TEMPLATES = {
+    'add': '({0} + {1})',
+    'sub': '({0} - {1})',
+    'mul': '({0} * {1})',
+    # the result member is a Float
+    'div': 'float(int({0} / {1}))',
+}
+
+
+@kernel(model.BinaryOperatorModel)
+def _binary_kernel(node, args, compiler):
+    return [BINARY_TEMPLATES[node.attributes.operator].format(*args)]
@@ -0,0 +1,104 @@
+""" Undoable edits of the calculator graph, applied through the controller.
+
+Nodes and edges are stored as the records also used by the journal, attribute
+edits and moves only as the old and new values of what changed.
+
+"""
+from atom.api import Str, Dict
+
+from enaml_nodegraph.history import Command
+from enaml_nodegraph.primitives import Point2D
+
+
+class AddNodeCommand(Command):
+    record = Dict()
+
+    def undo(self, controller):
+        controller.destroy_node(self.record['id'])
+
+    def redo(self, controller):
+        controller.deserialize_node(self.record)
+
+
+class RemoveNodeCommand(AddNodeCommand):
+
+    def undo(self, controller):
+        super(RemoveNodeCommand, self).redo(controller)
+
+    def redo(self, controller):
+        super(RemoveNodeCommand, self).undo(controller)
+
+
+class AddEdgeCommand(Command):
+    record = Dict()
+
+    def undo(self, controller):
+        controller.destroy_edge(self.record['id'])
+
+    def redo(self, controller):
+        controller.deserialize_edge(self.record)
+
+
+class RemoveEdgeCommand(AddEdgeCommand):
+
+    def undo(self, controller):
+        super(RemoveEdgeCommand, self).redo(controller)
+
+    def redo(self, controller):
+        super(RemoveEdgeCommand, self).undo(controller)
+
+
+class MoveNodesCommand(Command):
+    """ Moves of any number of nodes, consecutive moves are merged.
+
+    """
+    #: node id -> position as [x, y]
+    old_positions = Dict()
+    new_positions = Dict()
+
+    def undo(self, controller):
+        self._apply(controller, self.old_positions)
+
+    def redo(self, controller):
+        self._apply(controller, self.new_positions)
+
+    def merge(self, command):
+        if not isinstance(command, MoveNodesCommand):
+            return False
+        old_positions = self.old_positions
+        for node_id, position in command.old_positions.items():
+            if node_id not in old_positions:
+                old_positions[node_id] = position
+        self.new_positions.update(command.new_positions)
+        return True
+
+    @staticmethod
+    def _apply(controller, positions):
+        for node_id, position in positions.items():
+            controller.move_node(node_id, Point2D.from_list(position))
+
+
+class SetAttributesCommand(Command):
+    """ Changes of attributes of a node, consecutive changes of the node are merged.
+
+    """
+    node_id = Str()
+
+    #: attribute name -> archived value
+    old_values = Dict()
+    new_values = Dict()
+
+    def undo(self, controller):
+        controller.find_node(self.node_id).attributes.deserialize(self.old_values)
+
+    def redo(self, controller):
+        controller.find_node(self.node_id).attributes.deserialize(self.new_values)
+
+    def merge(self, command):
+        if not isinstance(command, SetAttributesCommand) or command.node_id != self.node_id:
+            return False
+        for name, value in command.old_values.items():
+            if name not in self.old_values:
+                self.old_values[name] = value
+        self.new_values.update(command.new_values)
+        return True
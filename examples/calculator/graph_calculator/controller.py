@@ -1,20 +1,44 @@
 import logging
 import os
-import networkx as nx
 import json
+import time
 
-from atom.api import (Bool, List, Str, Typed, Instance, Event, observe)
+from atom.api import (Bool, Int, Float, List, Str, Typed, Instance, Event, Value, observe)
+from enaml.application import deferred_call, timed_call
 
 from enaml_nodegraph.controller import GraphControllerBase
+from enaml_nodegraph.history import CommandStack
 from enaml_nodegraph.widgets.node_item import NodeItem
 from enaml_nodegraph.primitives import Point2D, Transform2D
+from enaml_nodegraph.tracing import tracer, traced
+from enaml_nodegraph.model.blobs import BlobWriter, BLOB_SUFFIX, blob_reader_for
+from enaml_nodegraph.model.hashing import ContentHashes, HashingBlobs, diff_snapshots
+from enaml_nodegraph.model.diff import diff_records
+from enaml_nodegraph.model.base import serialize as serialize_member
 
 from .registry import TypeRegistry
-from .model import ExecutableGraph
+from .model import ExecutableGraph, GroupModel
+from .loader import GraphLoader, executor_for
+from .journal import ChangeJournal, journal_path, read_journal
+from .commands import (AddNodeCommand, RemoveNodeCommand, AddEdgeCommand, RemoveEdgeCommand,
+                       MoveNodesCommand, SetAttributesCommand)
+from . import binary_format
 
 log = logging.getLogger(__name__)
 
 
+#: references arrays by digest when hashing records
+_hashing_blobs = HashingBlobs()
+
+#: distance between a new group and the nodes it contains
+GROUP_MARGIN = 50
+
+
+def _is_input_attribute(member):
+    # input attributes are set from the sockets while the graph executes
+    return (member.metadata or {}).get('attr_type') == 'input'
+
+
 class CalculatorGraphController(GraphControllerBase):
 
     is_active = Bool(False)
@@ -28,6 +52,61 @@ class CalculatorGraphController(GraphControllerBase):
 
     selectedNodes = List(NodeItem)
 
+    #: tint nodes in the view by their share of the execution time
+    profile_overlay = Bool(False)
+
+    #: minimum interval between overlay refreshes in seconds
+    profile_overlay_interval = Float(0.5)
+
+    _overlay_refreshed = Float()
+
+    #: whether the profiler was enabled before the overlay was turned on
+    _profiler_was_enabled = Bool(False)
+
+    #: record a Chrome trace-event file of execution and editing activity
+    tracing = Bool(False)
+    trace_filename = Str('graph_trace.json')
+
+    #: incremental loader of the file being opened, if any
+    loader = Typed(GraphLoader)
+
+    #: record edits to a journal next to the graph file and replay it when the file is opened
+    autosave = Bool(False)
+
+    #: seconds between writes of buffered edits to the journal
+    autosave_interval = Float(2.0)
+
+    #: number of journal records above which the journal is folded into the graph file
+    journal_compact_threshold = Int(1000)
+
+    journal = Typed(ChangeJournal)
+
+    _autosave_scheduled = Bool(False)
+
+    #: digest of the graph content when the journal was last written
+    _journal_digest = Value()
+
+    #: content hashes of the nodes and edges, keyed by ('node', id) and ('edge', id)
+    hashes = Typed(ContentHashes)
+
+    #: snapshot of the hashes when the graph was last opened or saved
+    saved_snapshot = Value()
+
+    _dirty_check_scheduled = Bool(False)
+
+    #: undo and redo history of the edits
+    history = Typed(CommandStack, ())
+
+    #: attributes object -> node view id, for the watched nodes
+    _watched_attributes = Typed(dict, ())
+
+    #: view id of an expanded group -> ids of the views of its contents
+    _expanded_groups = Typed(dict, ())
+
+    #: ids of the views of the contents of expanded groups, which cannot be
+    #: edited structurally
+    _inner_views = Typed(set, ())
+
     def default_current_path(self):
         return os.curdir
 
@@ -37,21 +116,62 @@ class CalculatorGraphController(GraphControllerBase):
     def _default_graph(self):
         return ExecutableGraph(controller=self)
 
+    def _default_hashes(self):
+        return ContentHashes(record_for=self._content_record)
+
     @observe('view.selectedItems')
     def filter_selected_items(self, change):
         self.selectedNodes = [i for i in change['value'] if isinstance(i, NodeItem)]
 
-    @observe('graph.topologyChanged', 'graph.attributesChanged')
-    def mark_dirty(self, change):
-        self.is_dirty = True
+    def _observe_profile_overlay(self, change):
+        profiler = self.graph.profiler
+        if change['value']:
+            self._profiler_was_enabled = profiler.enabled
+            profiler.enabled = True
+            profiler.observe('ticks', self._handle_profiler_tick)
+            self.refresh_profile_overlay()
+        else:
+            profiler.unobserve('ticks', self._handle_profiler_tick)
+            # the graph reschedules and fuses its chains again when the profiler is disabled
+            profiler.enabled = self._profiler_was_enabled
+            if self.view is not None and self.view.scene is not None:
+                for node_view in self.view.scene.nodes.values():
+                    node_view.color_overlay = None
+
+    def _observe_tracing(self, change):
+        if change['value']:
+            tracer.start(os.path.join(self.current_path, self.trace_filename))
+        elif tracer.enabled:
+            tracer.stop()
+            log.info("Trace written to %s" % tracer.path)
+
+    def log_profiler_report(self, count=20):
+        log.info("Profiler report:\n%s" % self.graph.profiler.report(count))
 
+    def _handle_profiler_tick(self, change):
+        if time.perf_counter() - self._overlay_refreshed >= self.profile_overlay_interval:
+            self.refresh_profile_overlay()
+
+    def refresh_profile_overlay(self):
+        self._overlay_refreshed = time.perf_counter()
+        if self.view is None or self.view.scene is None:
+            return
+        costs = self.graph.profiler.costs()
+        for node_id, node_view in self.view.scene.nodes.items():
+            cost = costs.get(node_id)
+            if cost is None:
+                node_view.color_overlay = None
+                continue
+            node_view.color_overlay = "#%02X%02X00%02X" % (int(255 * cost), int(255 * (1. - cost)), 96)
+
+    @traced(cat='controller')
     def create_node(self, typename, **kw):
         if self.view.scene is None:
             return
 
         nt = self.registry.node_type_name_map.get(typename, None)
         if nt is not None:
-            node = nt.model_class()
+            node = kw.get('model') or nt.model_class()
             kw['model'] = node
             kw['type_name'] = typename
             n = nt.widget_class(**kw)
@@ -60,18 +180,40 @@ class CalculatorGraphController(GraphControllerBase):
             n.name = "%s (%s)" % (nt.name, n.id.split("-")[-1])
             self.graph.nodes.append(node)
             self.graph.topologyChanged()
+            self._watch_node(n)
+            self._content_changed(('node', node.id))
+            if self._history_recording():
+                self.history.push(AddNodeCommand(record=self._node_record(node)))
+            if self.journal is not None:
+                self._record('add_node', node=self._node_record(node))
             return n
 
+    @traced(cat='controller')
     def destroy_node(self, id):
         if self.view.scene is None:
             return
 
+        if id in self._inner_views:
+            return
         if id in self.view.scene.nodes:
-            if self.view.scene.nodes[id].model in self.graph.nodes:
-                self.graph.nodes.remove(self.graph.node_dict[id])
-            self.view.scene.nodes[id].destroy()
-            self.graph.topologyChanged()
+            node_view = self.view.scene.nodes[id]
+            self._show_group_contents(id, False)
+            with self.history.macro():
+                # the edges go first, so undo restores them after the node
+                for socket in node_view.input_sockets + node_view.output_sockets:
+                    for edge_view in socket.edges[:]:
+                        self.destroy_edge(edge_view.id)
+                if node_view.model in self.graph.nodes:
+                    if self._history_recording():
+                        self.history.push(RemoveNodeCommand(record=self._node_record(node_view.model)))
+                    self.graph.nodes.remove(self.graph.node_dict[id])
+                self._unwatch_node(node_view)
+                node_view.destroy()
+                self.graph.topologyChanged()
+                self._content_changed(('node', id))
+                self._record('remove_node', id=id)
 
+    @traced(cat='controller')
     def create_edge(self, typename, **kw):
         if self.view.scene is None:
             return
@@ -86,31 +228,40 @@ class CalculatorGraphController(GraphControllerBase):
             edge.id = e.id
             return e
 
+    @traced(cat='controller')
     def destroy_edge(self, id):
         if self.view.scene is None:
             return
 
         if id in self.view.scene.edges:
             if self.view.scene.edges[id].model in self.graph.edges:
-                self.graph.edges.remove(self.view.scene.edges[id].model)
+                self._remove_edge(self.view.scene.edges[id].model)
             self.view.scene.edges[id].destroy()
 
     def edge_type_for_start_socket(self, start_node, start_socket):
         return 'default'
 
     def edge_can_connect(self, start_node_id, start_socket_id, end_node_id, end_socket_id):
-        if self.view.scene is None:
+        if self.view.scene is None or start_node_id in self._inner_views or end_node_id in self._inner_views:
             return False
         try:
             start_node = self.graph.node_dict[start_node_id]
             end_node = self.graph.node_dict[end_node_id]
             start_socket = start_node.output_dict[start_socket_id]
             end_socket = end_node.input_dict[end_socket_id]
-            return end_socket.can_connect(start_socket)
+            return end_socket.can_connect(start_socket) and \
+                not self.graph.would_create_cycle(start_node, end_node)
         except KeyError as e:
             log.exception(e)
             return False
 
+    def compatible_sockets(self, start_node_id, start_socket_id):
+        start_node = self.graph.node_dict.get(start_node_id)
+        if start_node is None or start_socket_id not in start_node.output_dict:
+            return []
+        return [(s.node.id, s.name) for s in self.graph.compatible_inputs(start_node.output_dict[start_socket_id])]
+
+    @traced(cat='controller')
     def edge_connected(self, id):
         if id in self.view.scene.edges:
             edge_view = self.view.scene.edges[id]
@@ -121,113 +272,854 @@ class CalculatorGraphController(GraphControllerBase):
             edge.end_socket = es_view.parent.model.input_dict[es_view.name]
             self.graph.edges.append(edge)
             self.graph.topologyChanged()
+            self._content_changed(('edge', id))
+            if self._history_recording():
+                self.history.push(AddEdgeCommand(record=self._edge_record(edge)))
+            if self.journal is not None:
+                self._record('add_edge', edge=self._edge_record(edge))
 
+    @traced(cat='controller')
     def edge_disconnect(self, id):
+        if id in self._inner_views:
+            return
         if id in self.view.scene.edges:
             edge = self.view.scene.edges[id].model
+            if edge in self.graph.edges:
+                self._remove_edge(edge)
             edge.start_socket = None
             edge.end_socket = None
-            if edge in self.graph.edges:
-                self.graph.edges.remove(edge)
             self.graph.topologyChanged()
 
-    def serialize_graph(self):
-        G = self.graph.nxgraph.copy()
-        G.graph['viewport_transform'] = self.view.getViewportTransform().to_list()
-        for node_id in G.nodes():
-            node_view = self.view.scene.nodes[node_id]
-            node_data = {}
-            self.serialize_node(node_data, node_view)
-            G.nodes[node_id].update(node_data)
-
-        for start_node_id, end_node_id, key, edge_id in G.edges(data='id', keys=True):
-            if edge_id is None:
-                continue
-            edge_view = self.view.scene.edges[edge_id]
-            edge_data = {}
-            self.serialize_edge(edge_data, edge_view)
-            G.edges[start_node_id, end_node_id, key].update(edge_data)
+    def _remove_edge(self, edge):
+        if self._history_recording():
+            self.history.push(RemoveEdgeCommand(record=self._edge_record(edge)))
+        self.graph.edges.remove(edge)
+        self._content_changed(('edge', edge.id))
+        self._record('remove_edge', id=edge.id)
+
+    @traced(cat='io')
+    def serialize_graph(self, blobs=None):
+        """ Return the graph and its view state as node-link data.
+
+        Array attributes are written to the BlobWriter `blobs` if given.
+
+        """
+        nodes = [self._node_record(node, blobs) for node in self.graph.nodes]
 
-        return G
+        links = []
+        keys = {}
+        for edge in self.graph.edges:
+            edge_data = self._edge_record(edge, blobs)
+            # parallel edges between two nodes are told apart by their key
+            pair = (edge_data['source'], edge_data['target'])
+            edge_data['key'] = keys.get(pair, 0)
+            keys[pair] = edge_data['key'] + 1
+            links.append(edge_data)
 
-    def serialize_node(self, archive, node_view):
+        return {'directed': True, 'multigraph': True,
+                'graph': {'viewport_transform': self.view.getViewportTransform().to_list()},
+                'nodes': nodes, 'links': links}
+
+    def _node_record(self, node, blobs=None):
+        node_data = {'id': node.id, 'name': node.name}
+        self.serialize_node(node_data, self.view.scene.nodes[node.id], blobs)
+        return node_data
+
+    def _edge_record(self, edge, blobs=None):
+        edge_data = {'id': edge.id,
+                     'source': edge.start_socket.node.id,
+                     'target': edge.end_socket.node.id,
+                     'source_socket': edge.start_socket.name,
+                     'target_socket': edge.end_socket.name}
+        self.serialize_edge(edge_data, self.view.scene.edges[edge.id], blobs)
+        return edge_data
+
+    def serialize_node(self, archive, node_view, blobs=None):
         archive['type_name'] = node_view.type_name
         archive['position'] = node_view.position.to_list()
+        if isinstance(node_view.model, GroupModel):
+            archive['subgraph'] = self._subgraph_record(node_view.model, node_view.id, blobs)
         if node_view.model is not None:
-            node_view.model.serialize(archive)
+            node_view.model.serialize(archive, blobs)
 
-    def serialize_edge(self, archive,  edge_view):
+    def _subgraph_record(self, group, view_id, blobs=None):
+        """ Return the node-link data of the contents of `group`, shown by the view
+        `view_id` if expanded. Positions are relative to the group.
+
+        """
+        scene_nodes = self.view.scene.nodes
+        group_view = scene_nodes.get(view_id)
+        nodes = []
+        for node in group.subgraph.nodes:
+            node_view_id = '%s/%s' % (view_id, node.id)
+            node_data = {'id': node.id, 'name': node.name,
+                         'type_name': self.registry.node_model_type_map[type(node)].id}
+            node_view = scene_nodes.get(node_view_id)
+            if group_view is not None and node_view is not None:
+                node_data['position'] = (node_view.position - group_view.position).to_list()
+            else:
+                node_data['position'] = group.positions.get(node.id, [0.0, 0.0])
+            if isinstance(node, GroupModel):
+                node_data['subgraph'] = self._subgraph_record(node, node_view_id, blobs)
+            node.serialize(node_data, blobs)
+            nodes.append(self._without_inputs(node_data, node))
+
+        links = []
+        for edge in group.subgraph.edges:
+            if edge.is_open:
+                continue
+            edge_data = {'id': edge.id,
+                         'source': edge.start_socket.node.id,
+                         'target': edge.end_socket.node.id,
+                         'source_socket': edge.start_socket.name,
+                         'target_socket': edge.end_socket.name,
+                         'type_name': self.registry.edge_model_type_map[type(edge)].id}
+            edge.serialize(edge_data, blobs)
+            links.append(edge_data)
+        return {'nodes': nodes, 'links': links}
+
+    def serialize_edge(self, archive,  edge_view, blobs=None):
         archive['type_name'] = edge_view.type_name
         if edge_view.model is not None:
-            edge_view.model.serialize(archive)
+            edge_view.model.serialize(archive, blobs)
 
-    def deserialize_graph(self, G, replace=True):
-        if 'viewport_transform' in G.graph:
-            self.view.setViewportTransform(Transform2D.from_list(G.graph['viewport_transform']))
+    @traced(cat='io')
+    def deserialize_graph(self, data, replace=True, blobs=None):
+        self.deserialize_graph_attributes(data.get('graph', {}))
 
-        for node_id in G.nodes.keys():
-            data = G.nodes[node_id]
-            type_name = data.get('type_name', None)
-            if type_name is None:
-                log.error("Invalid Node (missing type_name): %s" % node_id)
-                continue
+        # build the whole graph before executing it once
+        with self.graph.updates_suspended(), self.history.suspended():
+            for node_data in data.get('nodes', []):
+                self.deserialize_node(node_data, blobs)
 
-            position = Point2D.from_list(data['position'])
-            name = data['name']
+            for edge_data in data.get('links', data.get('edges', [])):
+                self.deserialize_edge(edge_data, blobs)
 
-            n = self.create_node(type_name, id=node_id, name=name, position=position)
-            if n.model is not None:
-                n.model.deserialize(data)
+            for error in self.graph.validate():
+                log.error("Invalid graph: %s" % error)
 
-        for start_node_id, end_node_id, key, edge_id in G.edges(data='id', keys=True):
-            data = G.edges[start_node_id, end_node_id, key]
-            type_name = data.get('type_name', None)
-            if type_name is None:
-                log.error("Invalid Edge (missing type_name): %s" % edge_id)
-                continue
+    def deserialize_graph_attributes(self, data):
+        if 'viewport_transform' in data:
+            self.view.setViewportTransform(Transform2D.from_list(data['viewport_transform']))
 
-            source_socket_name = data['source_socket']
-            target_socket_name = data['target_socket']
-            source_socket = None
-            target_socket = None
-            for socket in self.view.scene.nodes[start_node_id].output_sockets:
-                if socket.name == source_socket_name:
-                    source_socket = socket
-                    break
-            for socket in self.view.scene.nodes[end_node_id].input_sockets:
-                if socket.name == target_socket_name:
-                    target_socket = socket
-                    break
-            if source_socket is None or target_socket is None:
-                log.error("Invalid edge - missing socket: %s" % edge_id)
-                continue
+    def deserialize_node(self, data, blobs=None):
+        node_id = data['id']
+        type_name = data.get('type_name', None)
+        if type_name is None:
+            log.error("Invalid Node (missing type_name): %s" % node_id)
+            return
 
-            e = self.create_edge(type_name, id=edge_id)
-            e.start_socket = source_socket
-            e.end_socket = target_socket
+        position = Point2D.from_list(data['position'])
+        name = data['name']
 
-            if e.model is not None:
-                e.model.deserialize(data)
+        # the contents of groups are created without views
+        model = self._build_node(data, blobs) if 'subgraph' in data else None
+        n = self.create_node(type_name, id=node_id, name=name, position=position, model=model)
+        if n.model is not None:
+            n.model.name = name
+            if model is None:
+                n.model.deserialize(data, blobs)
+        if model is not None and model.attributes.expanded:
+            self._show_group_contents(n.id, True)
+        return n
 
-            self.edge_connected(edge_id)
+    def _build_node(self, data, blobs=None):
+        """ Return the model of the node record `data`, with the contents of groups.
+
+        """
+        node = self.registry.node_type_name_map[data['type_name']].model_class(id=data['id'],
+                                                                              name=data.get('name', ''))
+        subgraph = data.get('subgraph')
+        if subgraph is not None:
+            node_records = subgraph.get('nodes', [])
+            node.subgraph.nodes = [self._build_node(node_data, blobs) for node_data in node_records]
+            node.positions = {node_data['id']: node_data['position'] for node_data in node_records
+                              if 'position' in node_data}
+            nodes = node.subgraph.node_dict
+            edges = []
+            for edge_data in subgraph.get('links', []):
+                edge_type = self.registry.edge_type_name_map[edge_data['type_name']]
+                edge = edge_type.model_class(
+                    id=edge_data['id'],
+                    start_socket=nodes[edge_data['source']].output_dict[edge_data['source_socket']],
+                    end_socket=nodes[edge_data['target']].input_dict[edge_data['target_socket']])
+                edge.deserialize(edge_data, blobs)
+                edges.append(edge)
+            node.subgraph.edges = edges
+        node.deserialize(data, blobs)
+        return node
+
+    def deserialize_edge(self, data, blobs=None):
+        edge_id = data.get('id')
+        start_node_id = data['source']
+        end_node_id = data['target']
+        type_name = data.get('type_name', None)
+        if type_name is None:
+            log.error("Invalid Edge (missing type_name): %s" % edge_id)
+            return
+
+        source_socket_name = data['source_socket']
+        target_socket_name = data['target_socket']
+        source_socket = None
+        target_socket = None
+        for socket in self.view.scene.nodes[start_node_id].output_sockets:
+            if socket.name == source_socket_name:
+                source_socket = socket
+                break
+        for socket in self.view.scene.nodes[end_node_id].input_sockets:
+            if socket.name == target_socket_name:
+                target_socket = socket
+                break
+        if source_socket is None or target_socket is None:
+            log.error("Invalid edge - missing socket: %s" % edge_id)
+            return
+
+        e = self.create_edge(type_name, id=edge_id)
+        e.start_socket = source_socket
+        e.end_socket = target_socket
+
+        if e.model is not None:
+            e.model.deserialize(data, blobs)
+
+        self.edge_connected(edge_id)
+        return e
+
+    def _clear_graph(self):
+        """ Remove all nodes and edges from the scene and the graph in one batch.
+
+        """
+        for node_view in self.view.scene.nodes.values():
+            self._unwatch_node(node_view)
+        self.view.scene.clear_all()
+        self._expanded_groups.clear()
+        self._inner_views.clear()
+        self.graph.clear()
+        self.graph.topologyChanged()
+        self.hashes.clear()
+        self.history.clear()
 
+    @traced(cat='io')
     def file_new(self):
+        self.cancel_loading()
+        self._stop_journal()
         self.filename = ""
-        self.view.scene.clear_all()
-        self.is_dirty = False
+        self._clear_graph()
+        self.mark_saved()
 
+    @traced(cat='io')
     def file_open(self, filename, replace=True):
+        self.cancel_loading()
+        self._stop_journal()
         self.current_path = os.path.dirname(filename)
         self.filename = os.path.basename(filename)
         if replace:
-            self.view.scene.clear_all()
-        g = nx.node_link_graph(json.load(open(os.path.join(self.current_path, self.filename), 'r')))
-        self.deserialize_graph(g, replace=replace)
-        self.is_dirty = False
+            self._clear_graph()
+        path = os.path.join(self.current_path, self.filename)
+        data = self._read_file(path)
+        self.deserialize_graph(data, replace=replace, blobs=blob_reader_for(path))
+        self.mark_saved()
+        self._start_journal()
+
+    @traced(cat='io')
+    def reload(self):
+        """ Update the graph to the content of its file, e.g. after the file was
+        changed by another program, touching only the nodes and edges that differ.
+
+        Returns the applied GraphPatch.
+
+        """
+        self.cancel_loading()
+        self._stop_journal()
+        path = os.path.join(self.current_path, self.filename)
+        data = self._read_file(path)
+
+        current = {'nodes': {}, 'links': {}}
+        for node in self.graph.nodes:
+            if node.id in self.view.scene.nodes:
+                current['nodes'][node.id] = self._without_inputs(self._node_record(node), node)
+        for edge in self.graph.edges:
+            if not edge.is_open and edge.id in self.view.scene.edges:
+                current['links'][edge.id] = self._edge_record(edge)
+
+        new = {'nodes': {}, 'links': {}}
+        node_views = self.view.scene.nodes
+        for node_data in data.get('nodes', []):
+            node_view = node_views.get(node_data['id'])
+            if node_view is not None and node_view.type_name == node_data.get('type_name'):
+                node_data = self._without_inputs(node_data, node_view.model)
+            new['nodes'][node_data['id']] = node_data
+        for edge_data in data.get('links', data.get('edges', [])):
+            new['links'][edge_data['id']] = {k: v for k, v in edge_data.items() if k != 'key'}
+
+        patch = diff_records(current, new)
+        self.apply_patch(patch, blob_reader_for(path))
+        # the recorded edits may refer to items the file changed
+        self.history.clear()
+        self.mark_saved()
+        self._start_journal(recover=False)
+        return patch
+
+    @traced(cat='controller')
+    def apply_patch(self, patch, blobs=None):
+        """ Apply a GraphPatch of node-link records to the graph and the scene in
+        one batch, the graph is executed once afterwards.
+
+        """
+        scene = self.view.scene
+        with self.graph.updates_suspended(), self.history.suspended():
+            for edge_id in patch.removed_edges:
+                self.destroy_edge(edge_id)
+            for node_id in patch.removed_nodes:
+                self.destroy_node(node_id)
+
+            for node_id, changes in patch.changed_nodes.items():
+                node_view = scene.nodes[node_id]
+                if changes.get('position') is not None:
+                    node_view.set_position(Point2D.from_list(changes['position']))
+                if 'name' in changes:
+                    node_view.model.name = changes['name'] or ''
+                if 'attributes' in changes:
+                    node_view.model.deserialize(changes, blobs)
+                if 'reset_attributes' in changes:
+                    node_view.model.attributes.reset(changes['reset_attributes'])
+                self._content_changed(('node', node_id))
+            for node_data in patch.added_nodes.values():
+                self.deserialize_node(node_data, blobs)
+
+            for edge_id, changes in patch.changed_edges.items():
+                if 'attributes' in changes:
+                    scene.edges[edge_id].model.deserialize(changes, blobs)
+                if 'reset_attributes' in changes:
+                    scene.edges[edge_id].model.attributes.reset(changes['reset_attributes'])
+                self._content_changed(('edge', edge_id))
+            for edge_data in patch.added_edges.values():
+                self.deserialize_edge(edge_data, blobs)
+
+    def _without_inputs(self, record, node):
+        # input attributes hold computed values that are not part of the content
+        attributes = record.get('attributes')
+        if attributes and node.attributes is not None:
+            inputs = [name for name, member in node.attributes.members().items()
+                      if _is_input_attribute(member) and name in attributes]
+            if inputs:
+                record = dict(record, attributes={k: v for k, v in attributes.items() if k not in inputs})
+        return record
+
+    def file_open_incremental(self, filename, replace=True):
+        """ Open a graph file in time-sliced batches on the event loop.
+
+        Returns the GraphLoader, whose `progress` and `finished` members report
+        on the loading and which can be cancelled with `cancel_loading`.
+
+        """
+        self.cancel_loading()
+        self._stop_journal()
+        self.current_path = os.path.dirname(filename)
+        self.filename = os.path.basename(filename)
+        if replace:
+            self._clear_graph()
+        self.loader = GraphLoader(controller=self, path=os.path.join(self.current_path, self.filename))
+        self.loader.observe('finished', self._handle_loading_finished)
+        self.loader.start()
+        return self.loader
+
+    def cancel_loading(self):
+        if self.loader is not None:
+            self.loader.cancel()
 
+    def _handle_loading_finished(self, change):
+        self.loader = None
+        if change['value']:
+            self.mark_saved()
+            self._start_journal()
+        else:
+            # a partially loaded graph differs from the file
+            self.saved_snapshot = None
+            self.is_dirty = True
+
+    @traced(cat='io')
     def file_save(self, filename):
+        """ Save the graph, in the binary format if the filename ends with
+        `binary_format.EXTENSION` and as JSON otherwise.
+
+        """
+        journal = self.journal
+        self._stop_journal()
         self.current_path = os.path.dirname(filename)
         self.filename = os.path.basename(filename)
-        g = self.serialize_graph()
-        json.dump(nx.node_link_data(g), open(os.path.join(self.current_path, self.filename), 'w'))
+        self._write_file(os.path.join(self.current_path, self.filename))
+        self.mark_saved()
+        # the journaled edits are part of the saved file now
+        if journal is not None:
+            journal.remove()
+        self._start_journal()
+
+    def _read_file(self, path):
+        if binary_format.is_binary_file(path):
+            with open(path, 'rb') as fp:
+                return binary_format.load(fp, executor_for(path))
+        with open(path, 'r') as fp:
+            return json.load(fp)
+
+    def _write_file(self, path):
+        """ Write the graph to `path` and its array attributes to the blob file next to it.
+
+        """
+        with BlobWriter(path + BLOB_SUFFIX) as blobs:
+            data = self.serialize_graph(blobs)
+            if path.endswith(binary_format.EXTENSION):
+                with open(path, 'wb') as fp:
+                    binary_format.dump(data, fp)
+            else:
+                with open(path, 'w') as fp:
+                    json.dump(data, fp)
+
+    #--------------------------------------------------------------------------
+    # Undo and redo
+    #--------------------------------------------------------------------------
+    def undo(self):
+        with self.graph.updates_suspended():
+            self.history.undo(self)
+
+    def redo(self):
+        with self.graph.updates_suspended():
+            self.history.redo(self)
+
+    def interaction_finished(self):
+        # a drag ends with the mouse release, the next one is a new undo step
+        self.history.seal()
+
+    def _history_recording(self):
+        # loading a file is not an edit
+        return self.history.is_recording and self.loader is None
+
+    #--------------------------------------------------------------------------
+    # Content hashes
+    #--------------------------------------------------------------------------
+    def mark_saved(self):
+        """ Take the current content as the saved version of the graph.
+
+        """
+        self.saved_snapshot = self.hashes.snapshot()
         self.is_dirty = False
+
+    def check_dirty(self):
+        """ Set `is_dirty` by comparing the content with the saved version, so
+        edits that were reverted leave the graph clean.
+
+        """
+        self._dirty_check_scheduled = False
+        if self.loader is not None:
+            return
+        saved = self.saved_snapshot
+        self.is_dirty = saved is None or self.hashes.digest() != saved.digest
+
+    def changes_since_save(self):
+        """ Return the sets of keys (added, removed, changed) of the nodes and
+        edges edited since the graph was last opened or saved.
+
+        """
+        saved = self.saved_snapshot
+        if saved is None:
+            saved = ContentHashes().snapshot()
+        return diff_snapshots(saved, self.hashes.snapshot())
+
+    def _content_changed(self, key):
+        self.hashes.invalidate(key)
+        self.is_dirty = True
+        if not self._dirty_check_scheduled:
+            self._dirty_check_scheduled = True
+            deferred_call(self.check_dirty)
+
+    def _content_record(self, key):
+        """ Return the record the hash of the item `key` is computed from, or None
+        if the item no longer exists.
+
+        The record is the archived item without the values of input attributes.
+
+        """
+        kind, item_id = key
+        scene = self.view.scene if self.view is not None else None
+        if scene is None:
+            return None
+        if kind == 'node':
+            node = self.graph.node_dict.get(item_id)
+            if node is None or item_id not in scene.nodes:
+                return None
+            return self._without_inputs(self._node_record(node, _hashing_blobs), node)
+        edge = self.graph.edge_dict.get(item_id)
+        if edge is None or edge.is_open or item_id not in scene.edges:
+            return None
+        return self._edge_record(edge, _hashing_blobs)
+
+    #--------------------------------------------------------------------------
+    # Autosave journal
+    #--------------------------------------------------------------------------
+    def _observe_autosave(self, change):
+        if change['value']:
+            self._start_journal(recover=False)
+        else:
+            self._stop_journal()
+
+    def _start_journal(self, recover=True):
+        """ Record further edits to the journal of the current graph file.
+
+        With `recover`, the edits left in the journal by an earlier session are
+        replayed first, otherwise they are discarded.
+
+        """
+        if not self.autosave or not self.filename or self.journal is not None:
+            return
+        path = os.path.join(self.current_path, self.filename)
+        if not os.path.exists(path):
+            return
+
+        records = read_journal(journal_path(path), path) if recover else []
+        if records:
+            log.info("Recovering %d edits of %s from the journal" % (len(records), path))
+            self.apply_journal(records)
+
+        journal = ChangeJournal(path=journal_path(path))
+        journal.reset(path)
+        if records:
+            # rewrite the recovered records, dropping a truncated last one
+            for record in records:
+                journal.append(**record)
+            journal.flush()
+            self.check_dirty()
+        self.journal = journal
+        self._journal_digest = self.hashes.digest()
+
+    def _stop_journal(self):
+        if self.journal is None:
+            return
+        self.journal.flush()
+        self.journal = None
+
+    def apply_journal(self, records):
+        with self.graph.updates_suspended(), self.history.suspended():
+            for record in records:
+                try:
+                    self.apply_journal_record(record)
+                except Exception:
+                    log.exception("Cannot apply journal record: %s" % record)
+
+    def apply_journal_record(self, record):
+        op = record['op']
+        if op == 'add_node':
+            self.deserialize_node(record['node'])
+        elif op == 'remove_node':
+            self.destroy_node(record['id'])
+        elif op == 'add_edge':
+            self.deserialize_edge(record['edge'])
+        elif op == 'remove_edge':
+            self.destroy_edge(record['id'])
+        elif op == 'attributes':
+            self.find_node(record['id']).attributes.deserialize(record['attributes'])
+        elif op == 'move':
+            self.move_node(record['id'], Point2D.from_list(record['position']))
+        else:
+            log.error("Unknown journal record: %s" % op)
+
+    def autosave_now(self):
+        """ Write the buffered edits to the journal and compact it once it grew
+        beyond `journal_compact_threshold` records.
+
+        """
+        self._autosave_scheduled = False
+        journal = self.journal
+        if journal is None:
+            return
+        digest = self.hashes.digest()
+        if self.saved_snapshot is not None and digest == self.saved_snapshot.digest:
+            # the edits were reverted, the graph file is up to date
+            if journal.record_count or journal.has_pending():
+                journal.reset(os.path.join(self.current_path, self.filename))
+        elif digest == self._journal_digest:
+            # the buffered edits cancel out
+            journal.discard_pending()
+        else:
+            journal.flush()
+        self._journal_digest = digest
+        if journal.record_count > self.journal_compact_threshold:
+            self.compact_journal()
+
+    def compact_journal(self):
+        """ Fold the journal into the graph file.
+
+        """
+        path = os.path.join(self.current_path, self.filename)
+        if self.saved_snapshot is None or self.hashes.digest() != self.saved_snapshot.digest:
+            self._write_file(path)
+        self.journal.reset(path)
+        self.mark_saved()
+        self._journal_digest = self.saved_snapshot.digest
+
+    def _record(self, op, **data):
+        if self.journal is None:
+            return
+        self.journal.append(op, **data)
+        self._schedule_autosave()
+
+    def _schedule_autosave(self):
+        if not self._autosave_scheduled:
+            self._autosave_scheduled = True
+            timed_call(int(1000 * self.autosave_interval), self.autosave_now)
+
+    def _watch_node(self, node_view):
+        node_view.observe('position', self._handle_node_moved)
+        if node_view.model is not None and node_view.model.attributes is not None:
+            attributes = node_view.model.attributes
+            self._watched_attributes[attributes] = node_view.id
+            for name, member in attributes.members().items():
+                if not _is_input_attribute(member):
+                    attributes.observe(name, self._handle_node_attribute_change)
+
+    def _unwatch_node(self, node_view):
+        node_view.unobserve('position', self._handle_node_moved)
+        if node_view.model is not None and node_view.model.attributes is not None:
+            attributes = node_view.model.attributes
+            self._watched_attributes.pop(attributes, None)
+            for name in attributes.members():
+                attributes.unobserve(name, self._handle_node_attribute_change)
+
+    def _handle_node_moved(self, change):
+        if change['type'] == 'create':
+            return
+        node_id = change['object'].id
+        self._content_changed(_content_key(node_id))
+        if self._history_recording():
+            self.history.push(MoveNodesCommand(old_positions={node_id: change['oldvalue'].to_list()},
+                                               new_positions={node_id: change['value'].to_list()}))
+        if self.journal is None:
+            return
+        self.journal.move(change['object'].id, change['value'].to_list())
+        self._schedule_autosave()
+
+    def _handle_node_attribute_change(self, change):
+        if change['type'] == 'create':
+            return
+        node_id = self._watched_attributes.get(change['object'])
+        if node_id is None:
+            return
+        if change['name'] == 'expanded':
+            self._show_group_contents(node_id, change['value'])
+        self._content_changed(_content_key(node_id))
+        recording = self._history_recording()
+        if not recording and self.journal is None:
+            return
+
+        # only the changed member is archived, not the whole attributes
+        member = change['object'].get_member(change['name'])
+        new_values = {}
+        serialize_member(new_values, member, change['value'])
+        if recording:
+            old_values = {}
+            serialize_member(old_values, member, change['oldvalue'])
+            self.history.push(SetAttributesCommand(node_id=node_id, old_values=old_values,
+                                                   new_values=new_values))
+        if self.journal is not None and change['name'] in new_values:
+            self._record('attributes', id=node_id, attributes=dict(new_values))
+
+    #--------------------------------------------------------------------------
+    # Groups
+    #--------------------------------------------------------------------------
+    def group_nodes(self, node_ids):
+        """ Move the nodes into a new group, the edges crossing the selection
+        are connected to exposed sockets of the group.
+
+        Returns the view of the group.
+
+        """
+        scene = self.view.scene
+        if scene is None:
+            return
+        views = [scene.nodes[i] for i in node_ids if i in scene.nodes and i not in self._inner_views]
+        if not views:
+            return
+        nodes = set(v.model for v in views)
+        internal, incoming, outgoing = [], [], []
+        for edge in self.graph.edges:
+            if edge.is_open:
+                continue
+            start_inside = edge.start_socket.node in nodes
+            end_inside = edge.end_socket.node in nodes
+            if start_inside and end_inside:
+                internal.append(edge)
+            elif end_inside:
+                incoming.append(edge)
+            elif start_inside:
+                outgoing.append(edge)
+        # the sockets are disconnected when the edges are removed
+        connections = [(type(e), e.id, e.start_socket, e.end_socket) for e in internal]
+        incoming_sockets = [(e.start_socket, e.end_socket) for e in incoming]
+        outgoing_sockets = [(e.start_socket, e.end_socket) for e in outgoing]
+
+        # the group is placed left of the nodes, which keep their position when expanded
+        origin = Point2D(x=min(v.position.x for v in views) - GROUP_MARGIN - views[0].width,
+                         y=min(v.position.y for v in views))
+        group = GroupModel(positions={v.model.id: (v.position - origin).to_list() for v in views})
+
+        with self.graph.updates_suspended(), self.history.macro('Group'):
+            for edge in internal + incoming + outgoing:
+                self.destroy_edge(edge.id)
+            for node_view in views:
+                self.destroy_node(node_view.id)
+
+            group.subgraph.nodes = [v.model for v in views]
+            group.subgraph.edges = [edge_class(id=edge_id, start_socket=start, end_socket=end)
+                                    for edge_class, edge_id, start, end in connections]
+            inputs = {}
+            for start, end in incoming_sockets:
+                if end not in inputs:
+                    inputs[end] = group.expose_input(_free_name(group.input_dict, end.name), [end]).name
+            outputs = {}
+            for start, end in outgoing_sockets:
+                if start not in outputs:
+                    outputs[start] = group.expose_output(_free_name(group.output_dict, start.name), start).name
+
+            group_view = self.create_node(self.registry.node_model_type_map[GroupModel].id,
+                                          model=group, position=origin)
+            for start, end in incoming_sockets:
+                self._connect_sockets(start.node.id, start.name, group_view.id, inputs[end])
+            for start, end in outgoing_sockets:
+                self._connect_sockets(group_view.id, outputs[start], end.node.id, end.name)
+        return group_view
+
+    def expand_group(self, id):
+        """ Show the contents of the group `id` in the scene.
+
+        """
+        self._set_group_expanded(id, True)
+
+    def collapse_group(self, id):
+        """ Remove the views of the contents of the group `id` from the scene.
+
+        """
+        self._set_group_expanded(id, False)
+
+    def find_node(self, id):
+        """ Return the node of the view `id`. The nodes of groups are found by
+        the path '<group id>/<node id>', whether the group is expanded or not.
+
+        """
+        path = id.split('/')
+        node = self.graph.node_dict[path[0]]
+        for node_id in path[1:]:
+            node = node.subgraph.node_dict[node_id]
+        return node
+
+    def move_node(self, id, position):
+        """ Move the node of the view `id` to the scene position `position`.
+
+        Nodes of a collapsed group keep the position relative to the group.
+
+        """
+        scene = self.view.scene
+        node_view = scene.nodes.get(id)
+        if node_view is not None:
+            node_view.set_position(position)
+            return
+        group_id, _, node_id = id.rpartition('/')
+        group_view = scene.nodes.get(group_id)
+        if group_view is None:
+            log.warning("Cannot move node without a view: %s" % id)
+            return
+        self.find_node(group_id).positions[node_id] = (position - group_view.position).to_list()
+        self._content_changed(_content_key(id))
+
+    def _set_group_expanded(self, id, expanded):
+        node_view = self.view.scene.nodes.get(id)
+        if node_view is not None and isinstance(node_view.model, GroupModel):
+            # handled by the observers of the attributes, which records the change
+            node_view.model.attributes.expanded = expanded
+
+    def _connect_sockets(self, start_id, start_socket, end_id, end_socket):
+        nodes = self.view.scene.nodes
+        edge_view = self.create_edge(self.edge_type_for_start_socket(start_id, start_socket))
+        edge_view.start_socket = _find_socket(nodes[start_id].output_sockets, start_socket)
+        edge_view.end_socket = _find_socket(nodes[end_id].input_sockets, end_socket)
+        self.edge_connected(edge_view.id)
+        return edge_view
+
+    def _show_group_contents(self, id, show):
+        """ Create or destroy the views of the contents of the group view `id`.
+
+        The views are created with the ids '<group view id>/<node or edge id>'.
+
+        """
+        scene = self.view.scene
+        group_view = scene.nodes.get(id)
+        if group_view is None or not isinstance(group_view.model, GroupModel):
+            return
+        group = group_view.model
+        if show:
+            if id in self._expanded_groups:
+                return
+            node_views = {}
+            for node in group.subgraph.nodes:
+                node_type = self.registry.node_model_type_map[type(node)]
+                position = group_view.position + Point2D.from_list(group.positions.get(node.id, [0.0, 0.0]))
+                node_views[node] = node_type.widget_class(id='%s/%s' % (id, node.id), name=node.name or node.id,
+                                                          position=position, model=node, type_name=node_type.id)
+            scene.insert_children(None, list(node_views.values()))
+            edge_views = []
+            for edge in group.subgraph.edges:
+                if edge.is_open:
+                    continue
+                edge_type = self.registry.edge_model_type_map[type(edge)]
+                edge_view = edge_type.widget_class(id='%s/%s' % (id, edge.id), model=edge, type_name=edge_type.id)
+                scene.insert_children(None, [edge_view])
+                edge_view.start_socket = _find_socket(node_views[edge.start_socket.node].output_sockets,
+                                                      edge.start_socket.name)
+                edge_view.end_socket = _find_socket(node_views[edge.end_socket.node].input_sockets,
+                                                    edge.end_socket.name)
+                edge_views.append(edge_view)
+
+            ids = [v.id for v in edge_views] + [v.id for v in node_views.values()]
+            self._expanded_groups[id] = ids
+            self._inner_views.update(ids)
+            for node, node_view in node_views.items():
+                self._watch_node(node_view)
+                if isinstance(node, GroupModel) and node.attributes.expanded:
+                    self._show_group_contents(node_view.id, True)
+        else:
+            ids = self._expanded_groups.pop(id, None)
+            if ids is None:
+                return
+            positions = {}
+            for item_id in ids:
+                node_view = scene.nodes.get(item_id)
+                if node_view is not None:
+                    # nested groups stay expanded for the next time
+                    self._show_group_contents(item_id, False)
+                    positions[node_view.model.id] = (node_view.position - group_view.position).to_list()
+                    self._unwatch_node(node_view)
+            group.positions = positions
+            # edges first, the inner views are ignored by edge_disconnect
+            for item_id in ids:
+                item = scene.edges.get(item_id) or scene.nodes.get(item_id)
+                if item is not None:
+                    item.destroy()
+            self._inner_views.difference_update(ids)
+
+
+def _content_key(view_id):
+    # the contents of groups are part of the record of the top level group
+    return ('node', view_id.split('/')[0])
+
+
+def _find_socket(sockets, name):
+    for socket in sockets:
+        if socket.name == name:
+            return socket
+    return None
+
+
+def _free_name(names, name):
+    candidate = name
+    index = 2
+    while candidate in names:
+        candidate = '%s_%d' % (name, index)
+        index += 1
+    return candidate
@@ -0,0 +1,141 @@
+""" Append-only journal of graph edits, stored next to the graph file.
+
+The journal is a JSON lines file. The first line is a header with the size and
+modification time of the graph file the journal applies to, each following line
+is one edit record:
+
+    {"op": "add_node", "node": {...}}
+    {"op": "remove_node", "id": ...}
+    {"op": "add_edge", "edge": {...}}
+    {"op": "remove_edge", "id": ...}
+    {"op": "attributes", "id": ..., "attributes": {...}}
+    {"op": "move", "id": ..., "position": [x, y]}
+
+A journal whose header does not match the graph file, e.g. because the file was
+saved after the journal was written, is ignored.
+
+"""
+import json
+import logging
+import os
+
+from atom.api import Atom, Str, Int, List, Dict
+
+log = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+
+#: suffix appended to the graph filename to get the journal filename
+JOURNAL_SUFFIX = '.journal'
+
+
+def journal_path(path):
+    return path + JOURNAL_SUFFIX
+
+
+def file_fingerprint(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def read_journal(path, base_path):
+    """ Return the records of the journal at `path` if it applies to the graph file
+    `base_path`, and an empty list otherwise.
+
+    A truncated last record, as left by a crash while writing, is skipped.
+
+    """
+    if not os.path.exists(path) or not os.path.exists(base_path):
+        return []
+    with open(path, 'r') as fp:
+        lines = fp.read().splitlines()
+    if not lines:
+        return []
+    try:
+        header = json.loads(lines[0])
+    except ValueError:
+        log.warning("Ignoring journal with invalid header: %s" % path)
+        return []
+    if header.get('version') != JOURNAL_VERSION or header.get('base') != file_fingerprint(base_path):
+        log.warning("Ignoring journal that does not match %s" % base_path)
+        return []
+
+    records = []
+    for i, line in enumerate(lines[1:]):
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            log.warning("Ignoring invalid journal record %d in %s" % (i + 1, path))
+            break
+    return records
+
+
+class ChangeJournal(Atom):
+    """ Buffers edit records and appends them to the journal file on flush.
+
+    Moves are coalesced per node until the next flush or the next other record,
+    so dragging a node writes a single record.
+
+    """
+    path = Str()
+
+    #: number of records in the journal file
+    record_count = Int()
+
+    _pending = List()
+    _moves = Dict()
+
+    def reset(self, base_path):
+        """ Start an empty journal for the current state of the graph file `base_path`.
+
+        """
+        self._pending = []
+        self._moves = {}
+        header = {'version': JOURNAL_VERSION, 'base': file_fingerprint(base_path)}
+        with open(self.path, 'w') as fp:
+            fp.write(json.dumps(header) + '\n')
+        self.record_count = 0
+
+    def append(self, op, **data):
+        self._take_moves()
+        data['op'] = op
+        self._pending.append(data)
+
+    def move(self, node_id, position):
+        self._moves[node_id] = position
+
+    def has_pending(self):
+        return bool(self._pending or self._moves)
+
+    def flush(self):
+        """ Append the buffered records to the journal file.
+
+        """
+        self._take_moves()
+        if not self._pending:
+            return
+        with open(self.path, 'a') as fp:
+            fp.write(''.join(json.dumps(record) + '\n' for record in self._pending))
+            fp.flush()
+            os.fsync(fp.fileno())
+        self.record_count += len(self._pending)
+        self._pending = []
+
+    def discard_pending(self):
+        """ Drop the buffered records, e.g. when they cancel out.
+
+        """
+        self._pending = []
+        self._moves = {}
+
+    def remove(self):
+        self._pending = []
+        self._moves = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _take_moves(self):
+        if self._moves:
+            for node_id, position in self._moves.items():
+                self._pending.append({'op': 'move', 'id': node_id, 'position': position})
+            self._moves = {}
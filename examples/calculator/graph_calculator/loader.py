@@ -0,0 +1,204 @@
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from atom.api import Atom, Bool, Int, Float, Str, Event, Value, ForwardInstance
+from enaml.application import deferred_call
+
+from enaml_nodegraph.tracing import tracer
+from enaml_nodegraph.model.blobs import blob_reader_for
+
+from . import binary_format
+
+log = logging.getLogger(__name__)
+
+
+def _import_graph_calculator_controller():
+    from .controller import CalculatorGraphController
+    return CalculatorGraphController
+
+
+#: binary files from this size on are decoded on a process pool
+PARALLEL_DECODE_MIN_SIZE = 8 * 1024 * 1024
+
+_decode_executor = None
+
+
+def decode_executor():
+    """ Return the process pool shared by all loaders, creating it on first use.
+
+    """
+    global _decode_executor
+    if _decode_executor is None:
+        # fork is unsafe in a process running Qt threads
+        _decode_executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+    return _decode_executor
+
+
+def executor_for(path):
+    """ Return the executor to decode the graph file `path` with, or None to
+    decode it on the calling thread.
+
+    """
+    if (os.cpu_count() or 1) > 1 and binary_format.is_binary_file(path) and \
+            os.path.getsize(path) >= PARALLEL_DECODE_MIN_SIZE:
+        return decode_executor()
+    return None
+
+
+def iter_records(path, executor=None):
+    """ Yield (section, data, progress) for the graph attributes, nodes and edges
+    of a graph file, where section is one of 'graph', 'nodes' or 'links' and
+    progress is the fraction of the file read so far.
+
+    Binary files are decoded and validated chunk by chunk as the records are
+    consumed, on `executor` if given. JSON files are parsed completely before
+    the first record.
+
+    """
+    if binary_format.is_binary_file(path):
+        size = float(os.path.getsize(path)) or 1.0
+        with open(path, 'rb') as fp:
+            start = binary_format.HEADER_SIZE
+            for section, value, errors, end in binary_format.iter_chunks(fp, executor):
+                for error in errors:
+                    log.error(error)
+                if section == 'graph':
+                    yield section, value, end / size
+                else:
+                    count = len(value)
+                    for i, data in enumerate(value):
+                        yield section, data, (start + (end - start) * (i + 1) / count) / size
+                start = end
+    else:
+        with open(path, 'r') as fp:
+            data = json.load(fp)
+        nodes = data.get('nodes', [])
+        edges = data.get('links', data.get('edges', []))
+        total = float(len(nodes) + len(edges)) or 1.0
+        yield 'graph', data.get('graph', {}), 0.0
+        for i, node_data in enumerate(nodes):
+            yield 'nodes', node_data, (i + 1) / total
+        for i, edge_data in enumerate(edges):
+            yield 'links', edge_data, (len(nodes) + i + 1) / total
+
+
+class GraphLoader(Atom):
+    """ Loads a graph file into a controller in time-sliced batches on the event loop.
+
+    Each batch processes records until `batch_time` has elapsed and then yields
+    to the event loop, so the view stays responsive and fills in while loading.
+    Graph updates are suspended until loading ends.
+
+    """
+    controller = ForwardInstance(_import_graph_calculator_controller)
+
+    path = Str()
+
+    #: time budget of a batch in seconds
+    batch_time = Float(0.02)
+
+    #: fraction of the file loaded, in the range [0, 1]
+    progress = Float()
+
+    nodes_loaded = Int()
+    edges_loaded = Int()
+
+    is_loading = Bool(False)
+
+    #: fired when loading ends, with True if the file was loaded completely
+    finished = Event(bool)
+
+    #: BlobReader for the array attributes of the file, if any
+    blobs = Value()
+
+    #: executor decoding the chunks of binary files, see `executor_for`
+    executor = Value()
+
+    _records = Value()
+
+    def start(self):
+        """ Start loading and schedule the batches on the event loop.
+
+        """
+        self._open()
+        deferred_call(self._run_batch)
+
+    def cancel(self):
+        """ Stop loading, the records loaded so far are kept.
+
+        """
+        if self.is_loading:
+            self._finish(False)
+
+    def run(self):
+        """ Load all remaining records without returning to the event loop.
+
+        """
+        if self._records is None:
+            self._open()
+        while self.is_loading and self.step(float('inf')):
+            pass
+
+    def step(self, batch_time=None):
+        """ Load records for up to `batch_time` seconds and return True
+        while there are records left.
+
+        """
+        if not self.is_loading:
+            return False
+        deadline = time.perf_counter() + (self.batch_time if batch_time is None else batch_time)
+        controller = self.controller
+        with tracer.span('load_batch', 'io', path=self.path):
+            for section, data, progress in self._records:
+                if section == 'nodes':
+                    controller.deserialize_node(data, self.blobs)
+                    self.nodes_loaded += 1
+                elif section == 'links':
+                    controller.deserialize_edge(data, self.blobs)
+                    self.edges_loaded += 1
+                else:
+                    controller.deserialize_graph_attributes(data)
+                if time.perf_counter() >= deadline:
+                    self.progress = progress
+                    return True
+        self.progress = 1.0
+        self._finish(True)
+        return False
+
+    def _open(self):
+        if self.executor is None:
+            self.executor = executor_for(self.path)
+        self._records = iter_records(self.path, self.executor)
+        self.blobs = blob_reader_for(self.path)
+        self.progress = 0.0
+        self.nodes_loaded = 0
+        self.edges_loaded = 0
+        self.is_loading = True
+        # the graph is executed once, when loading ends
+        self.controller.graph.suspend_updates()
+
+    def _run_batch(self):
+        try:
+            more = self.step()
+        except Exception:
+            log.exception("Error loading graph from %s" % self.path)
+            self._finish(False)
+            return
+        if more:
+            deferred_call(self._run_batch)
+
+    def _finish(self, completed):
+        if self._records is not None:
+            self._records.close()
+            self._records = None
+        self.is_loading = False
+        graph = self.controller.graph
+        if completed:
+            for error in graph.validate():
+                log.error("Invalid graph: %s" % error)
+        graph.resume_updates()
+        self.finished(completed)
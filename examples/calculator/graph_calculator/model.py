@@ -1,10 +1,17 @@
+import heapq
 import logging
 import math
 import networkx as nx
+import numpy as np
+from collections import OrderedDict
+from contextlib import contextmanager
 
-from atom.api import (Atom, Value, Bool, Int, Float, Str, Str, Enum, List, Property, Event, ForwardInstance, observe)
+from atom.api import (Atom, Value, Bool, Int, Float, Str, Str, Enum, List, Dict, Typed, Instance, Property, Event, ForwardInstance, Coerced, observe)
 
 from enaml_nodegraph import model
+from enaml_nodegraph.tracing import tracer
+
+from .profiler import ExecutionProfiler
 
 log = logging.getLogger(__name__)
 
@@ -16,19 +23,111 @@ TYPE_MAP = {
 }
 
 
+# implicit conversions, applied along the edge instead of by a converter node
+model.data_types.register_conversion('int', 'float', float)
+model.data_types.register_conversion('int', 'text', lambda value: "%d" % value)
+model.data_types.register_conversion('float', 'text', lambda value: "%.3f" % value)
+
+
 def _import_graph_calculator_controller():
     from .controller import CalculatorGraphController
     return CalculatorGraphController
 
 
+def _compile_graph(graph):
+    from .codegen import compile_graph
+    return compile_graph(graph)
+
+
+def _root_graph(node):
+    return node.graph.root if node.graph is not None else None
+
+
+def _trace_node(run_node):
+    def run_traced_node(node):
+        with tracer.span(node.id, 'node', type=type(node).__name__):
+            run_node(node)
+    return run_traced_node
+
+
+class ValueEquality(Atom):
+    """ Decides whether a newly computed output value equals the previous one.
+
+    Used by OutputSocket to stop propagation when an output did not change.
+
+    """
+    #: 'equal' compares with ==, 'tolerance' compares numbers and arrays within
+    #: rel_tol/abs_tol, 'identity' compares with `is` and 'never' always propagates
+    mode = Enum('equal', 'tolerance', 'identity', 'never')
+
+    rel_tol = Float(1e-9)
+    abs_tol = Float(0.0)
+
+    def equal(self, a, b):
+        mode = self.mode
+        if mode == 'identity':
+            return a is b
+        elif mode == 'never':
+            return False
+
+        if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+            a = np.asarray(a)
+            b = np.asarray(b)
+            if a.shape != b.shape:
+                return False
+            if mode == 'tolerance' and a.dtype.kind in 'fc' and b.dtype.kind in 'fc':
+                return bool(np.allclose(a, b, rtol=self.rel_tol, atol=self.abs_tol))
+            return bool(np.array_equal(a, b))
+
+        if mode == 'tolerance' and isinstance(a, float) and isinstance(b, float):
+            return math.isclose(a, b, rel_tol=self.rel_tol, abs_tol=self.abs_tol)
+        return type(a) is type(b) and a == b
+
+
 class ExecutableGraph(model.Graph):
     controller = ForwardInstance(_import_graph_calculator_controller)
+
+    #: a networkx copy of the topology for analysis, execution does not use it
     nxgraph = Property(lambda self: self._get_nxgraph(), cached=True)
 
+    #: run linear chains of single input and output operators as one function;
+    #: not applied while the profiler is enabled, which times every node
+    fuse_chains = Bool(False)
+
+    #: nodes in topological order and their position within it, without the
+    #: nodes that run as part of a fused chain
+    execution_order = Property(lambda self: self._get_execution_order(), cached=True)
+    execution_rank = Property(lambda self: {n: i for i, n in enumerate(self.execution_order)}, cached=True)
+
+    #: the graph compiled to a function of the input values, see codegen; rebuilt
+    #: after the topology or an operator changed
+    compiled = Property(lambda self: _compile_graph(self), cached=True)
+
+    #: first node of a fused chain -> FusedChain, and fused node -> first node of its chain
+    _chains = Typed(dict, ())
+    _chain_heads = Typed(dict, ())
+
+    #: default output equality, OutputSocket.equality overrides it per socket
+    equality = Typed(ValueEquality, ())
+
+    #: per-node timing and per-edge propagation statistics, off unless enabled
+    profiler = Typed(ExecutionProfiler, ())
+
+    #: events may carry the node that changed; without one the whole graph is updated
     topologyChanged = Event()
     valuesChanged = Event()
     attributesChanged = Event()
 
+    #: nodes that need an update, and their ranks as a heap for execute_graph
+    _dirty = Typed(set, ())
+    _queue = List()
+    _update_all = Bool(True)
+
+    #: nesting depth of suspend_updates, while > 0 events only record the pending work
+    _suspended = Int()
+    _pending_topology = Bool(False)
+    _pending_execution = Bool(False)
+
     def _get_nxgraph(self):
         g = nx.MultiDiGraph()
         for node in self.nodes:
@@ -42,33 +141,344 @@ class ExecutableGraph(model.Graph):
                        target_socket=edge.end_socket.name)
         return g
 
+    def _get_execution_order(self):
+        with tracer.span('topology_rebuild', 'topology', nodes=len(self.nodes), edges=len(self.edges)):
+            # the contents of groups run as part of the top level graph
+            order = model.flat_topological_sort(self)
+            self._chains.clear()
+            self._chain_heads.clear()
+            if self.fuse_chains and not self.profiler.enabled:
+                for chain in find_chains(order):
+                    head = chain.nodes[0]
+                    self._chains[head] = chain
+                    for node in chain.nodes[1:]:
+                        self._chain_heads[node] = head
+                order = [node for node in order if node not in self._chain_heads]
+            return order
+
+    @observe('fuse_chains', 'profiler.enabled')
+    def _handle_fusion_change(self, change):
+        if change['name'] == 'fuse_chains' or (change['name'] == 'enabled' and self.fuse_chains):
+            self.topologyChanged()
+
     def _observe_topologyChanged(self, change):
+        root = self.root
+        if root is not self:
+            root.topologyChanged()
+            return
+        if self._suspended:
+            self._pending_topology = True
+            return
         self.get_member('nxgraph').reset(self)
+        self.get_member('compiled').reset(self)
+        self.get_member('execution_order').reset(self)
+        self.get_member('execution_rank').reset(self)
+        for node in model.iter_nodes(self):
+            if isinstance(node, OperatorNode):
+                node.invalidate()
+            for output in node.outputs:
+                if isinstance(output, OutputSocket):
+                    output.invalidate()
+        self._update_all = True
         self.execute_graph()
 
     def _observe_valuesChanged(self, change):
-        self.execute_graph()
+        self._handle_change(change['value'])
 
     def _observe_attributesChanged(self, change):
+        self._handle_change(change['value'])
+
+    def _handle_change(self, node):
+        root = self.root
+        if root is not self:
+            root._handle_change(node)
+            return
+        if self._suspended:
+            # a pending topology change updates the whole graph anyway
+            if not self._pending_topology:
+                self._schedule(node)
+                self._pending_execution = True
+            return
+        self._schedule(node)
         self.execute_graph()
 
+    def suspend_updates(self):
+        """ Defer the handling of graph events until the matching resume_updates.
+
+        Calls may be nested. Any number of topologyChanged events while suspended
+        result in a single topology rebuild and execution on resume.
+
+        """
+        self._suspended += 1
+
+    def resume_updates(self):
+        self._suspended -= 1
+        if self._suspended > 0:
+            return
+        if self._pending_topology:
+            self._pending_topology = False
+            self._pending_execution = False
+            self.topologyChanged()
+        elif self._pending_execution:
+            self._pending_execution = False
+            self.execute_graph()
+
+    @contextmanager
+    def updates_suspended(self):
+        self.suspend_updates()
+        try:
+            yield self
+        finally:
+            self.resume_updates()
+
+    def validate(self):
+        """ Return a list of problems that prevent the graph from being executed.
+
+        """
+        errors = []
+        node_ids = set(self.node_dict)
+        for edge in self.edges:
+            if edge.is_open:
+                errors.append("Edge %s is not connected" % edge.id)
+            elif edge.start_socket.node.id not in node_ids or edge.end_socket.node.id not in node_ids:
+                errors.append("Edge %s connects nodes outside of the graph" % edge.id)
+        if not errors:
+            try:
+                self.topological_sort()
+            except ValueError as e:
+                errors.append(str(e))
+        return errors
+
+    def _schedule(self, node):
+        if not isinstance(node, (InputNode, RampGeneratorModel)):
+            # the compiled function only takes the values of these as arguments
+            self.get_member('compiled').reset(self)
+        if isinstance(node, model.Node):
+            self._ensure_chains()
+            # the attributes of a fused node may have changed its function
+            head = self._chain_heads.get(node, node)
+            if head in self._chains:
+                self._chains[head].reset()
+            self.mark_dirty(head)
+        else:
+            self._update_all = True
+
+    def _ensure_chains(self):
+        # the fused chains are found together with the execution order
+        return self.execution_order
+
+    def mark_dirty(self, node):
+        root = self.root
+        if root is not self:
+            root.mark_dirty(node)
+            return
+        ranks = self.execution_rank
+        node = self._chain_heads.get(node, node)
+        if node in self._dirty:
+            return
+        rank = ranks.get(node)
+        if rank is not None:
+            self._dirty.add(node)
+            heapq.heappush(self._queue, rank)
+
     def execute_graph(self):
-        for node_id in nx.topological_sort(self.nxgraph):
-            self.node_dict[node_id].update()
+        if tracer.enabled:
+            with tracer.span('execute_graph', 'execution', full=self._update_all, dirty=len(self._dirty)):
+                self._execute_graph()
+        else:
+            self._execute_graph()
+
+    def _execute_graph(self):
+        order = self.execution_order
+        profiler = self.profiler
+        if profiler.enabled:
+            run_node = profiler.run_node
+        else:
+            run_node = self._run_node
+        if tracer.enabled:
+            run_node = _trace_node(run_node)
+
+        if self._update_all:
+            self._update_all = False
+            self._dirty.clear()
+            del self._queue[:]
+            for node in order:
+                run_node(node)
+            self._dirty.clear()
+            del self._queue[:]
+        else:
+            queue = self._queue
+            while queue:
+                node = order[heapq.heappop(queue)]
+                self._dirty.discard(node)
+                run_node(node)
+
+        if profiler.enabled:
+            profiler.ticks += 1
+
+    def _run_node(self, node):
+        chain = self._chains.get(node)
+        if chain is None:
+            node.update()
+        else:
+            chain.run()
+
+
+class FusedChain(Atom):
+    """ A linear chain of operators run as one composed function.
+
+    Only the first node receives values and only the last one propagates, the
+    members of the nodes in between are not updated.
+
+    """
+    nodes = List()
+
+    #: conversions of the edges between the nodes, None where none is needed
+    converters = List()
+
+    #: the composed function, None until built from the nodes' transforms
+    function = Value()
+
+    def reset(self):
+        self.function = None
+
+    def compose(self):
+        functions = []
+        for node, converter in zip(self.nodes, [None] + self.converters):
+            if converter is not None:
+                functions.append(converter)
+            function = node.transform()
+            if function is None:
+                return None
+            functions.append(function)
+
+        def run(value):
+            for function in functions:
+                value = function(value)
+            return value
+        return run
+
+    def run(self):
+        function = self.function
+        if function is None:
+            function = self.function = self.compose()
+            if function is None:
+                log.warning("invalid operator in chain starting at %s" % self.nodes[0].id)
+                return
+        head = self.nodes[0]
+        try:
+            value = function(getattr(head, head.inputs[0].name))
+        except Exception as e:
+            log.error(e)
+            return
+        self.nodes[-1].outputs[0].propagate_change(value)
+
+
+def _fusible(node):
+    return (isinstance(node, OperatorNode) and not node.memoize and
+            type(node).transform is not OperatorNode.transform and
+            len(node.inputs) == 1 and len(node.outputs) == 1)
+
+
+def find_chains(order):
+    """ Return the FusedChains of at least two fusible nodes in the
+    topologically ordered nodes, where each node only feeds the next one.
+
+    """
+    def next_node(node):
+        edges = node.outputs[0].edges
+        if len(edges) != 1 or edges[0].end_socket is None:
+            return None, None
+        if node.graph.group is not None and node.graph.group.exports(node.outputs[0]):
+            # the value also leaves the group
+            return None, None
+        successor = edges[0].end_socket.node
+        if not _fusible(successor) or len(successor.inputs[0].edges) != 1:
+            return None, None
+        return successor, edges[0]
+
+    chains = []
+    visited = set()
+    for node in order:
+        if node in visited or not _fusible(node):
+            continue
+        nodes, converters = [node], []
+        successor, edge = next_node(node)
+        while successor is not None and successor not in visited:
+            nodes.append(successor)
+            converters.append(edge.converter)
+            successor, edge = next_node(successor)
+        visited.update(nodes)
+        if len(nodes) > 1:
+            chains.append(FusedChain(nodes=nodes, converters=converters))
+    return chains
 
 
 class OutputSocket(model.Socket):
 
+    #: equality used for change suppression, defaults to the graph's equality
+    equality = Instance(ValueEquality)
+
+    _last_value = Value()
+    _has_value = Bool(False)
+
+    #: the value last propagated, None before the first one
+    last_value = Property(lambda self: self._last_value)
+
+    def invalidate(self):
+        self._last_value = None
+        self._has_value = False
+
     def propagate_change(self, value):
+        if self._has_value:
+            equality = self.equality
+            if equality is None:
+                equality = getattr(_root_graph(self.node), 'equality', None)
+            if equality is not None and equality.equal(self._last_value, value):
+                self._propagate(value, changed=False)
+                return
+        self._last_value = value
+        self._has_value = True
+
+        if tracer.enabled:
+            with tracer.span('propagate', 'propagation', socket=self.name, node=self.node.id, edges=len(self.edges)):
+                self._propagate(value)
+        else:
+            self._propagate(value)
+
+    def _propagate(self, value, changed=True):
+        # an unchanged value only goes to inputs deciding themselves, like history buffers
+        profiler = getattr(_root_graph(self.node), 'profiler', None)
+        if profiler is not None and not profiler.enabled:
+            profiler = None
         for edge in self.edges:
             if edge.end_socket is not None:
-                edge.end_socket.receive_value(value)
+                if not changed and not edge.end_socket.accepts_repeated(self._last_value, value):
+                    continue
+                if profiler is not None:
+                    profiler.record_edge(edge)
+                converter = edge.converter
+                edge.end_socket.receive_value(value if converter is None else converter(value))
+        graph = self.node.graph
+        if graph is not None and graph.group is not None:
+            for socket in graph.group.exports(self):
+                socket.propagate_change(value)
 
 
 class InputSocket(model.Socket):
 
+    #: equality of values received by this input, which are passed on even if the
+    #: connected output suppresses them as unchanged
+    equality = Instance(ValueEquality)
+
+    def accepts_repeated(self, old, new):
+        return self.equality is not None and not self.equality.equal(old, new)
+
     def receive_value(self, value):
-        self.node.set_value(self.name, value)
+        node = self.node
+        node.set_value(self.name, value)
+        if isinstance(node.graph, ExecutableGraph):
+            node.graph.mark_dirty(node)
 
 
 class AttrSpec(Atom):
@@ -85,14 +495,23 @@ class AttrSpec(Atom):
         return name
 
 
+#: (node class, spec) -> Attributes subclass created by make_attributes
+_attributes_classes = {}
+
+
 def make_attributes(parent, spec):
     cls = type(parent)
 
-    attrs = {}
-    for s in spec:
-        attrs[s.name] = TYPE_MAP[s.data_type](s.default).tag(display_name=s.display_name, attr_type=s.attr_type)
+    # nodes of a class share the Attributes class, and with it its compiled serializer
+    key = (cls, tuple((s.name, s.display_name, s.data_type, s.default, s.attr_type) for s in spec))
+    attributes_class = _attributes_classes.get(key)
+    if attributes_class is None:
+        attrs = {}
+        for s in spec:
+            attrs[s.name] = TYPE_MAP[s.data_type](s.default).tag(display_name=s.display_name, attr_type=s.attr_type)
+        attributes_class = _attributes_classes[key] = type("%sAttributes" % cls.__name__, (model.Attributes,), attrs)
 
-    obj = type("%sAttributes" % cls.__name__, (model.Attributes,), attrs)()
+    obj = attributes_class()
 
     for s in spec:
         if s.attr_type in ['output', 'property']:
@@ -101,6 +520,31 @@ def make_attributes(parent, spec):
     return obj
 
 
+class RampGeneratorAttributes(model.Attributes):
+    is_running = Bool().tag(display_name='Is Running')
+    interval = Int(100).tag(display_name='Interval')
+    min_value = Int(0).tag(display_name='Min Value')
+    max_value = Int(10).tag(display_name='Max Value')
+
+
+class GraphOutputAttributes(model.Attributes):
+    values = Coerced(np.ndarray, factory=lambda: np.zeros(0), coercer=np.asarray).tag(display_name='Values',
+                                                                                      attr_type='input')
+    max_entries = Int().tag(display_name='Max Entries')
+
+
+class UnaryOperatorAttributes(model.Attributes):
+    operator = Enum('deg2rad', 'rad2deg', 'sin', 'cos', 'log10').tag(display_name='Operator')
+
+
+class BinaryOperatorAttributes(model.Attributes):
+    operator = Enum('add', 'sub', 'mul', 'div').tag(display_name='Operator')
+
+
+class FloatIntegerConverterAttributes(model.Attributes):
+    method = Enum('round', 'floor', 'ceil').tag(display_name='Method')
+
+
 class NodeBase(model.Node):
 
     _spec = List(AttrSpec)
@@ -119,7 +563,7 @@ class InputNode(NodeBase):
 
     def notify_change(self, change):
         if self.graph is not None:
-            self.graph.attributesChanged()
+            self.graph.attributesChanged(self)
 
     def update(self):
         for output in self.outputs:
@@ -158,12 +602,7 @@ class RampGeneratorModel(model.Node):
     value = Int()
 
     def _default_attributes(self):
-        attrs = {'is_running': Bool().tag(display_name='Is Running'),
-                 'interval': Int(100).tag(display_name='Interval'),
-                 'min_value': Int(0).tag(display_name='Min Value'),
-                 'max_value': Int(10).tag(display_name='Max Value'),
-                 }
-        return type("RampGeneratorAttributes", (model.Attributes,), attrs)()
+        return RampGeneratorAttributes()
 
     def _default_outputs(self):
         return [OutputSocket(name="value", data_type="int")]
@@ -174,12 +613,15 @@ class RampGeneratorModel(model.Node):
              "attributes.max_value")
     def _handle_attribute_change(self, change):
         if self.graph is not None:
-            self.graph.attributesChanged()
+            self.graph.attributesChanged(self)
 
     @observe("value")
     def _handle_value_change(self, change):
+        # the default value is created by update() while the graph executes
+        if change['type'] == 'create':
+            return
         if self.graph is not None:
-            self.graph.valuesChanged()
+            self.graph.valuesChanged(self)
 
     def update(self):
         self.output_dict['value'].propagate_change(self.value)
@@ -206,29 +648,146 @@ class TextOutputModel(OutputNode):
 class GraphOutputModel(model.Node):
 
     def _default_attributes(self):
-        attrs = {'values': List(Float()).tag(display_name='Values'),
-                 'max_entries': Int().tag(display_name='Max Entries'),
-                 }
-        return type("GraphOutputAttributes", (model.Attributes,), attrs)()
+        return GraphOutputAttributes()
 
     def _default_inputs(self):
-        return [InputSocket(name="value", degree=1, data_type="float")]
+        # every value is recorded, also repeated ones
+        return [InputSocket(name="value", degree=1, data_type="float", equality=ValueEquality(mode='never'))]
 
     def set_value(self, key, value):
         start_idx = max(0, len(self.attributes.values)-self.attributes.max_entries+1)
-        val = self.attributes.values[start_idx:]
-        val.append(value)
-        self.attributes.values = val
+        self.attributes.values = np.append(self.attributes.values[start_idx:], value)
 
     def update(self):
         pass
 
 
-class UnaryOperatorModel(model.Node):
+class NodeResultCache(Atom):
+    """ A bounded LRU cache mapping input keys to a node's output values.
+
+    """
+    #: The maximum number of entries kept before evicting the least recently used
+    maxsize = Int(32)
+
+    hits = Int()
+    misses = Int()
+
+    _entries = Typed(OrderedDict, ())
+
+    def get(self, key, default=None):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class OperatorNode(model.Node):
+    """ Base class for pure nodes whose outputs only depend on their inputs and attributes.
+
+    Subclasses implement `compute` which assigns the output members. With `memoize`
+    enabled, results are cached per input key and an update with unchanged inputs
+    neither recomputes nor propagates.
+
+    """
+    memoize = Bool(False)
+    cache = Typed(NodeResultCache, ())
+
+    #: the key of the last update, None if downstream nodes need the value again
+    _last_key = Value()
+
+    def set_value(self, key, value):
+        setattr(self, key, value)
+
+    def memo_key(self):
+        key = tuple(getattr(self, s.name) for s in self.inputs)
+        if self.attributes is not None:
+            key += tuple(getattr(self.attributes, name) for name in self.attributes.members())
+        return key
+
+    def invalidate(self):
+        self._last_key = None
+
+    def compute(self):
+        """ Assign the output members from the input members and attributes.
+
+        Overridden by subclasses, the default applies `transform` to the only input.
+
+        """
+        function = self.transform()
+        if function is None:
+            log.warning("no valid transform: %s" % self.id)
+            return
+
+        try:
+            setattr(self, self.outputs[0].name, function(getattr(self, self.inputs[0].name)))
+        except Exception as e:
+            log.error(e)
+
+    def transform(self):
+        """ Return the function computing the only output from the only input
+        with the current attributes, or None if it is not valid.
+
+        Implemented by nodes that may be fused into chains.
+
+        """
+        return None
+
+    def update(self):
+        if self.memoize:
+            key = self.memo_key()
+            if key == self._last_key:
+                return
+            result = self.cache.get(key)
+            if result is None:
+                self.compute()
+                self.cache.put(key, tuple(getattr(self, s.name) for s in self.outputs))
+            else:
+                for output, value in zip(self.outputs, result):
+                    setattr(self, output.name, value)
+            self._last_key = key
+        else:
+            self.compute()
+
+        for output in self.outputs:
+            output.propagate_change(getattr(self, output.name))
+
+
+#: operator attribute -> function of the single input
+UNARY_FUNCTIONS = {
+    'deg2rad': math.radians,
+    'rad2deg': math.degrees,
+    'sin': math.sin,
+    'cos': math.cos,
+    'log10': math.log10,
+}
+
+ROUNDING_FUNCTIONS = {
+    'round': int,
+    'floor': math.floor,
+    'ceil': math.ceil,
+}
+
+
+class UnaryOperatorModel(OperatorNode):
 
     def _default_attributes(self):
-        attrs = {'operator': Enum('deg2rad', 'rad2deg', 'sin', 'cos', 'log10').tag(display_name='Operator')}
-        return type("UnaryOperatorAttributes", (model.Attributes,), attrs)()
+        return UnaryOperatorAttributes()
 
     in1 = Float()
 
@@ -240,41 +799,30 @@ class UnaryOperatorModel(model.Node):
     def _default_outputs(self):
         return [OutputSocket(name="result", data_type="float")]
 
-    def set_value(self, key, value):
-        setattr(self, key, value)
-
     @observe("attributes.operator")
     def _handle_operator_change(self, change):
         if self.graph is not None:
-            self.graph.valuesChanged()
+            self.graph.valuesChanged(self)
 
-    def update(self):
-        op = self.attributes.operator
+    def transform(self):
+        return UNARY_FUNCTIONS.get(self.attributes.operator)
+
+    def compute(self):
+        function = self.transform()
+        if function is None:
+            log.warning("invalid operator: %s" % self.attributes.operator)
+            return
 
         try:
-            if op == 'deg2rad':
-                self.result = math.radians(self.in1)
-            elif op == 'rad2deg':
-                self.result = math.degrees(self.in1)
-            elif op == 'sin':
-                self.result = math.sin(self.in1)
-            elif op == 'cos':
-                self.result = math.cos(self.in1)
-            elif op == 'log10':
-                self.result = math.log10(self.in1)
-            else:
-                log.warning("invalid operator: %s" % op)
+            self.result = function(self.in1)
         except Exception as e:
             log.error(e)
 
-        self.output_dict['result'].propagate_change(self.result)
-
 
-class BinaryOperatorModel(model.Node):
+class BinaryOperatorModel(OperatorNode):
 
     def _default_attributes(self):
-        attrs = {'operator': Enum('add', 'sub', 'mul', 'div').tag(display_name='Operator')}
-        return type("BinaryOperatorAttributes", (model.Attributes,), attrs)()
+        return BinaryOperatorAttributes()
 
     in1 = Float()
     in2 = Float()
@@ -288,15 +836,12 @@ class BinaryOperatorModel(model.Node):
     def _default_outputs(self):
         return [OutputSocket(name="result", data_type="float")]
 
-    def set_value(self, key, value):
-        setattr(self, key, value)
-
     @observe("attributes.operator")
     def _handle_operator_change(self, change):
         if self.graph is not None:
-            self.graph.valuesChanged()
+            self.graph.valuesChanged(self)
 
-    def update(self):
+    def compute(self):
         op = self.attributes.operator
 
         try:
@@ -313,10 +858,8 @@ class BinaryOperatorModel(model.Node):
         except Exception as e:
             log.error(e)
 
-        self.output_dict['result'].propagate_change(self.result)
-
 
-class IntegerFloatConverter(model.Node):
+class IntegerFloatConverter(OperatorNode):
     in1 = Int()
     result = Float()
 
@@ -326,21 +869,19 @@ class IntegerFloatConverter(model.Node):
     def _default_outputs(self):
         return [OutputSocket(name="result", data_type="float")]
 
-    def set_value(self, key, value):
-        setattr(self, key, value)
+    def transform(self):
+        return float
 
-    def update(self):
+    def compute(self):
         self.result = float(self.in1)
-        self.output_dict['result'].propagate_change(self.result)
 
 
-class FloatIntegerConverter(model.Node):
+class FloatIntegerConverter(OperatorNode):
     in1 = Float()
     result = Int()
 
     def _default_attributes(self):
-        attrs = {'method': Enum('round', 'floor', 'ceil').tag(display_name='Method')}
-        return type("FloatIntegerConverterAttributes", (model.Attributes,), attrs)()
+        return FloatIntegerConverterAttributes()
 
     def _default_inputs(self):
         return [InputSocket(name="in1", degree=1, data_type="float")]
@@ -348,28 +889,22 @@ class FloatIntegerConverter(model.Node):
     def _default_outputs(self):
         return [OutputSocket(name="result", data_type="int")]
 
-    def set_value(self, key, value):
-        setattr(self, key, value)
+    def transform(self):
+        return ROUNDING_FUNCTIONS.get(self.attributes.method)
 
-    def update(self):
-        op = self.attributes.method
+    def compute(self):
+        function = self.transform()
+        if function is None:
+            log.warning("invalid method: %s" % self.attributes.method)
+            return
 
         try:
-            if op == 'round':
-                self.result = int(self.in1)
-            elif op == 'floor':
-                self.result = math.floor(self.in1)
-            elif op == 'ceil':
-                self.result = math.ceil(self.in1)
-            else:
-                log.warning("invalid method: %s" % op)
+            self.result = function(self.in1)
         except Exception as e:
             log.error(e)
 
-        self.output_dict['result'].propagate_change(self.result)
-
 
-class IntegerTextConverter(model.Node):
+class IntegerTextConverter(OperatorNode):
     in1 = Int()
     result = Str()
 
@@ -379,15 +914,14 @@ class IntegerTextConverter(model.Node):
     def _default_outputs(self):
         return [OutputSocket(name="result", data_type="text")]
 
-    def set_value(self, key, value):
-        setattr(self, key, value)
+    def transform(self):
+        return "%d".__mod__
 
-    def update(self):
+    def compute(self):
         self.result = "%d" % self.in1
-        self.output_dict['result'].propagate_change(self.result)
 
 
-class FloatTextConverter(model.Node):
+class FloatTextConverter(OperatorNode):
     in1 = Float()
     result = Str()
 
@@ -397,12 +931,45 @@ class FloatTextConverter(model.Node):
     def _default_outputs(self):
         return [OutputSocket(name="result", data_type="text")]
 
+    def transform(self):
+        return "%.3f".__mod__
+
+    def compute(self):
+        self.result = "%.3f" % self.in1
+
+
+class GroupAttributes(model.Attributes):
+    expanded = Bool().tag(display_name='Expanded')
+
+
+class GroupModel(model.GroupNode):
+    """ A node containing a nested calculator graph.
+
+    The group itself is not executed, its inner nodes are part of the
+    execution order of the top level graph and receive the values of the
+    exposed inputs directly.
+
+    """
+    #: inner node id -> position relative to the group, used while not expanded
+    positions = Dict()
+
+    def _default_attributes(self):
+        return GroupAttributes()
+
+    def _default_subgraph(self):
+        return ExecutableGraph()
+
+    def create_socket(self, name, data_type, socket_type):
+        if socket_type == model.SocketType.INPUT:
+            return InputSocket(name=name, degree=1, data_type=data_type)
+        return OutputSocket(name=name, data_type=data_type)
+
     def set_value(self, key, value):
-        setattr(self, key, value)
+        for socket in self.input_map.get(key, ()):
+            socket.receive_value(value)
 
     def update(self):
-        self.result = "%.3f" % self.in1
-        self.output_dict['result'].propagate_change(self.result)
+        pass
 
 
 class EdgeModel(model.Edge):
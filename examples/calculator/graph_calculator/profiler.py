@@ -0,0 +1,112 @@
+import sys
+import time
+
+import numpy as np
+
+from atom.api import Atom, Bool, Int, Float, Str, Dict, Property
+
+
+def value_size(value):
+    """ Approximate size in bytes of a value passed between nodes.
+
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return sys.getsizeof(value)
+
+
+class NodeStats(Atom):
+    node_id = Str()
+    node_class = Str()
+
+    calls = Int()
+    total_time = Float()
+    max_time = Float()
+    value_bytes = Int()
+
+    mean_time = Property(lambda self: self.total_time / self.calls if self.calls else 0.0)
+
+    def __repr__(self):
+        return '<NodeStats %s: %d calls, %.3fms total, %.3fms max, %d bytes>' % (
+            self.node_id, self.calls, self.total_time * 1e3, self.max_time * 1e3, self.value_bytes)
+
+
+class ExecutionProfiler(Atom):
+    """ Collects per-node timings and per-edge propagation counts of an ExecutableGraph.
+
+    """
+    enabled = Bool(False)
+
+    #: node id -> NodeStats
+    node_stats = Dict()
+
+    #: edge id -> number of values propagated along the edge
+    edge_counts = Dict()
+
+    #: incremented after each profiled execution of the graph
+    ticks = Int()
+
+    def reset(self):
+        self.node_stats = {}
+        self.edge_counts = {}
+        self.ticks = 0
+
+    def run_node(self, node):
+        start = time.perf_counter()
+        node.update()
+        elapsed = time.perf_counter() - start
+
+        stats = self.node_stats.get(node.id)
+        if stats is None:
+            stats = self.node_stats[node.id] = NodeStats(node_id=node.id, node_class=type(node).__name__)
+        stats.calls += 1
+        stats.total_time += elapsed
+        if elapsed > stats.max_time:
+            stats.max_time = elapsed
+        # the propagated values, nodes like the inputs keep them on their attributes
+        stats.value_bytes = sum(value_size(getattr(s, 'last_value', None)) for s in node.outputs)
+
+    def record_edge(self, edge):
+        self.edge_counts[edge.id] = self.edge_counts.get(edge.id, 0) + 1
+
+    def stats(self, node_id):
+        return self.node_stats.get(node_id)
+
+    def hot_nodes(self, count=10, key='total_time'):
+        """ Return the `count` most expensive nodes sorted by a NodeStats member.
+
+        """
+        return sorted(self.node_stats.values(), key=lambda s: getattr(s, key), reverse=True)[:count]
+
+    def hot_edges(self, count=10):
+        return sorted(self.edge_counts.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def cost(self, node_id, key='total_time'):
+        """ Cost of a node relative to the most expensive node, in the range [0, 1].
+
+        """
+        stats = self.node_stats.get(node_id)
+        if stats is None:
+            return 0.0
+        max_cost = max(getattr(s, key) for s in self.node_stats.values())
+        if max_cost <= 0:
+            return 0.0
+        return getattr(stats, key) / max_cost
+
+    def costs(self, key='total_time'):
+        """ Relative cost of all profiled nodes, as a dict node id -> [0, 1].
+
+        """
+        max_cost = max((getattr(s, key) for s in self.node_stats.values()), default=0.0)
+        if max_cost <= 0:
+            return {node_id: 0.0 for node_id in self.node_stats}
+        return {node_id: getattr(s, key) / max_cost for node_id, s in self.node_stats.items()}
+
+    def report(self, count=10):
+        lines = ['%-24s %-24s %8s %12s %12s %12s %10s' % ('node', 'class', 'calls', 'total [ms]',
+                                                          'mean [ms]', 'max [ms]', 'bytes')]
+        for s in self.hot_nodes(count):
+            lines.append('%-24s %-24s %8d %12.3f %12.3f %12.3f %10d' % (
+                s.node_id, s.node_class, s.calls, s.total_time * 1e3,
+                s.mean_time * 1e3, s.max_time * 1e3, s.value_bytes))
+        return '\n'.join(lines)
@@ -1,4 +1,4 @@
-from atom.api import (Atom, AtomMeta, Str, Str, ContainerList, Dict, Typed)
+from atom.api import (Atom, AtomMeta, Bool, Str, Str, ContainerList, Dict, Typed)
 
 
 class TypeElement(Atom):
@@ -11,6 +11,9 @@ class TypeElement(Atom):
 class NodeType(TypeElement):
     editor_class = Typed(AtomMeta)
 
+    #: offered in the node menu and the drag list, groups are created from a selection
+    listed = Bool(True)
+
 
 class EdgeType(TypeElement):
     pass
@@ -23,11 +26,17 @@ class TypeRegistry(Atom):
     node_type_name_map = Dict()
     edge_type_name_map = Dict()
 
+    #: model class -> type, for models created without a view
+    node_model_type_map = Dict()
+    edge_model_type_map = Dict()
+
     def _observe_node_types(self, change):
         self.node_type_name_map = {v.id: v for v in self.node_types}
+        self.node_model_type_map = {v.model_class: v for v in self.node_types}
 
     def _observe_edge_types(self, change):
         self.edge_type_name_map = {v.id: v for v in self.edge_types}
+        self.edge_model_type_map = {v.model_class: v for v in self.edge_types}
 
     def register_node_type(self, node_type):
         self.node_types.append(node_type)
@@ -13,7 +13,7 @@ from graph_calculator.model import (IntegerInputModel, FloatInputModel, TextInpu
                                     UnaryOperatorModel, BinaryOperatorModel,
                                     IntegerOutputModel, FloatOutputModel, TextOutputModel, GraphOutputModel,
                                     IntegerFloatConverter, FloatIntegerConverter, IntegerTextConverter, FloatTextConverter,
-                                    EdgeModel)
+                                    GroupModel, EdgeModel)
 
 with enaml.imports():
     from graph_calculator.views.main_view import Main
@@ -103,6 +103,12 @@ def main():
                                                     widget_class=AutoNode,
                                                     editor_class=AttributeEditor,
                                                     model_class=FloatTextConverter))
+    controller.registry.register_node_type(NodeType(id='group',
+                                                    name='Group',
+                                                    widget_class=AutoNode,
+                                                    editor_class=AttributeEditor,
+                                                    model_class=GroupModel,
+                                                    listed=False))
 
     controller.registry.register_edge_type(EdgeType(id='default',
                                                     name='Edge',
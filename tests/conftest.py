@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# the calculator example is tested as well
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'examples', 'calculator')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope='session')
+def qt_app():
+    pytest.importorskip('enaml.qt.QtWidgets')
+    import enaml
+    from enaml.qt.qt_application import QtApplication
+
+    # the nodegraph toolkit factories must be installed before the application is created
+    with enaml.imports():
+        import calculator_view
+    app = QtApplication.instance() or QtApplication()
+    yield app
+
+
+@pytest.fixture
+def controller(qt_app):
+    """ A calculator controller with all node types, shown in an offscreen window. """
+    import enaml
+    from graph_calculator import model
+    from graph_calculator.registry import NodeType, EdgeType
+    from graph_calculator.controller import CalculatorGraphController
+    with enaml.imports():
+        from calculator_view import CalculatorView
+        from graph_calculator.views.item_widgets import AutoNode, Edge
+
+    controller = CalculatorGraphController()
+    for type_id, model_class in [('float_input', model.FloatInputModel),
+                                 ('float_output', model.FloatOutputModel),
+                                 ('unary_operator', model.UnaryOperatorModel),
+                                 ('binary_operator', model.BinaryOperatorModel),
+                                 ('group', model.GroupModel)]:
+        controller.registry.register_node_type(NodeType(id=type_id, name=type_id,
+                                                        widget_class=AutoNode, model_class=model_class))
+    controller.registry.register_edge_type(EdgeType(id='default', name='Edge',
+                                                    widget_class=Edge, model_class=model.EdgeModel))
+    window = CalculatorView(controller=controller)
+    window.show()
+    yield controller
+    controller.cancel_loading()
+    controller.autosave = False
+    window.close()
+    window.destroy()
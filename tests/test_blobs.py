@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from atom.api import Coerced, Int
+
+from enaml_nodegraph.model import Attributes, BlobWriter, BlobReader
+
+
+class ArrayAttributes(Attributes):
+    values = Coerced(np.ndarray, factory=lambda: np.zeros(0), coercer=np.asarray)
+    count = Int()
+
+
+def test_blob_round_trip(tmp_path):
+    path = str(tmp_path / 'graph.json.blobs')
+    attrs = ArrayAttributes(values=np.arange(12, dtype=np.float32).reshape(3, 4), count=3)
+    empty = ArrayAttributes()
+
+    archive, empty_archive = {}, {}
+    with BlobWriter(path) as blobs:
+        attrs.serialize(archive, blobs)
+        empty.serialize(empty_archive, blobs)
+    assert archive['count'] == 3
+    assert archive['values']['shape'] == [3, 4]
+
+    reader = BlobReader(path)
+    loaded = ArrayAttributes()
+    loaded.deserialize(archive, reader)
+    assert isinstance(loaded.values, np.memmap)
+    assert loaded.values.dtype == np.float32
+    assert np.array_equal(loaded.values, attrs.values)
+
+    loaded.deserialize(empty_archive, reader)
+    assert loaded.values.shape == (0,)
+
+
+def test_blob_inline_fallback():
+    attrs = ArrayAttributes(values=np.array([1.0, 2.0]))
+    archive = {}
+    attrs.serialize(archive)
+    assert archive['values'] == [1.0, 2.0]
+
+    loaded = ArrayAttributes()
+    loaded.deserialize(archive)
+    assert np.array_equal(loaded.values, attrs.values)
+
+
+def test_blob_reference_requires_reader(tmp_path):
+    with BlobWriter(str(tmp_path / 'a.blobs')) as blobs:
+        archive = {}
+        ArrayAttributes(values=np.ones(3)).serialize(archive, blobs)
+    with pytest.raises(ValueError):
+        ArrayAttributes().deserialize(archive)
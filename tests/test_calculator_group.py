@@ -0,0 +1,63 @@
+from enaml_nodegraph.primitives import Point2D
+
+
+def chain(controller, n_nodes):
+    """ input -> operator -> ... with the edges 'e1', 'e2', ... """
+    views = [controller.create_node('float_input', position=Point2D(x=0, y=0))]
+    for i in range(1, n_nodes):
+        views.append(controller.create_node('unary_operator', position=Point2D(x=200 * i, y=0)))
+        controller.deserialize_edge({'id': 'e%d' % i, 'source': views[-2].id,
+                                     'source_socket': 'value' if i == 1 else 'result',
+                                     'target': views[-1].id, 'target_socket': 'in1', 'type_name': 'default'})
+    return views
+
+
+def edge_ends(graph):
+    return {edge.id: (edge.start_socket.node.id, edge.start_socket.name, edge.end_socket.node.id,
+                      edge.end_socket.name) for edge in graph.edges}
+
+
+def test_expand_collapse(controller):
+    scene = controller.view.scene
+    views = chain(controller, 4)
+    inner_ids = [views[1].id, views[2].id]
+    group = controller.group_nodes(inner_ids)
+    top_level = set(scene.nodes)
+
+    controller.expand_group(group.id)
+    paths = ['%s/%s' % (group.id, i) for i in inner_ids]
+    assert set(scene.nodes) == top_level.union(paths)
+    edge = scene.edges['%s/e2' % group.id]
+    assert edge.start_socket.parent is scene.nodes[paths[0]] and edge.end_socket.parent is scene.nodes[paths[1]]
+    scene.nodes[paths[1]].position = Point2D(x=500, y=50)
+
+    controller.collapse_group(group.id)
+    assert set(scene.nodes) == top_level
+    assert not [i for i in scene.edges if i.startswith(group.id + '/')]
+
+    controller.expand_group(group.id)
+    assert set(scene.nodes) == top_level.union(paths)
+    assert scene.nodes[paths[1]].position.to_list() == [500.0, 50.0]
+    edge = scene.edges['%s/e2' % group.id]
+    assert edge.start_socket.parent is scene.nodes[paths[0]] and edge.end_socket.parent is scene.nodes[paths[1]]
+
+
+def test_undo_group(controller):
+    scene = controller.view.scene
+    views = chain(controller, 4)
+    controller.interaction_finished()
+    edges = edge_ends(controller.graph)
+    node_ids = set(scene.nodes)
+
+    group = controller.group_nodes([views[1].id, views[2].id])
+    controller.interaction_finished()
+    assert set(scene.nodes) == {views[0].id, views[3].id, group.id}
+
+    controller.undo()
+    assert set(scene.nodes) == node_ids
+    assert edge_ends(controller.graph) == edges
+    assert set(scene.edges) == set(edges)
+
+    controller.redo()
+    assert set(scene.nodes) == {views[0].id, views[3].id, group.id}
+    assert len(controller.graph.edges) == 2
@@ -0,0 +1,95 @@
+from enaml_nodegraph.primitives import Point2D
+
+
+def add_edge(controller, edge_id, start, end, start_socket='value', end_socket='in1'):
+    return controller.deserialize_edge({'id': edge_id, 'source': start.id, 'source_socket': start_socket,
+                                        'target': end.id, 'target_socket': end_socket, 'type_name': 'default'})
+
+
+def test_undo_nodes_and_edges(controller):
+    scene = controller.view.scene
+    source = controller.create_node('float_input', position=Point2D(x=0, y=0))
+    operator = controller.create_node('unary_operator', position=Point2D(x=200, y=0))
+    controller.interaction_finished()
+    add_edge(controller, 'edge', source, operator)
+    controller.interaction_finished()
+    assert len(controller.graph.edges) == 1
+
+    controller.undo()
+    assert not controller.graph.edges and 'edge' not in scene.edges
+    controller.redo()
+    assert controller.graph.edge_dict['edge'].end_socket.node.id == operator.id
+
+    # removing a node removes its edges in the same step
+    controller.destroy_node(operator.id)
+    controller.interaction_finished()
+    assert operator.id not in controller.graph.node_dict and not controller.graph.edges
+    controller.undo()
+    assert operator.id in scene.nodes and 'edge' in scene.edges
+    assert controller.graph.edge_dict['edge'].end_socket.node is controller.graph.node_dict[operator.id]
+
+    controller.destroy_edge('edge')
+    controller.interaction_finished()
+    controller.undo()
+    assert 'edge' in controller.graph.edge_dict
+    controller.redo()
+    assert 'edge' not in controller.graph.edge_dict
+
+    # undo of the creation of the operator, after undoing the edge and its removal
+    while controller.history.can_undo:
+        controller.undo()
+    assert not scene.nodes and not controller.graph.nodes
+    controller.redo()
+    assert list(controller.graph.node_dict) == [source.id]
+
+
+def test_undo_moves_and_attributes(controller):
+    node = controller.create_node('float_input', position=Point2D(x=0, y=0))
+    controller.interaction_finished()
+
+    # the moves of one drag are one step
+    for x in range(1, 6):
+        node.position = Point2D(x=10 * x, y=x)
+    controller.interaction_finished()
+    node.position = Point2D(x=100, y=100)
+    controller.interaction_finished()
+    controller.undo()
+    assert node.position.to_list() == [50.0, 5.0]
+    controller.undo()
+    assert node.position.to_list() == [0.0, 0.0]
+    controller.redo()
+    assert node.position.to_list() == [50.0, 5.0]
+    controller.interaction_finished()
+
+    attributes = node.model.attributes
+    attributes.value = 1.0
+    attributes.value = 2.0
+    controller.interaction_finished()
+    controller.undo()
+    assert attributes.value == 0.0
+    controller.redo()
+    assert attributes.value == 2.0
+
+
+def test_undo_move_in_collapsed_group(controller):
+    scene = controller.view.scene
+    source = controller.create_node('float_input', position=Point2D(x=0, y=0))
+    operator = controller.create_node('unary_operator', position=Point2D(x=300, y=0))
+    add_edge(controller, 'edge', source, operator)
+    group = controller.group_nodes([operator.id])
+    controller.expand_group(group.id)
+    controller.interaction_finished()
+
+    inner = scene.nodes['%s/%s' % (group.id, operator.id)]
+    inner.position = Point2D(x=350, y=20)
+    controller.interaction_finished()
+    with controller.history.suspended():
+        controller.collapse_group(group.id)
+    assert group.model.positions[operator.id] == (Point2D(x=350, y=20) - group.position).to_list()
+
+    # the node has no view, its position in the group is restored
+    controller.undo()
+    assert group.model.positions[operator.id] == (Point2D(x=300, y=0) - group.position).to_list()
+    controller.redo()
+    controller.expand_group(group.id)
+    assert scene.nodes[inner.id].position.to_list() == [350.0, 20.0]
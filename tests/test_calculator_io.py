@@ -0,0 +1,152 @@
+import io
+import struct
+
+import pytest
+
+from graph_calculator import binary_format
+
+
+def node_link_data(n_nodes):
+    nodes = [{'id': 'n%d' % i, 'name': 'Node %d' % i, 'type_name': 'float_input', 'position': [1.5 * i, -2.0],
+              'attributes': {'value': 0.5 * i, 'label': 'x', 'flags': [1, 2], 'missing': None,
+                             'enabled': i % 2 == 0, 'large': 2 ** 40, 'options': {'a': 1}}}
+             for i in range(n_nodes)]
+    nodes[1]['comment'] = 'only on one node'
+    links = [{'id': 'e%d' % i, 'source': 'n%d' % i, 'target': 'n%d' % (i + 1), 'source_socket': 'value',
+              'target_socket': 'in1', 'type_name': 'default', 'key': 0}
+             for i in range(n_nodes - 1)]
+    return {'directed': True, 'multigraph': True, 'graph': {'viewport_transform': [1.0, 0.0, 0.0] * 3},
+            'nodes': nodes, 'links': links}
+
+
+def dumped(data, chunk_size=4096):
+    fp = io.BytesIO()
+    binary_format.dump(data, fp, chunk_size=chunk_size)
+    fp.seek(0)
+    return fp
+
+
+def test_binary_round_trip():
+    data = node_link_data(10)
+    assert binary_format.load(dumped(data)) == data
+    # records split across chunks
+    assert binary_format.load(dumped(data, chunk_size=3)) == data
+
+
+def test_binary_invalid_records():
+    data = node_link_data(3)
+    del data['nodes'][1]['position']
+    loaded = binary_format.load(dumped(data))
+    assert [n['id'] for n in loaded['nodes']] == ['n0', 'n2']
+
+    with pytest.raises(binary_format.FormatError):
+        binary_format.load(io.BytesIO(b'{"nodes": []}'))
+    with pytest.raises(binary_format.FormatError):
+        binary_format.load(io.BytesIO(dumped(data).getvalue()[:-10]))
+
+
+
+def test_binary_byte_order():
+    # little-endian on every host: string count and lengths, then the node count and positions
+    payload = binary_format.encode_nodes([{'id': 'n', 'name': '', 'type_name': 't', 'position': [1.0, -2.0]}])
+    assert payload.startswith(b'\x03\x00\x00\x00' b'\x01\x00\x00\x00' b'\x00\x00\x00\x00' b'\x01\x00\x00\x00'
+                              b'nt' b'\x01\x00\x00\x00' + struct.pack('<dd', 1.0, -2.0))
+    assert binary_format.decode_nodes(payload) == [{'id': 'n', 'name': '', 'type_name': 't',
+                                                    'position': [1.0, -2.0]}]
+
+def test_parallel_load(tmp_path):
+    from graph_calculator import loader
+
+    data = node_link_data(50)
+    path = str(tmp_path / 'graph.ngb')
+    with open(path, 'wb') as fp:
+        binary_format.dump(data, fp, chunk_size=4)
+
+    executor = loader.decode_executor()
+    with open(path, 'rb') as fp:
+        serial = binary_format.load(fp)
+    with open(path, 'rb') as fp:
+        assert binary_format.load(fp, executor) == serial == data
+
+    records = list(loader.iter_records(path, executor))
+    assert records == list(loader.iter_records(path))
+    assert [r[1]['id'] for r in records if r[0] == 'nodes'] == [n['id'] for n in data['nodes']]
+    assert records[-1][2] == pytest.approx(1.0, abs=0.01)
+
+
+def saved_chain(controller, path, n_nodes):
+    from enaml_nodegraph.primitives import Point2D
+
+    previous = controller.create_node('float_input', position=Point2D(x=0, y=0))
+    for i in range(1, n_nodes):
+        node = controller.create_node('unary_operator', position=Point2D(x=200 * i, y=0))
+        controller.deserialize_edge({'id': 'e%d' % i, 'source': previous.id,
+                                     'source_socket': 'value' if i == 1 else 'result',
+                                     'target': node.id, 'target_socket': 'in1', 'type_name': 'default'})
+        previous = node
+    controller.file_save(path)
+    controller.file_new()
+
+
+@pytest.mark.parametrize('filename', ['graph.json', 'graph' + binary_format.EXTENSION])
+def test_incremental_load(controller, tmp_path, filename):
+    path = str(tmp_path / filename)
+    saved_chain(controller, path, 5)
+    controller.file_open(path)
+    expected = (len(controller.graph.nodes), len(controller.graph.edges))
+    assert expected == (5, 4)
+
+    # each step with no time budget loads one record
+    loader = controller.file_open_incremental(path)
+    assert loader.step(0) and loader.step(0)
+    assert 0.0 < loader.progress < 1.0
+    assert loader.is_loading and controller.loader is loader
+    nodes_loaded = loader.nodes_loaded
+    assert 0 < nodes_loaded < 5
+
+    controller.cancel_loading()
+    assert not loader.is_loading and controller.loader is None
+    assert len(controller.graph.nodes) == nodes_loaded
+    assert controller.is_dirty
+    assert not loader.step(0)
+
+    loader = controller.file_open_incremental(path)
+    loader.run()
+    assert loader.progress == 1.0 and (loader.nodes_loaded, loader.edges_loaded) == expected
+    assert controller.loader is None and not controller.is_dirty
+    assert (len(controller.graph.nodes), len(controller.graph.edges)) == expected
+    assert len(controller.view.scene.nodes) == 5 and len(controller.view.scene.edges) == 4
+
+
+def test_reload_applies_minimal_patch(controller, tmp_path):
+    import json
+
+    path = str(tmp_path / 'graph.json')
+    saved_chain(controller, path, 4)
+    controller.file_open(path)
+    scene = controller.view.scene
+    views = dict(scene.nodes)
+    source_id, moved_id = list(views)[:2]
+    scene.nodes[source_id].model.attributes.value = 2.0
+    controller.file_save(path)
+
+    with open(path) as fp:
+        data = json.load(fp)
+    nodes = {node['id']: node for node in data['nodes']}
+    # a missing attribute is reset to its default
+    del nodes[source_id]['attributes']['value']
+    nodes[moved_id]['position'] = [10.0, 20.0]
+    data['links'] = [edge for edge in data['links'] if edge['id'] != 'e3']
+    with open(path, 'w') as fp:
+        json.dump(data, fp)
+
+    patch = controller.reload()
+    assert patch.changed_nodes == {source_id: {'reset_attributes': ['value']},
+                                   moved_id: {'position': [10.0, 20.0]}}
+    assert patch.removed_edges == ['e3']
+    assert not (patch.added_nodes or patch.removed_nodes or patch.added_edges or patch.changed_edges)
+
+    assert scene.nodes == views
+    assert views[source_id].model.attributes.value == 0.0
+    assert views[moved_id].position.to_list() == [10.0, 20.0]
+    assert sorted(scene.edges) == ['e1', 'e2'] and not controller.is_dirty
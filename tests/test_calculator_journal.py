@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip('enaml.qt.QtWidgets')
+
+from enaml_nodegraph.primitives import Point2D
+
+from graph_calculator.journal import ChangeJournal, journal_path, read_journal
+
+
+def by_id(records):
+    return sorted(({k: v for k, v in r.items() if k != 'key'} for r in records), key=lambda r: r['id'])
+
+
+def test_journal_records(tmp_path):
+    base = str(tmp_path / 'graph.json')
+    with open(base, 'w') as fp:
+        fp.write('{}')
+    journal = ChangeJournal(path=journal_path(base))
+    journal.reset(base)
+    for x in range(5):
+        journal.move('a', [x, 0])
+    journal.append('remove_node', id='b')
+    journal.move('a', [9, 9])
+    journal.flush()
+    assert journal.record_count == 3
+    # consecutive moves of a node are written as one record
+    assert read_journal(journal.path, base) == [{'op': 'move', 'id': 'a', 'position': [4, 0]},
+                                                {'op': 'remove_node', 'id': 'b'},
+                                                {'op': 'move', 'id': 'a', 'position': [9, 9]}]
+
+    # a truncated last record is dropped, a journal of another file version ignored
+    with open(journal.path, 'a') as fp:
+        fp.write('{"op": "remo')
+    assert len(read_journal(journal.path, base)) == 3
+    with open(base, 'w') as fp:
+        fp.write('{"nodes": []}')
+    assert read_journal(journal.path, base) == []
+
+
+def test_journal_replay_and_compaction(controller, tmp_path):
+    path = str(tmp_path / 'graph.json')
+    source = controller.create_node('float_input', position=Point2D(x=0, y=0))
+    controller.file_save(path)
+    controller.autosave = True
+
+    operator = controller.create_node('unary_operator', position=Point2D(x=200, y=0))
+    controller.deserialize_edge({'id': 'edge', 'source': source.id, 'source_socket': 'value',
+                                 'target': operator.id, 'target_socket': 'in1', 'type_name': 'default'})
+    source.model.attributes.value = 2.0
+    for x in range(5):
+        operator.position = Point2D(x=300 + x, y=10)
+    controller.autosave_now()
+    records = read_journal(journal_path(path), path)
+    assert [r['op'] for r in records] == ['add_node', 'add_edge', 'attributes', 'move']
+    expected = controller.serialize_graph()
+
+    # after a crash, opening the file replays the journal
+    controller.journal = None
+    controller.file_open(path)
+    replayed = controller.serialize_graph()
+    assert by_id(replayed['nodes']) == by_id(expected['nodes'])
+    assert by_id(replayed['links']) == by_id(expected['links'])
+    assert controller.is_dirty
+
+    # compaction folds the journal into the graph file
+    controller.journal_compact_threshold = 0
+    controller.graph.node_dict[source.id].attributes.value = 3.0
+    controller.autosave_now()
+    assert controller.journal.record_count == 0 and not controller.is_dirty
+    assert read_journal(journal_path(path), path) == []
+    with open(path) as fp:
+        saved = {n['id']: n for n in json.load(fp)['nodes']}
+    assert saved[source.id]['attributes']['value'] == 3.0
+    assert saved[operator.id]['position'] == [304.0, 10.0]
+    assert os.path.exists(journal_path(path))
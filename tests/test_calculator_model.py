@@ -0,0 +1,197 @@
+import numpy as np
+
+from atom.api import Int
+
+from graph_calculator import model
+
+
+def connect(start, end, start_socket='result', end_socket='in1'):
+    return model.EdgeModel(id='%s-%s' % (start.id, end.id),
+                           start_socket=start.output_dict[start_socket], end_socket=end.input_dict[end_socket])
+
+
+def make_graph(nodes, edges):
+    graph = model.ExecutableGraph()
+    graph.nodes = nodes
+    graph.edges = edges
+    graph.topologyChanged()
+    return graph
+
+
+def rounding_graph(output):
+    """ float input -> round -> to float -> `output`. """
+    source = model.FloatInputModel(id='input')
+    rounding = model.FloatIntegerConverter(id='round')
+    to_float = model.IntegerFloatConverter(id='to_float')
+    edges = [connect(source, rounding, 'value'), connect(rounding, to_float),
+             connect(to_float, output, end_socket='value')]
+    return make_graph([source, rounding, to_float, output], edges)
+
+
+def test_value_equality_modes():
+    equal = model.ValueEquality()
+    assert equal.equal(1.0, 1.0) and not equal.equal(1, 1.0) and not equal.equal(1.0, 1.0 + 1e-12)
+    assert equal.equal(np.arange(3), np.arange(3)) and not equal.equal(np.arange(3), np.arange(4))
+
+    tolerance = model.ValueEquality(mode='tolerance', rel_tol=1e-6)
+    assert tolerance.equal(1.0, 1.0 + 1e-12) and not tolerance.equal(1.0, 1.1)
+    assert tolerance.equal(np.ones(3), np.ones(3) + 1e-12)
+
+    value = [1]
+    identity = model.ValueEquality(mode='identity')
+    assert identity.equal(value, value) and not identity.equal(value, [1])
+    assert not model.ValueEquality(mode='never').equal(value, value)
+
+
+def test_unchanged_output_stops_propagation():
+    output = model.FloatOutputModel(id='output')
+    graph = rounding_graph(output)
+    graph.profiler.enabled = True
+    source = graph.node_dict['input']
+
+    source.attributes.value = 1.2
+    source.attributes.value = 1.3
+    assert graph.profiler.edge_counts['input-round'] == 2
+    assert graph.profiler.edge_counts['round-to_float'] == 1
+    assert output.attributes.value == 1.0
+
+    # a socket's own equality overrides the graph's one
+    graph.node_dict['round'].outputs[0].equality = model.ValueEquality(mode='never')
+    source.attributes.value = 1.4
+    assert graph.profiler.edge_counts['round-to_float'] == 2
+
+
+def test_graph_output_records_repeated_values():
+    source = model.FloatInputModel(id='input')
+    cosine = model.UnaryOperatorModel(id='cos')
+    cosine.attributes.operator = 'cos'
+    output = model.GraphOutputModel(id='output')
+    output.attributes.max_entries = 10
+    make_graph([source, cosine, output], [connect(source, cosine, 'value'), connect(cosine, output, end_socket='value')])
+
+    source.attributes.value = 0.5
+    source.attributes.value = -0.5
+    assert list(output.attributes.values[-2:]) == [np.cos(0.5)] * 2
+
+
+class CountingOperator(model.UnaryOperatorModel):
+    computed = Int()
+
+    def compute(self):
+        self.computed += 1
+        super(CountingOperator, self).compute()
+
+
+def test_memoized_operator():
+    source = model.FloatInputModel(id='input')
+    operator = CountingOperator(id='op', memoize=True)
+    operator.attributes.operator = 'sin'
+    output = model.FloatOutputModel(id='output')
+    graph = make_graph([source, operator, output],
+                       [connect(source, operator, 'value'), connect(operator, output, end_socket='value')])
+    graph.profiler.enabled = True
+
+    source.attributes.value = 0.5
+    source.attributes.value = 0.7
+    computed = operator.computed
+    source.attributes.value = 0.5
+    # a cache hit does not recompute, but the value changed
+    assert operator.computed == computed and output.attributes.value == np.sin(0.5)
+    assert operator.cache.hits == 1
+
+    # unchanged inputs neither recompute nor propagate
+    propagated = graph.profiler.edge_counts['op-output']
+    graph.valuesChanged(operator)
+    assert operator.computed == computed and graph.profiler.edge_counts['op-output'] == propagated
+
+
+def test_operator_defaults():
+    operator = model.BinaryOperatorModel()
+    assert operator.transform() is None
+    assert model.FloatIntegerConverter().transform() is int
+
+
+def operator_graph():
+    """ Two inputs, each feeding a chain of operators, joined by a binary operator. """
+    nodes, edges = [], []
+    ends = []
+    for i, operators in enumerate([['sin', 'cos', 'deg2rad'], ['cos', 'sin']]):
+        previous = model.FloatInputModel(id='input-%d' % i)
+        previous.attributes.value = 0.25 * (i + 1)
+        nodes.append(previous)
+        socket = 'value'
+        for k, operator in enumerate(operators):
+            node = model.UnaryOperatorModel(id='op-%d-%d' % (i, k))
+            node.attributes.operator = operator
+            nodes.append(node)
+            edges.append(connect(previous, node, socket))
+            previous, socket = node, 'result'
+        ends.append(previous)
+    binary = model.BinaryOperatorModel(id='binary')
+    binary.attributes.operator = 'mul'
+    rounding = model.FloatIntegerConverter(id='round')
+    to_float = model.IntegerFloatConverter(id='to_float')
+    outputs = [model.FloatOutputModel(id='output-%d' % i) for i in range(2)]
+    nodes.extend([binary, rounding, to_float] + outputs)
+    edges.extend([connect(ends[0], binary), connect(ends[1], binary, end_socket='in2'),
+                  connect(binary, outputs[0], end_socket='value'),
+                  connect(ends[1], rounding), connect(rounding, to_float),
+                  connect(to_float, outputs[1], end_socket='value')])
+    return make_graph(nodes, edges)
+
+
+def output_values(graph):
+    return {n.id: n.attributes.value for n in graph.nodes if isinstance(n, model.FloatOutputModel)}
+
+
+def test_fused_chains():
+    results = []
+    for fuse_chains in (False, True):
+        graph = operator_graph()
+        graph.fuse_chains = fuse_chains
+        values = [output_values(graph)]
+        graph.node_dict['input-0'].attributes.value = 2.0
+        graph.node_dict['op-1-1'].attributes.operator = 'rad2deg'
+        graph.node_dict['input-1'].attributes.value = 3.0
+        values.append(output_values(graph))
+        results.append(values)
+        # the fused nodes after the first of each chain are not in the order
+        assert len(graph.execution_order) == len(graph.nodes) - (4 if fuse_chains else 0)
+    assert results[0] == results[1]
+
+
+def test_compiled_graph():
+    graph = operator_graph()
+    assert graph.compiled() == output_values(graph)
+
+    compiled = graph.compiled
+    graph.node_dict['input-1'].attributes.value = 1.5
+    # input values are arguments, other changes compile the graph again
+    assert graph.compiled is compiled and compiled({'input-1': 1.5}) == output_values(graph)
+    graph.node_dict['binary'].attributes.operator = 'add'
+    assert graph.compiled is not compiled and graph.compiled() == output_values(graph)
+
+
+def test_suspended_updates_execute_once():
+    graph = operator_graph()
+    graph.profiler.enabled = True
+    ticks = graph.profiler.ticks
+    with graph.updates_suspended():
+        graph.node_dict['input-0'].attributes.value = 2.0
+        graph.node_dict['input-1'].attributes.value = 3.0
+        with graph.updates_suspended():
+            graph.node_dict['binary'].attributes.operator = 'sub'
+        assert graph.profiler.ticks == ticks
+    assert graph.profiler.ticks == ticks + 1
+
+    with graph.updates_suspended():
+        graph.node_dict['input-0'].attributes.value = 1.0
+        graph.topologyChanged()
+        graph.topologyChanged()
+    assert graph.profiler.ticks == ticks + 2
+
+    expected = operator_graph()
+    expected.node_dict['input-0'].attributes.value = 1.0
+    expected.node_dict['input-1'].attributes.value = 3.0
+    expected.node_dict['binary'].attributes.operator = 'sub'
+    assert output_values(graph) == output_values(expected)
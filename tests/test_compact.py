@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from enaml_nodegraph.model import CompactGraph, Graph, Node, Socket, Edge, SocketType
+
+
+def chain(n):
+    compact = CompactGraph()
+    for i in range(n):
+        compact.add_node('n%d' % i, [('in', 'float')], [('out', 'float')], name='node%d' % i)
+    for i in range(1, n):
+        compact.add_edge('e%d' % i, 'n%d' % (i - 1), 'out', 'n%d' % i, 'in')
+    return compact
+
+
+def test_adjacency():
+    compact = CompactGraph()
+    for node_id in 'abcd':
+        compact.add_node(node_id, ['x', 'y'], ['out'])
+    compact.add_edge('ab', 'a', 'out', 'b', 'x')
+    compact.add_edge('ac', 'a', 'out', 'c', 'x')
+    compact.add_edge('bc', 'b', 'out', 'c', 'y')
+    compact.add_edge('cd', 'c', 'out', 'd', 'x')
+
+    assert compact.node_count == 4 and compact.socket_count == 12 and compact.edge_count == 4
+    assert compact.node_ids(compact.successors('a')) == ['b', 'c']
+    assert compact.node_ids(compact.predecessors('c')) == ['a', 'b']
+    assert list(compact.out_degree()) == [2, 1, 1, 0]
+    assert list(compact.in_degree()) == [0, 1, 2, 1]
+    assert compact.node_ids(compact.topological_order()) == ['a', 'b', 'c', 'd']
+    assert [list(level) for level in compact.levels()] == [[0], [1], [2], [3]]
+    assert compact.node_ids(compact.downstream(['b'])) == ['b', 'c', 'd']
+
+    # adjacency is rebuilt after appending
+    compact.add_node('e', ['x'], [])
+    compact.add_edge('ae', 'a', 'out', 'e', 'x')
+    assert compact.node_ids(compact.successors('a')) == ['b', 'c', 'e']
+    assert compact.node_ids(compact.levels()[1]) == ['b', 'e']
+
+
+def test_cycle_and_errors():
+    compact = chain(3)
+    compact.add_edge('back', 'n2', 'out', 'n0', 'in')
+    with pytest.raises(ValueError):
+        compact.topological_order()
+    with pytest.raises(ValueError):
+        compact.add_node('n0')
+    with pytest.raises(KeyError):
+        compact.add_edge('x', 'n0', 'in', 'n1', 'in')
+
+    compact.add_node('s', [('in', 'str')], [])
+    with pytest.raises(TypeError):
+        compact.add_edge('y', 'n0', 'out', 's', 'in')
+
+
+def test_views():
+    compact = chain(3)
+    node = compact.node('n1')
+    assert (node.id, node.name) == ('n1', 'node1')
+    assert [s.name for s in node.inputs] == ['in']
+    socket = node.output_dict['out']
+    assert socket.socket_type == SocketType.OUTPUT and socket.data_type == 'float'
+    assert socket.node.id == 'n1'
+    assert [e.id for e in socket.edges] == ['e2']
+    assert [e.id for e in node.in_edges] == ['e1']
+    edge = compact.edge('e2')
+    assert edge.start_socket.node.id == 'n1' and edge.end_socket.node.id == 'n2'
+
+
+def test_round_trip_with_model_graph():
+    nodes = [Node(id='n%d' % i, name='node%d' % i,
+                  inputs=[Socket(name='a', data_type='float'), Socket(name='b', data_type='float')],
+                  outputs=[Socket(name='out', data_type='float')]) for i in range(5)]
+    edges = [Edge(id='e%d' % i, start_socket=nodes[i - 1].outputs[0], end_socket=nodes[i].inputs[i % 2])
+             for i in range(1, 5)]
+    graph = Graph(nodes=nodes, edges=edges)
+
+    compact = CompactGraph.from_graph(graph)
+    assert compact.node_ids(compact.topological_order()) == [n.id for n in graph.topological_sort()]
+
+    copy = compact.to_graph()
+    assert [n.id for n in copy.nodes] == [n.id for n in nodes]
+    assert [s.name for s in copy.node_dict['n2'].inputs] == ['a', 'b']
+    for edge in copy.edges:
+        original = graph.edge_dict[edge.id]
+        assert edge.start_socket.node.id == original.start_socket.node.id
+        assert edge.end_socket.name == original.end_socket.name
+
+
+def test_large_levels_match_native_sort():
+    rnd = np.random.RandomState(0)
+    compact = CompactGraph()
+    n = 2000
+    for i in range(n):
+        compact.add_node('n%d' % i, ['a', 'b'], ['out'])
+    for i in range(1, n):
+        for k, name in enumerate('ab'):
+            # nodes may also be given by index
+            compact.add_edge('e%d-%d' % (i, k), int(rnd.randint(i)), 'out', i, name)
+    order = compact.topological_order()
+    position = np.empty(n, dtype=int)
+    position[order] = np.arange(n)
+    assert len(order) == n
+    assert np.all(position[compact.edge_source_node] < position[compact.edge_target_node])
@@ -0,0 +1,94 @@
+import copy
+
+from atom.api import Int, Str
+
+from enaml_nodegraph.model import Attributes, Edge, Graph, Node, Socket, diff, diff_records, apply_patch
+from enaml_nodegraph.model.diff import graph_records
+
+
+class ValueAttributes(Attributes):
+    value = Int()
+    label = Str()
+
+
+class ValueNode(Node):
+
+    def _default_attributes(self):
+        return ValueAttributes()
+
+    def _default_inputs(self):
+        return [Socket(name='in', data_type='int')]
+
+    def _default_outputs(self):
+        return [Socket(name='out', data_type='int')]
+
+
+class OtherNode(ValueNode):
+    pass
+
+
+def make_node(record):
+    return {'OtherNode': OtherNode}.get(record['type'].rsplit('.', 1)[-1], ValueNode)()
+
+
+def make_graph(values, links, types=None):
+    graph = Graph()
+    for node_id, value in values.items():
+        node = (types or {}).get(node_id, ValueNode)(id=node_id, name=node_id)
+        node.attributes.value = value
+        graph.add_node(node)
+    for edge_id, (source, target) in links.items():
+        graph.add_edge(Edge(id=edge_id, start_socket=graph.node_dict[source].outputs[0],
+                            end_socket=graph.node_dict[target].inputs[0]))
+    return graph
+
+
+def test_diff_and_apply():
+    a = make_graph({'a': 1, 'b': 2, 'c': 3, 'd': 4}, {'e1': ('a', 'b'), 'e2': ('b', 'c'), 'e3': ('c', 'd')})
+    b = make_graph({'a': 1, 'b': 5, 'd': 4, 'x': 7}, {'e1': ('a', 'b'), 'e3': ('b', 'd'), 'e4': ('d', 'x')})
+
+    patch = diff(a, b)
+    assert list(patch.added_nodes) == ['x']
+    assert patch.removed_nodes == ['c']
+    assert patch.changed_nodes == {'b': {'attributes': {'value': 5}}}
+    # edges are replaced when their endpoints change
+    assert sorted(patch.added_edges) == ['e3', 'e4']
+    assert sorted(patch.removed_edges) == ['e2', 'e3']
+    assert patch.changed_edges == {}
+
+    unchanged = a.node_dict['a']
+    apply_patch(a, patch, make_node)
+    assert diff(a, b).is_empty
+    assert a.node_dict['a'] is unchanged
+    assert a.node_dict['b'].attributes.value == 5
+
+
+def test_node_type_change_replaces_edges():
+    a = make_graph({'a': 1, 'b': 2}, {'e1': ('a', 'b')})
+    b = make_graph({'a': 1, 'b': 2}, {'e1': ('a', 'b')}, types={'b': OtherNode})
+
+    patch = diff(a, b)
+    assert patch.removed_nodes == ['b'] and list(patch.added_nodes) == ['b']
+    assert patch.removed_edges == ['e1'] and list(patch.added_edges) == ['e1']
+
+    apply_patch(a, patch, make_node)
+    assert isinstance(a.node_dict['b'], OtherNode)
+    assert a.edge_dict['e1'].end_socket.node is a.node_dict['b']
+    assert diff(a, b).is_empty
+
+
+def test_removed_keys():
+    a = make_graph({'a': 1, 'b': 2}, {})
+    a.node_dict['b'].attributes.label = 'b'
+    records = graph_records(a)
+    new = copy.deepcopy(records)
+    del new['nodes']['b']['attributes']['label']
+    del new['nodes']['b']['name']
+
+    patch = diff_records(records, new)
+    assert patch.changed_nodes == {'b': {'name': None, 'reset_attributes': ['label']}}
+    assert diff_records(new, records).changed_nodes == {'b': {'name': 'b', 'attributes': {'label': 'b'}}}
+
+    apply_patch(a, patch, make_node)
+    assert a.node_dict['b'].attributes.label == '' and a.node_dict['b'].name == ''
+    assert a.node_dict['b'].attributes.value == 2
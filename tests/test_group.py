@@ -0,0 +1,79 @@
+import pytest
+
+from enaml_nodegraph.model import (Edge, Socket, Node, Graph, GroupNode, leaf_nodes, leaf_links,
+                                   flat_topological_sort)
+
+
+def node(node_id, inputs=('in',), outputs=('out',)):
+    return Node(id=node_id,
+                inputs=[Socket(name=name, data_type='float') for name in inputs],
+                outputs=[Socket(name=name, data_type='float') for name in outputs])
+
+
+def connect(graph, start, end, start_socket='out', end_socket='in'):
+    edge = Edge(start_socket=start.output_dict[start_socket], end_socket=end.input_dict[end_socket])
+    graph.edges.append(edge)
+    return edge
+
+
+def grouped_graph():
+    """ a -> [b -> [c] -> d] -> e, with groups g (b, h, d) and h (c). """
+    a, b, c, d, e = [node(i) for i in 'abcde']
+    h = GroupNode(id='h')
+    h.subgraph.nodes.append(c)
+    h.expose_input('x', [c.inputs[0]])
+    h.expose_output('y', c.outputs[0])
+
+    g = GroupNode(id='g')
+    g.subgraph.nodes.extend([b, h, d])
+    connect(g.subgraph, b, h, end_socket='x')
+    connect(g.subgraph, h, d, start_socket='y')
+    g.expose_input('x', [b.inputs[0]])
+    g.expose_output('y', d.outputs[0])
+
+    graph = Graph(nodes=[e, g, a])
+    connect(graph, a, g, end_socket='x')
+    connect(graph, g, e, start_socket='y')
+    return graph
+
+
+def test_group_sockets():
+    graph = grouped_graph()
+    g = graph.node_dict['g']
+    h = g.subgraph.node_dict['h']
+    assert g.subgraph.group is g and h.subgraph.root is graph and graph.root is graph
+    assert [s.name for s in g.inputs] == ['x'] and g.inputs[0].node is g
+    assert g.exports(g.subgraph.node_dict['d'].outputs[0]) == [g.outputs[0]]
+
+    with pytest.raises(ValueError):
+        g.expose_output('y', g.subgraph.node_dict['b'].outputs[0])
+
+
+def test_flattened_order():
+    graph = grouped_graph()
+    assert sorted(n.id for n in leaf_nodes(graph)) == list('abcde')
+    links = sorted((start.node.id, end.node.id, len(path)) for start, end, path in leaf_links(graph))
+    assert links == [('a', 'b', 1), ('b', 'c', 1), ('c', 'd', 1), ('d', 'e', 1)]
+    assert [n.id for n in flat_topological_sort(graph)] == list('abcde')
+
+    # without groups the native sort is used
+    a, b = node('a'), node('b')
+    plain = Graph(nodes=[b, a])
+    connect(plain, a, b)
+    assert flat_topological_sort(plain) == [a, b]
+
+
+def test_serialize_exposed_sockets():
+    graph = grouped_graph()
+    g = graph.node_dict['g']
+    archive = {}
+    g.serialize(archive)
+    assert archive['exposed_inputs'] == [['x', [['b', 'in']]]]
+    assert archive['exposed_outputs'] == [['y', 'd', 'out']]
+
+    copy = GroupNode(id='g')
+    copy.subgraph.nodes.extend([node('b'), node('d')])
+    copy.deserialize(archive)
+    copy.deserialize(archive)
+    assert [s.name for s in copy.inputs] == ['x'] and [s.name for s in copy.outputs] == ['y']
+    assert copy.input_map['x'] == [copy.subgraph.node_dict['b'].inputs[0]]
@@ -0,0 +1,65 @@
+import numpy as np
+
+from enaml_nodegraph.model import ContentHashes, HashingBlobs, content_hash, diff_snapshots
+
+
+def make_hashes(records):
+    return ContentHashes(record_for=lambda key: records.get(key))
+
+
+def test_content_hash_ignores_key_order():
+    assert content_hash({'a': 1, 'b': [1, 2]}) == content_hash({'b': [1, 2], 'a': 1})
+    assert content_hash({'a': 1}) != content_hash({'a': 2})
+
+
+def test_digest_follows_content():
+    records = {('node', 'n%d' % i): {'value': i} for i in range(100)}
+    hashes = make_hashes(records)
+    for key in records:
+        hashes.invalidate(key)
+    initial = hashes.digest()
+
+    records[('node', 'n3')] = {'value': -1}
+    hashes.invalidate(('node', 'n3'))
+    assert hashes.digest() != initial
+
+    records[('node', 'n3')] = {'value': 3}
+    hashes.invalidate(('node', 'n3'))
+    assert hashes.digest() == initial
+
+    # the digest does not depend on the order items were added in
+    other = make_hashes(dict(records))
+    for key in reversed(list(records)):
+        other.invalidate(key)
+    assert other.digest() == initial
+
+
+def test_snapshot_diff():
+    records = {('node', 'n%d' % i): {'value': i} for i in range(1000)}
+    hashes = make_hashes(records)
+    for key in records:
+        hashes.invalidate(key)
+    old = hashes.snapshot()
+
+    records[('node', 'n1')] = {'value': -1}
+    del records[('node', 'n2')]
+    records[('edge', 'e1')] = {'source': 'n1'}
+    for key in (('node', 'n1'), ('node', 'n2'), ('edge', 'e1')):
+        hashes.invalidate(key)
+    new = hashes.snapshot()
+
+    assert diff_snapshots(old, new) == ({('edge', 'e1')}, {('node', 'n2')}, {('node', 'n1')})
+    assert diff_snapshots(new, old) == ({('node', 'n2')}, {('edge', 'e1')}, {('node', 'n1')})
+    assert diff_snapshots(new, new) == (set(), set(), set())
+    # the old snapshot is not affected by later changes
+    assert ('node', 'n2') in old and ('node', 'n2') not in new
+    assert old.get(('node', 'n1')) != new.get(('node', 'n1'))
+
+
+def test_hashing_blobs():
+    blobs = HashingBlobs()
+    a = blobs.put(np.arange(10.0))
+    assert a == blobs.put(np.arange(10.0))
+    assert a != blobs.put(np.arange(10.0) + 1)
+    assert a != blobs.put(np.arange(10.0).astype(np.float32))
+    assert blobs.put(np.arange(10.0)[::2]) == blobs.put(np.arange(0.0, 10.0, 2.0))
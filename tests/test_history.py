@@ -0,0 +1,92 @@
+from atom.api import Dict, Str, Value
+
+from enaml_nodegraph.history import Command, CommandStack
+
+
+class SetValue(Command):
+    key = Str()
+    old = Value()
+    new = Value()
+
+    def undo(self, target):
+        target[self.key] = self.old
+
+    def redo(self, target):
+        target[self.key] = self.new
+
+    def merge(self, command):
+        if not isinstance(command, SetValue) or command.key != self.key:
+            return False
+        self.new = command.new
+        return True
+
+
+def set_value(stack, state, key, value):
+    stack.push(SetValue(key=key, old=state.get(key), new=value))
+    state[key] = value
+
+
+def test_undo_redo():
+    stack = CommandStack()
+    state = {}
+    set_value(stack, state, 'a', 1)
+    stack.seal()
+    set_value(stack, state, 'a', 2)
+    stack.seal()
+    assert stack.can_undo and not stack.can_redo
+
+    stack.undo(state)
+    assert state == {'a': 1} and stack.can_redo
+    stack.undo(state)
+    assert state == {'a': None} and not stack.can_undo
+    stack.redo(state)
+    assert state == {'a': 1}
+
+    # a new command discards the redo history
+    set_value(stack, state, 'b', 3)
+    assert not stack.can_redo
+
+
+def test_merge_until_sealed():
+    stack = CommandStack()
+    state = {}
+    for i in range(10):
+        set_value(stack, state, 'a', i)
+    set_value(stack, state, 'b', 0)
+    stack.seal()
+    set_value(stack, state, 'b', 1)
+    assert len(stack._undo) == 3
+
+    stack.undo(state)
+    stack.undo(state)
+    stack.undo(state)
+    assert state == {'a': None, 'b': None}
+
+
+def test_merge_interval():
+    stack = CommandStack(merge_interval=0.0)
+    state = {}
+    set_value(stack, state, 'a', 1)
+    set_value(stack, state, 'a', 2)
+    assert len(stack._undo) == 2
+
+
+def test_depth_and_macro():
+    stack = CommandStack(depth=3)
+    state = {}
+    for i in range(5):
+        set_value(stack, state, 'k%d' % i, i)
+        stack.seal()
+    assert len(stack._undo) == 3
+
+    with stack.macro('both'):
+        set_value(stack, state, 'x', 1)
+        set_value(stack, state, 'y', 2)
+    stack.undo(state)
+    assert state['x'] is None and state['y'] is None
+
+    # nothing is recorded while suspended
+    with stack.suspended():
+        set_value(stack, state, 'z', 1)
+    stack.depth = 1
+    assert len(stack._undo) == 1
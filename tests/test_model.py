@@ -1,3 +1,5 @@
+import random
+
 import pytest
 
 
@@ -90,4 +92,178 @@ def test_simple_graph():
     assert n2.inputs[1].can_connect(n2.outputs[1]) == False
     with pytest.raises(TypeError):
         e4 = Edge(start_socket=n2.outputs[1], end_socket=n2.inputs[1])
-    
\ No newline at end of file
+    
+
+def test_topological_sort():
+    nodes = [Node(name="node%d" % i,
+                  inputs=[Socket(name="in", data_type="a")],
+                  outputs=[Socket(name="out", data_type="a")])
+             for i in range(4)]
+    n0, n1, n2, n3 = nodes
+
+    g = Graph(name="toposort", nodes=[n3, n2, n1, n0])
+    for start, end in [(n0, n1), (n1, n2), (n0, n3), (n2, n3)]:
+        g.add_edge(Edge(start_socket=start.outputs[0], end_socket=end.inputs[0]))
+
+    # open edges are ignored
+    g.add_edge(Edge(start_socket=n3.outputs[0]))
+
+    order = g.topological_sort()
+    assert order == [n0, n1, n2, n3]
+
+    g.add_edge(Edge(start_socket=n3.outputs[0], end_socket=n1.inputs[0]))
+    with pytest.raises(ValueError):
+        g.topological_sort()
+
+
+def test_graph_clear():
+    n0 = Node(id="n0", outputs=[Socket(name="out", data_type="a")])
+    n1 = Node(id="n1", inputs=[Socket(name="in", data_type="a")])
+    g = Graph(nodes=[n0, n1])
+    e = Edge(id="e", start_socket=n0.outputs[0], end_socket=n1.inputs[0])
+    g.add_edge(e)
+    assert g.node_dict["n0"] is n0 and g.edge_dict["e"] is e
+
+    g.clear()
+    assert g.nodes == [] and g.edges == []
+    assert g.node_dict == {} and g.edge_dict == {}
+    assert n0.graph is None and e.graph is None
+
+
+def test_socket_indices():
+    def check(node):
+        assert [s.index for s in node.inputs] == list(range(len(node.inputs)))
+        assert node.input_dict == {s.name: s for s in node.inputs}
+        assert all(s.node is node and s.socket_type == SocketType.INPUT for s in node.inputs)
+
+    node = Node(inputs=[Socket(name="in%d" % i) for i in range(3)])
+    check(node)
+    node.inputs.append(Socket(name="in3"))
+    check(node)
+    node.inputs.insert(1, Socket(name="x"))
+    check(node)
+    node.inputs.insert(-1, Socket(name="y"))
+    check(node)
+
+    removed = node.inputs[1]
+    node.inputs.remove(removed)
+    check(node)
+    assert removed.node is None and "x" not in node.input_dict
+    node.inputs.pop(0)
+    del node.inputs[-1]
+    del node.inputs[0:1]
+    check(node)
+    node.inputs[0] = Socket(name="z")
+    check(node)
+    node.inputs.reverse()
+    check(node)
+    node.inputs = [Socket(name="new")]
+    check(node)
+
+    node.add_inputs(["a", ("b", "float"), Socket(name="c")], data_type="int")
+    check(node)
+    assert [(s.name, s.data_type) for s in node.inputs[1:]] == [("a", "int"), ("b", "float"), ("c", "")]
+
+    # of sockets with the same name the last one is in the dict
+    first, last = Socket(name="dup"), Socket(name="dup")
+    node.inputs = [first, Socket(name="a"), last]
+    check(node)
+    node.inputs.remove(last)
+    check(node)
+    assert node.input_dict["dup"] is first
+    node.inputs.insert(0, last)
+    node.inputs.pop(2)
+    check(node)
+
+    node.add_outputs("out%d" % i for i in range(200))
+    assert node.outputs[-1].index == 199
+    assert node.output_dict["out150"].socket_type == SocketType.OUTPUT
+
+
+def test_adjacency():
+    nodes = [Node(id="n%d" % i, inputs=[Socket(name="a", data_type="x"), Socket(name="b", data_type="x")],
+                  outputs=[Socket(name="out", data_type="x")]) for i in range(5)]
+    n0, n1, n2, n3, n4 = nodes
+    g = Graph(nodes=nodes)
+
+    def connect(start, end, name="a"):
+        e = Edge(start_socket=start.outputs[0], end_socket=end.input_dict[name])
+        g.add_edge(e)
+        return e
+
+    connect(n0, n1)
+    connect(n0, n1, "b")
+    e12 = connect(n1, n2)
+    connect(n2, n3)
+    assert g.successors(n0) == [n1]
+    assert g.predecessors(n1) == [n0]
+    assert g.downstream(n1) == [n2, n3]
+    assert g.upstream([n3], inclusive=True) == [n3, n2, n1, n0]
+    assert g.reachable(n0, n3) and not g.reachable(n3, n0) and not g.reachable(n0, n4)
+
+    # parallel edges are counted
+    g.delete_edge(g.edges[0])
+    assert g.successors(n0) == [n1]
+
+    # reconnecting an edge in the graph updates the adjacency
+    e12.end_socket = n4.inputs[0]
+    assert g.successors(n1) == [n4]
+    assert g.predecessors(n2) == []
+    assert not g.reachable(n0, n3)
+
+    g.delete_edge(e12)
+    assert g.successors(n1) == [] and g.downstream(n0) == [n1]
+    assert g.topological_sort().index(n2) < g.topological_sort().index(n3)
+
+    g.clear()
+    assert g.successors(n2) == []
+
+
+def test_would_create_cycle():
+    rnd = random.Random(1)
+    nodes = [Node(id="n%d" % i, inputs=[Socket(name="in", data_type="x")], outputs=[Socket(name="out", data_type="x")])
+             for i in range(50)]
+    g = Graph()
+    for node in nodes:
+        g.add_node(node)
+    assert g.would_create_cycle(nodes[0], nodes[0])
+
+    for _ in range(500):
+        start, end = rnd.choice(nodes), rnd.choice(nodes)
+        cycle = g.would_create_cycle(start, end)
+        assert cycle == g.reachable(end, start)
+        if not cycle:
+            g.add_edge(Edge(start_socket=start.outputs[0], end_socket=end.inputs[0]))
+        if g.edges and rnd.random() < 0.2:
+            g.delete_edge(rnd.choice(g.edges))
+    # the maintained order agrees with every edge
+    order = g._order
+    assert all(order[e.start_socket.node] < order[e.end_socket.node] for e in g.edges)
+
+    # with a cycle in the graph the check falls back to a search
+    g.add_edge(Edge(start_socket=nodes[1].outputs[0], end_socket=nodes[2].inputs[0]))
+    g.add_edge(Edge(start_socket=nodes[2].outputs[0], end_socket=nodes[1].inputs[0]))
+    assert g.would_create_cycle(nodes[1], nodes[2])
+
+
+def test_compatible_inputs():
+    def make(node_id, data_type="x", degree=0):
+        return Node(id=node_id, inputs=[Socket(name="in", data_type=data_type, degree=degree)],
+                    outputs=[Socket(name="out", data_type="x")])
+
+    n0, n1, n2 = make("n0"), make("n1"), make("n2", degree=1)
+    other = make("other", data_type="y")
+    g = Graph(nodes=[n0, n1, n2, other])
+    assert g.input_sockets("x") == [n0.inputs[0], n1.inputs[0], n2.inputs[0]]
+    assert g.input_sockets("y") == [other.inputs[0]]
+
+    g.add_edge(Edge(start_socket=n0.outputs[0], end_socket=n1.inputs[0]))
+    # not itself, not upstream nodes and not the full socket of n2
+    assert g.compatible_inputs(n1.outputs[0]) == [n2.inputs[0]]
+    g.add_edge(Edge(start_socket=n0.outputs[0], end_socket=n2.inputs[0]))
+    assert g.compatible_inputs(n1.outputs[0]) == []
+
+    n1.add_inputs([("extra", "x")])
+    assert n1.input_dict["extra"] in g.input_sockets("x")
+    g.delete_node(other)
+    assert g.input_sockets("y") == []
@@ -0,0 +1,16 @@
+from enaml_nodegraph.primitives import Point2D, SpatialHash
+
+
+def test_spatial_hash_nearest():
+    index = SpatialHash(cell_size=10)
+    for i in range(100):
+        index.insert(i, Point2D(x=(i % 10) * 25.0, y=(i // 10) * 25.0))
+
+    assert index.nearest(Point2D(x=52, y=27), 5) == 12
+    assert index.nearest(Point2D(x=-3, y=-4), 5) == 0
+    # points are only found within the radius, across cell borders
+    assert index.nearest(Point2D(x=12, y=12), 5) is None
+    assert index.nearest(Point2D(x=12, y=12), 20) in (0, 1, 10, 11)
+
+    index.clear()
+    assert index.nearest(Point2D(x=0, y=0), 100) is None
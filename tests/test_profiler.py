@@ -0,0 +1,78 @@
+import sys
+import time
+
+from enaml_nodegraph.primitives import Point2D
+
+from graph_calculator import model
+
+
+class SlowOperator(model.UnaryOperatorModel):
+
+    def compute(self):
+        time.sleep(0.005)
+        super(SlowOperator, self).compute()
+
+
+def connect(start, end, start_socket='result', end_socket='in1'):
+    return model.EdgeModel(id='%s-%s' % (start.id, end.id),
+                           start_socket=start.output_dict[start_socket], end_socket=end.input_dict[end_socket])
+
+
+def test_node_costs():
+    source = model.FloatInputModel(id='input')
+    slow = SlowOperator(id='slow')
+    fast = model.UnaryOperatorModel(id='fast')
+    output = model.FloatOutputModel(id='output')
+    graph = model.ExecutableGraph()
+    graph.nodes = [source, slow, fast, output]
+    graph.edges = [connect(source, slow, 'value'), connect(slow, fast), connect(fast, output, end_socket='value')]
+    graph.topologyChanged()
+    profiler = graph.profiler
+    profiler.enabled = True
+    source.attributes.value = 0.5
+    source.attributes.value = 1.5
+
+    assert profiler.ticks == 2
+    assert profiler.stats('slow').calls == 2 and profiler.stats('slow').max_time >= 0.005
+    assert profiler.hot_nodes(1)[0].node_id == 'slow'
+    costs = profiler.costs()
+    assert costs['slow'] == 1.0 and all(cost < 1.0 for node_id, cost in costs.items() if node_id != 'slow')
+    assert profiler.cost('slow') == 1.0 and profiler.cost('unknown') == 0.0
+    # the input keeps its value on the attributes
+    assert profiler.stats('input').value_bytes == sys.getsizeof(1.5)
+    assert profiler.hot_edges(1) == [('input-slow', 2)]
+
+    lines = profiler.report(2).splitlines()
+    assert len(lines) == 3 and lines[1].split()[:3] == ['slow', 'SlowOperator', '2']
+
+    profiler.reset()
+    assert profiler.node_stats == {} and profiler.costs() == {}
+
+
+def test_profile_overlay(controller):
+    nodes = [controller.create_node('float_input', position=Point2D(x=0, y=0)),
+             controller.create_node('unary_operator', position=Point2D(x=200, y=0)),
+             controller.create_node('unary_operator', position=Point2D(x=400, y=0)),
+             controller.create_node('float_output', position=Point2D(x=600, y=0))]
+    sockets = [('value', 'in1'), ('result', 'in1'), ('result', 'value')]
+    for i, (start_socket, end_socket) in enumerate(sockets):
+        controller.deserialize_edge({'id': 'edge-%d' % i, 'source': nodes[i].id, 'source_socket': start_socket,
+                                     'target': nodes[i + 1].id, 'target_socket': end_socket,
+                                     'type_name': 'default'})
+    graph = controller.graph
+    graph.fuse_chains = True
+    assert len(graph.execution_order) == 3
+
+    controller.profile_overlay_interval = 0.0
+    controller.profile_overlay = True
+    # the profiled nodes are not fused
+    assert graph.profiler.enabled and len(graph.execution_order) == 4
+    nodes[0].model.attributes.value = 2.0
+    assert all(n.color_overlay is not None for n in nodes)
+
+    controller.profile_overlay = False
+    assert all(n.color_overlay is None for n in nodes)
+    assert not graph.profiler.enabled and len(graph.execution_order) == 3
+    ticks = graph.profiler.ticks
+    nodes[0].model.attributes.value = 3.0
+    assert graph.profiler.ticks == ticks
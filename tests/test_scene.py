@@ -0,0 +1,46 @@
+import pytest
+
+from enaml_nodegraph.primitives import Point2D
+from enaml_nodegraph.widgets.graphicsscene import SceneGuard
+
+
+def populate(controller, n_nodes):
+    previous = controller.create_node('float_input', position=Point2D(x=0, y=0))
+    for i in range(1, n_nodes):
+        node = controller.create_node('unary_operator', position=Point2D(x=200 * i, y=0))
+        controller.deserialize_edge({'id': 'e%d' % i, 'source': previous.id,
+                                     'source_socket': 'value' if i == 1 else 'result',
+                                     'target': node.id, 'target_socket': 'in1', 'type_name': 'default'})
+        previous = node
+
+
+def test_clear_all(controller, monkeypatch):
+    scene = controller.view.scene
+    populate(controller, 4)
+    assert len(scene.nodes) == 4 and len(scene.edges) == 3
+    assert scene.proxy.widget.items()
+
+    calls = []
+    for name in ('edge_disconnect', 'destroy_edge', 'destroy_node'):
+        monkeypatch.setattr(type(controller), name, lambda self, *args, name=name: calls.append(name))
+    scene.guard = SceneGuard.ACTIVATING
+    scene.clear_all()
+
+    assert scene.guard == SceneGuard.ACTIVATING
+    assert not calls
+    assert not scene.nodes and not scene.edges and not scene._items
+    assert not scene.proxy.widget.items()
+    scene.guard = SceneGuard.NOOP
+
+
+def test_clear_all_restores_guard(controller, monkeypatch):
+    scene = controller.view.scene
+    populate(controller, 2)
+
+    def fail(self, items):
+        raise RuntimeError()
+
+    monkeypatch.setattr(type(scene.proxy), 'remove_items', fail)
+    with pytest.raises(RuntimeError):
+        scene.clear_all()
+    assert scene.guard == SceneGuard.NOOP
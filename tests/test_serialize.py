@@ -0,0 +1,56 @@
+import datetime
+
+from atom.api import Atom, Bool, Int, Float, Str, Enum, List, Typed, Instance, Value
+
+from enaml_nodegraph.model import Attributes, register_codec
+from enaml_nodegraph.model.base import serializer_for
+
+
+class Point(Atom):
+    x = Float()
+    y = Float()
+
+
+class Stamp(object):
+    def __init__(self, value):
+        self.value = value
+
+
+class NodeAttributes(Attributes):
+    enabled = Bool(True)
+    count = Int()
+    label = Str()
+    mode = Enum('a', 'b')
+    items = List(Int())
+    origin = Typed(Point)
+    offset = Instance(Point)
+    stamp = Typed(Stamp)
+    opaque = Value()
+
+
+def test_compiled_serializer_round_trip():
+    register_codec(Stamp, lambda value, blobs: value.value, lambda data, blobs: Stamp(data))
+
+    attrs = NodeAttributes(enabled=False, count=3, label='n', mode='b', items=[1, 2],
+                           origin=Point(x=1.0, y=2.0), stamp=Stamp(42), opaque=object())
+    archive = {}
+    attrs.serialize(archive)
+    assert archive == {'enabled': False, 'count': 3, 'label': 'n', 'mode': 'b', 'items': [1, 2],
+                       'origin': {'x': 1.0, 'y': 2.0}, 'offset': None, 'stamp': 42}
+
+    loaded = NodeAttributes()
+    loaded.deserialize(archive)
+    assert (loaded.enabled, loaded.count, loaded.label, loaded.mode, loaded.items) == (False, 3, 'n', 'b', [1, 2])
+    assert (loaded.origin.x, loaded.origin.y) == (1.0, 2.0)
+    assert loaded.offset is None
+    assert loaded.stamp.value == 42
+    assert loaded.opaque is None
+
+    # missing keys keep their current values
+    loaded.deserialize({'count': 5})
+    assert loaded.count == 5 and loaded.label == 'n'
+
+
+def test_serializer_is_cached_per_class():
+    assert serializer_for(NodeAttributes) is serializer_for(NodeAttributes)
+    assert serializer_for(Point) is not serializer_for(NodeAttributes)
@@ -0,0 +1,39 @@
+import json
+
+from enaml_nodegraph.tracing import TraceRecorder
+
+
+def test_trace_recorder(tmp_path):
+    recorder = TraceRecorder()
+
+    # disabled recorders hand out a no-op span and record nothing
+    with recorder.span('ignored'):
+        pass
+    assert len(recorder.events) == 0
+
+    path = str(tmp_path / 'trace.json')
+    recorder.start(path)
+    with recorder.span('outer', 'test', size=3):
+        recorder.instant('marker', 'test', id='n1')
+    recorder.stop()
+
+    assert not recorder.enabled
+
+    data = json.load(open(path))
+    events = data['traceEvents']
+    assert [e['ph'] for e in events] == ['i', 'X']
+    assert events[0]['args'] == {'id': 'n1'}
+    assert events[1]['name'] == 'outer'
+    assert events[1]['args'] == {'size': 3}
+    assert events[1]['dur'] >= 0
+
+
+def test_trace_recorder_limit(tmp_path):
+    recorder = TraceRecorder(max_events=2)
+    recorder.start(str(tmp_path / 'trace.json'))
+    for i in range(5):
+        recorder.instant('tick')
+    recorder.stop()
+
+    assert len(recorder.events) == 2
+    assert recorder.dropped_events == 3
@@ -0,0 +1,55 @@
+import pytest
+
+from enaml_nodegraph.model import (DataTypeRegistry, data_types, Edge, Graph, Node, Socket,
+                                   INCOMPATIBLE, ASSIGNABLE, CONVERTIBLE)
+
+
+def test_subtyping_and_conversions():
+    registry = DataTypeRegistry()
+    number = registry.register('number')
+    integer = registry.register('integer', parent='number')
+    real = registry.register('real', parent='number')
+    text = registry.id('text')
+    assert registry.id('integer') == integer and registry.names[text] == 'text'
+
+    assert registry.is_subtype(integer, number) and not registry.is_subtype(number, integer)
+    assert registry.compatibility(integer, integer) == ASSIGNABLE
+    assert registry.compatibility(integer, number) == ASSIGNABLE
+    assert registry.compatibility(number, integer) == INCOMPATIBLE
+    assert registry.compatibility(integer, real) == INCOMPATIBLE
+
+    registry.register_conversion('number', 'text', str)
+    registry.register_conversion('integer', 'real', float)
+    assert registry.compatibility(integer, real) == CONVERTIBLE
+    assert registry.converter(integer, real) is float
+    # conversions of parent types apply to subtypes
+    assert registry.compatibility(real, text) == CONVERTIBLE
+    assert registry.converter(real, text) is str
+    assert registry.converter(integer, number) is None
+
+    with pytest.raises(ValueError):
+        registry.register('number', parent='integer')
+
+
+def test_connections_use_the_registry():
+    data_types.register('test_base')
+    data_types.register('test_derived', parent='test_base')
+    data_types.register_conversion('test_derived', 'test_text', str)
+
+    source = Node(id='source', outputs=[Socket(name='out', data_type='test_derived')])
+    base = Node(id='base', inputs=[Socket(name='in', data_type='test_base')],
+                outputs=[Socket(name='out', data_type='test_base')])
+    text = Node(id='text', inputs=[Socket(name='in', data_type='test_text')])
+    g = Graph(nodes=[source, base, text])
+
+    assert base.inputs[0].can_connect(source.outputs[0])
+    assert source.outputs[0].can_connect(base.inputs[0])
+    assert text.inputs[0].can_connect(source.outputs[0])
+    assert not text.inputs[0].can_connect(base.outputs[0])
+    assert g.compatible_inputs(source.outputs[0]) == [base.inputs[0], text.inputs[0]]
+    assert g.compatible_inputs(base.outputs[0]) == []
+
+    assert Edge(start_socket=source.outputs[0], end_socket=base.inputs[0]).converter is None
+    assert Edge(start_socket=source.outputs[0], end_socket=text.inputs[0]).converter is str
+    with pytest.raises(TypeError):
+        Edge(start_socket=base.outputs[0], end_socket=text.inputs[0])